@@ -1,9 +1,9 @@
 import json
 import os
 import inspect
+import importlib
 import time
 from dotenv import load_dotenv
-from zhipuai import ZhipuAI
 import AI.default_tool
 from AI.default_tool import Todo
 import sys
@@ -28,6 +28,38 @@ import_global_functions(AI.default_tool)
 
 load_dotenv()
 
+class LazyToolFunction:
+    """
+    延迟导入的工具函数
+
+    注册时只记录模块名和函数名，首次被模型调用时才导入模块，
+    避免只用到部分工具的任务在启动时加载 akshare / pandas / PyPDF2 等重量级依赖
+    """
+
+    def __init__(self, module_name, func_name):
+        self.module_name = module_name
+        self.__name__ = func_name
+        self._func = None
+
+    def _resolve(self):
+        if self._func is None:
+            module = importlib.import_module(self.module_name)
+            self._func = getattr(module, self.__name__)
+        return self._func
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+
+def get_tool_names(tool_config_path):
+    """读取工具配置文件中声明的函数名列表"""
+    with open(tool_config_path, "r", encoding="utf-8") as f:
+        tools = json.load(f)
+    if not isinstance(tools, list):
+        tools = [tools]
+    return [tool["function"]["name"] for tool in tools if "function" in tool]
+
+
 def get_env_float(key, default):
     value = os.getenv(key, default)
     if isinstance(value, str):
@@ -67,7 +99,7 @@ class ZhipuChat:
 
         # 创建支持密钥轮换的客户端
         self._rotating_client = create_zhipu_client_with_rotation()
-        self.client = ZhipuAI(api_key=self.api_key)
+        self._client = None
         
         self.context = []
         self.tools = []
@@ -81,6 +113,14 @@ class ZhipuChat:
         if extend_tools:
             self._load_tools(extend_tools)
 
+    @property
+    def client(self):
+        """普通客户端，仅在未配置轮换客户端时才需要，首次访问时再导入 zhipuai"""
+        if self._client is None:
+            from zhipuai import ZhipuAI
+            self._client = ZhipuAI(api_key=self.api_key)
+        return self._client
+
     def _register_todo_methods(self):
         self._tool_functions["self.todo.create"] = self.todo.create
         self._tool_functions["self.todo.update"] = self.todo.update
@@ -111,6 +151,17 @@ class ZhipuChat:
         for name, obj in inspect.getmembers(module, inspect.isfunction):
             self._tool_functions[name] = obj
 
+    def register_lazy_tool_functions(self, module_name, tool_config_path):
+        """
+        按工具配置注册函数，但不立即导入模块
+
+        Args:
+            module_name: 工具函数所在模块，如 "DataCollector.fund_data.get_fund_info"
+            tool_config_path: 工具配置文件路径，从中读取需要注册的函数名
+        """
+        for name in get_tool_names(tool_config_path):
+            self._tool_functions[name] = LazyToolFunction(module_name, name)
+
     def _execute_func(self, func, args):
         if isinstance(args, str):
             args = json.loads(args)
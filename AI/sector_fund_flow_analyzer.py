@@ -1,6 +1,5 @@
 from AI.core import ZhipuChat
 from AI.config.fund_analysiser_config.system_config import SYSTEM_PROMPT
-import DataCollector.fund_data.get_fund_info as gf
 
 class SectorFundFlowAnalyzer(ZhipuChat):
     """
@@ -11,7 +10,7 @@ class SectorFundFlowAnalyzer(ZhipuChat):
     """
     def __init__(self):
         super().__init__(system_prompt=SYSTEM_PROMPT, extend_tools="DataCollector/fund_data/tool_config.json")
-        self.register_tool_functions_from_module(gf)
+        self.register_lazy_tool_functions("DataCollector.fund_data.get_fund_info", "DataCollector/fund_data/tool_config.json")
 
     def run(self, message):
         """
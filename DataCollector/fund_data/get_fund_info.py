@@ -1,9 +1,10 @@
-import akshare as ak
-import pandas as pd
 import os
 import requests
 import json
 
+# akshare / pandas 导入耗时较长，放到各函数内部按需导入，
+# 这样只注册工具而未调用时不会拖慢任务进程启动
+
 def get_fund_daily(fund_code, period="1年"):
     """
     使用akshare获取基金日线数据
@@ -11,6 +12,9 @@ def get_fund_daily(fund_code, period="1年"):
     :param period: 时间段，可选值："1月", "3月", "6月", "1年", "3年", "5年", "今年来", "成立来"，默认近一年
     :return: 基金日线数据DataFrame
     """
+    import akshare as ak
+    import pandas as pd
+
     # 获取原始数据
     data = ak.fund_open_fund_info_em(symbol=fund_code, indicator="单位净值走势", period=period)
     
@@ -49,6 +53,8 @@ def calculate_factors(fund_code, period="1年"):
     :param period: 时间段，可选值："1月", "3月", "6月", "1年", "3年", "5年", "今年来", "成立来"，默认近一年
     :return: 基金因子DataFrame
     """
+    import pandas as pd
+
     try:
         # 检查文件是否存在，不存在则获取数据
         fund_dir = f"data/funds/{fund_code}"
@@ -161,6 +167,8 @@ def get_sector_fund_flow(fid="今日"):
     :param fid: 时间维度，可选值："今日", "5日", "10日"，默认5日
     :return: 板块资金流向DataFrame
     """
+    import pandas as pd
+
     # 定义不同时间维度的配置
     time_config = {
         "今日": {
@@ -4,7 +4,6 @@ import time
 import re
 import os
 from bs4 import BeautifulSoup
-from PyPDF2 import PdfReader
 from AI.summary_core import summarize_text
 def get_fast_news()-> dict:
     """
@@ -258,6 +257,7 @@ def extract_pdf_content(pdf_url: str) -> dict:
         response.raise_for_status()
 
         from io import BytesIO
+        from PyPDF2 import PdfReader
         pdf_file = BytesIO(response.content)
 
         reader = PdfReader(pdf_file)
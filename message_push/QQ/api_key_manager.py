@@ -12,11 +12,13 @@ import os
 import asyncio
 import time
 import threading
-from typing import Optional, Dict, List, Any, Callable
+from typing import Optional, Dict, List, Any, Callable, TYPE_CHECKING
 from dataclasses import dataclass, field
 from datetime import datetime
 from dotenv import load_dotenv
-from zhipuai import ZhipuAI
+
+if TYPE_CHECKING:
+    from zhipuai import ZhipuAI
 
 load_dotenv()
 
@@ -121,8 +123,9 @@ class RotatingZhipuClient:
         rate_limit_indicators = ["429", "1302", "1305", "并发数过高", "请求过多", "rate limit"]
         return any(indicator in error_str.lower() for indicator in rate_limit_indicators)
     
-    def _create_zhipu_client(self, key_info: APIKeyInfo) -> ZhipuAI:
-        """创建ZhipuAI客户端"""
+    def _create_zhipu_client(self, key_info: APIKeyInfo) -> "ZhipuAI":
+        """创建ZhipuAI客户端（首次调用时才导入 zhipuai SDK）"""
+        from zhipuai import ZhipuAI
         return ZhipuAI(api_key=key_info.key)
     
     def chat_completions_create(self, **kwargs):
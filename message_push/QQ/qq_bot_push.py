@@ -1,7 +1,12 @@
 import os
 import asyncio
-import aiohttp
+import atexit
+import threading
 import time
+import weakref
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -10,80 +15,281 @@ HTTP_API_BASE_URL = os.getenv("QQ_BOT_HTTP_API_URL", "http://localhost:8080")
 TARGET_C2C_OPENID = os.getenv("QQ_TARGET_C2C_OPENID", "")
 TARGET_GROUP_OPENID = os.getenv("QQ_TARGET_GROUP_OPENID", "")
 
+# 连续失败多少次后熔断，以及熔断持续的秒数
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_OPEN_SECONDS = 30
 
-async def check_service_health(max_retries: int = 3, retry_delay: float = 2.0) -> bool:
-    """检查 QQ bot HTTP 服务是否可用"""
-    url = f"{HTTP_API_BASE_URL}/health"
-    
-    for attempt in range(max_retries):
+
+class QQPushClient:
+    """
+    QQ bot HTTP 推送客户端
+
+    - 每个事件循环复用一个 aiohttp.ClientSession，连接池保持长连接，连续推送多条消息不再反复建连；
+      事件循环由 asyncio.run 结束时会话随之关闭，自行管理事件循环时需在关闭循环前调用 close()
+    - 熔断器代替每条消息前的 /health 检查: 连续 CIRCUIT_FAILURE_THRESHOLD 次连接失败（超时、连接错误、
+      非 2xx 且响应不是 JSON 对象，如代理返回的 502 页面）后熔断，熔断期间直接返回失败；
+      到期后只由一个请求探测一次 /health，探测期间其他请求直接返回失败，探测通过后恢复发送
+    - send_many 在同一个连接池上并发发送多条消息
+    """
+
+    def __init__(self, base_url: str = HTTP_API_BASE_URL, concurrency: int = 4,
+                 failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, open_seconds: float = CIRCUIT_OPEN_SECONDS):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        # ClientSession 只能在创建它的事件循环中使用
+        self._sessions = weakref.WeakKeyDictionary()
+        # 各事件循环中负责在循环结束时关闭会话的守护任务
+        self._guards = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        # 半开状态下是否已有请求在探测 /health
+        self._probing = False
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+            self._guards[loop] = loop.create_task(self._close_on_shutdown(session))
+        return session
+
+    @staticmethod
+    async def _close_on_shutdown(session: aiohttp.ClientSession):
+        """
+        守护任务：一直等待到事件循环结束
+
+        asyncio.run 退出前会取消所有未完成的任务，取消时在循环关闭前关闭会话，
+        反复 asyncio.run 调用异步接口时不会遗留未关闭的会话和连接
+        """
         try:
-            async with aiohttp.ClientSession() as session:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            if not session.closed:
+                await session.close()
+
+    async def close(self):
+        """关闭当前事件循环中的连接池"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        guard = self._guards.pop(loop, None)
+        if guard is not None:
+            # 取消守护任务，由它关闭会话
+            guard.cancel()
+            await asyncio.gather(guard, return_exceptions=True)
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # ==================== 熔断器 ====================
+
+    def _record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+
+    def _record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._open_until <= time.time():
+                    print(f"⚠️ QQ bot 服务连续失败 {self._failures} 次，暂停推送 {self.open_seconds} 秒")
+                self._open_until = time.time() + self.open_seconds
+
+    @property
+    def circuit_state(self) -> str:
+        """closed（正常）、open（熔断中）或 half_open（熔断到期，等待探测）"""
+        with self._lock:
+            if self._failures < self.failure_threshold:
+                return "closed"
+            return "open" if time.time() < self._open_until else "half_open"
+
+    async def _allow_request(self) -> bool:
+        state = self.circuit_state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        # 熔断到期后用一次健康检查探测服务是否恢复，同一时刻只允许一个请求探测
+        with self._lock:
+            if self._probing:
+                return False
+            self._probing = True
+        try:
+            return await self.health(max_retries=1)
+        finally:
+            with self._lock:
+                self._probing = False
+
+    # ==================== 请求 ====================
+
+    async def health(self, max_retries: int = 1, retry_delay: float = 2.0) -> bool:
+        """检查 QQ bot HTTP 服务是否可用，结果同时更新熔断状态"""
+        url = f"{self.base_url}/health"
+        session = await self._get_session()
+
+        for attempt in range(max_retries):
+            try:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    await response.read()
                     if response.status == 200:
+                        self._record_success()
                         return True
                     print(f"⚠️ 服务健康检查失败: HTTP {response.status}")
-        except asyncio.TimeoutError:
-            print(f"⚠️ 服务健康检查超时 (尝试 {attempt + 1}/{max_retries})")
-        except aiohttp.ClientError as e:
-            print(f"⚠️ 服务健康检查失败: {e} (尝试 {attempt + 1}/{max_retries})")
-        except Exception as e:
-            print(f"⚠️ 服务健康检查异常: {e} (尝试 {attempt + 1}/{max_retries})")
-        
-        if attempt < max_retries - 1:
-            await asyncio.sleep(retry_delay)
-    
-    return False
+            except asyncio.TimeoutError:
+                print(f"⚠️ 服务健康检查超时 (尝试 {attempt + 1}/{max_retries})")
+            except aiohttp.ClientError as e:
+                print(f"⚠️ 服务健康检查失败: {e} (尝试 {attempt + 1}/{max_retries})")
+            except Exception as e:
+                print(f"⚠️ 服务健康检查异常: {e} (尝试 {attempt + 1}/{max_retries})")
 
+            if attempt < max_retries - 1:
+                await asyncio.sleep(retry_delay)
 
-async def send_notification(openid: str, content: str, msg_type: str = "c2c", max_retries: int = 3) -> dict:
-    """通过 HTTP API 发送通知消息，支持自动重试"""
-    url = f"{HTTP_API_BASE_URL}/api/notify"
-    payload = {
-        "openid": openid,
-        "content": content,
-        "msg_type": msg_type
-    }
-    
-    last_error = None
-    
-    for attempt in range(max_retries):
-        try:
-            async with aiohttp.ClientSession() as session:
+        self._record_failure()
+        return False
+
+    async def send(self, openid: str, content: str, msg_type: str = "c2c", max_retries: int = 3) -> dict:
+        """通过 HTTP API 发送通知消息，支持自动重试；熔断期间直接返回失败"""
+        url = f"{self.base_url}/api/notify"
+        payload = {
+            "openid": openid,
+            "content": content,
+            "msg_type": msg_type
+        }
+
+        last_error = None
+
+        for attempt in range(max_retries):
+            if not await self._allow_request():
+                last_error = last_error or "QQ bot 服务不可用"
+                break
+
+            try:
+                session = await self._get_session()
                 async with session.post(
-                    url, 
-                    json=payload, 
+                    url,
+                    json=payload,
                     timeout=aiohttp.ClientTimeout(total=15)
                 ) as response:
-                    result = await response.json()
+                    try:
+                        result = await response.json(content_type=None)
+                    except (ValueError, aiohttp.ContentTypeError):
+                        # 响应体不是 JSON（如代理返回的 HTML 错误页）
+                        result = None
+                if isinstance(result, dict):
+                    # 服务返回了 JSON 对象即视为可用，消息本身发送失败（HTTP 500）不计入熔断
+                    self._record_success()
                     if response.status == 200 and result.get("success"):
                         print(f"✅ 通知发送成功 [{msg_type}]: {openid}")
                         return result
-                    else:
-                        last_error = result.get("error", "未知错误")
-                        print(f"⚠️ 发送失败 (尝试 {attempt + 1}/{max_retries}): {last_error}")
-        except asyncio.TimeoutError:
-            last_error = "请求超时"
-            print(f"⚠️ 请求超时 (尝试 {attempt + 1}/{max_retries})")
-        except aiohttp.ClientError as e:
-            last_error = f"HTTP 请求失败: {e}"
-            print(f"⚠️ {last_error} (尝试 {attempt + 1}/{max_retries})")
-        except Exception as e:
-            last_error = str(e)
-            print(f"⚠️ 发送异常: {last_error} (尝试 {attempt + 1}/{max_retries})")
-        
-        if attempt < max_retries - 1:
-            await asyncio.sleep(1)
-    
-    print(f"❌ 通知发送失败 (重试{max_retries}次后): {last_error}")
-    return {"success": False, "error": last_error}
+                    last_error = result.get("error", "未知错误")
+                elif 200 <= response.status < 300:
+                    self._record_success()
+                    last_error = f"HTTP {response.status}: 响应不是 JSON 对象"
+                else:
+                    # 非 2xx 且不是 QQ bot 服务的 JSON 响应（如反向代理的 502 页面），视为服务不可用
+                    self._record_failure()
+                    last_error = f"HTTP {response.status}: 响应不是 JSON 对象"
+                print(f"⚠️ 发送失败 (尝试 {attempt + 1}/{max_retries}): {last_error}")
+                if response.status == 400:
+                    # 参数错误，重试也不会成功
+                    break
+            except asyncio.TimeoutError:
+                last_error = "请求超时"
+                self._record_failure()
+                print(f"⚠️ 请求超时 (尝试 {attempt + 1}/{max_retries})")
+            except aiohttp.ClientError as e:
+                last_error = f"HTTP 请求失败: {e}"
+                self._record_failure()
+                print(f"⚠️ {last_error} (尝试 {attempt + 1}/{max_retries})")
+            except Exception as e:
+                last_error = str(e)
+                self._record_failure()
+                print(f"⚠️ 发送异常: {last_error} (尝试 {attempt + 1}/{max_retries})")
+
+            if attempt < max_retries - 1:
+                await asyncio.sleep(1)
+
+        print(f"❌ 通知发送失败: {last_error}")
+        return {"success": False, "error": last_error}
+
+    async def send_many(self, messages: Iterable[Dict], max_retries: int = 3) -> List[dict]:
+        """
+        批量发送通知，最多 concurrency 条同时发送，共用连接池
+
+        Args:
+            messages: 每条为 {"openid": ..., "content": ..., "msg_type": "c2c"}
+
+        Returns:
+            list: 与 messages 顺序一致的发送结果
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send_one(message: Dict) -> dict:
+            async with semaphore:
+                return await self.send(message["openid"], message["content"],
+                                       message.get("msg_type", "c2c"), max_retries)
+
+        return list(await asyncio.gather(*(send_one(message) for message in messages)))
+
+
+push_client = QQPushClient()
+
+
+# ==================== 同步调用 ====================
+# 同步接口在一个常驻的后台事件循环中执行，连续调用复用同一个连接池，而不是每次 asyncio.run 新建
+
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _run_sync(coro):
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, daemon=True, name="QQPushLoop").start()
+            atexit.register(_close_sync_loop)
+    return asyncio.run_coroutine_threadsafe(coro, _sync_loop).result()
+
+
+def _close_sync_loop():
+    try:
+        asyncio.run_coroutine_threadsafe(push_client.close(), _sync_loop).result(timeout=5)
+    except Exception:
+        pass
+
+
+# ==================== 兼容接口 ====================
+
+async def check_service_health(max_retries: int = 3, retry_delay: float = 2.0) -> bool:
+    """检查 QQ bot HTTP 服务是否可用"""
+    return await push_client.health(max_retries, retry_delay)
+
+
+async def send_notification(openid: str, content: str, msg_type: str = "c2c", max_retries: int = 3) -> dict:
+    """通过 HTTP API 发送通知消息，支持自动重试"""
+    return await push_client.send(openid, content, msg_type, max_retries)
 
 
 async def send_notification_with_health_check(openid: str, content: str, msg_type: str = "c2c") -> dict:
-    """先检查服务健康状态，再发送通知"""
-    if not await check_service_health():
-        return {"success": False, "error": "QQ bot 服务不可用"}
-    
-    return await send_notification(openid, content, msg_type)
+    """发送通知；服务可用性由熔断器判断，不再在每条消息前单独请求 /health"""
+    return await push_client.send(openid, content, msg_type)
+
+
+async def send_notifications(messages: Iterable[Dict], max_retries: int = 3) -> List[dict]:
+    """批量发送通知，见 QQPushClient.send_many"""
+    return await push_client.send_many(messages, max_retries)
 
 
 async def push_c2c_message(openid: str, content: str) -> dict:
@@ -94,8 +300,16 @@ async def push_group_message(group_openid: str, content: str) -> dict:
     return await send_notification(group_openid, content, msg_type="group")
 
 
+def check_service_health_sync(max_retries: int = 3, retry_delay: float = 2.0) -> bool:
+    return _run_sync(push_client.health(max_retries, retry_delay))
+
+
 def send_notification_sync(openid: str, content: str, msg_type: str = "c2c") -> dict:
-    return asyncio.run(send_notification_with_health_check(openid, content, msg_type))
+    return _run_sync(push_client.send(openid, content, msg_type))
+
+
+def send_notifications_sync(messages: Iterable[Dict], max_retries: int = 3) -> List[dict]:
+    return _run_sync(push_client.send_many(list(messages), max_retries))
 
 
 async def main():
@@ -124,6 +338,7 @@ async def main():
     else:
         print("\n⚠️ 未设置 TARGET_GROUP_OPENID，跳过群聊推送")
 
+    await push_client.close()
     print("\n✅ 推送任务完成")
 
 
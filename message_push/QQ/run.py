@@ -27,7 +27,7 @@ import sys
 import asyncio
 import json
 import time
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from threading import Thread
 from datetime import datetime, timedelta
 
@@ -122,17 +122,27 @@ async def send_notification_with_retry(openid: str, content: str, msg_type: str
 class NotifyHandler(BaseHTTPRequestHandler):
     """HTTP 请求处理器"""
     
+    # HTTP/1.1 长连接：推送客户端连续发送多条通知时复用同一个连接，空闲超过 timeout 秒后断开
+    protocol_version = "HTTP/1.1"
+    timeout = 60
+    # 响应头和响应体分两次写出，长连接上需关闭 Nagle 算法，否则每个响应会被延迟确认拖慢约 40ms
+    disable_nagle_algorithm = True
+    # 所有通知在同一个事件循环中发送（由 run_http_server 创建），HTTP 客户端和锁都绑定在该循环上
+    loop = None
+    
     def log_message(self, format, *args):
         """自定义日志"""
         logger.info(f"[HTTP] {format % args}")
     
     def _send_json(self, status_code: int, data: dict):
         """发送 JSON 响应"""
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
         self.send_response(status_code)
         self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
         self.send_header("Access-Control-Allow-Origin", "*")
         self.end_headers()
-        self.wfile.write(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        self.wfile.write(body)
     
     def do_OPTIONS(self):
         """处理 CORS 预检请求"""
@@ -140,6 +150,7 @@ class NotifyHandler(BaseHTTPRequestHandler):
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Content-Length", "0")
         self.end_headers()
     
     def do_GET(self):
@@ -168,12 +179,9 @@ class NotifyHandler(BaseHTTPRequestHandler):
                     self._send_json(400, {"success": False, "error": "缺少参数: content"})
                     return
                 
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                result = loop.run_until_complete(
-                    send_notification_with_retry(openid, content, msg_type, max_retries=3)
-                )
-                loop.close()
+                result = asyncio.run_coroutine_threadsafe(
+                    send_notification_with_retry(openid, content, msg_type, max_retries=3), self.loop
+                ).result()
                 
                 if result["success"]:
                     self._send_json(200, result)
@@ -191,7 +199,10 @@ class NotifyHandler(BaseHTTPRequestHandler):
 
 def run_http_server():
     """在单独线程中运行 HTTP 服务器"""
-    server = HTTPServer((HTTP_HOST, HTTP_PORT), NotifyHandler)
+    loop = asyncio.new_event_loop()
+    Thread(target=loop.run_forever, daemon=True).start()
+    NotifyHandler.loop = loop
+    server = ThreadingHTTPServer((HTTP_HOST, HTTP_PORT), NotifyHandler)
     logger.info(f"🌐 HTTP API 服务已启动: http://{HTTP_HOST}:{HTTP_PORT}")
     logger.info(f"   健康检查: http://{HTTP_HOST}:{HTTP_PORT}/health")
     logger.info(f"   通知接口: POST http://{HTTP_HOST}:{HTTP_PORT}/api/notify")
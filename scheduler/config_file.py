@@ -0,0 +1,158 @@
+"""
+调度器配置文件读写模块
+Web 服务修改配置、调度器重载配置都通过这里：
+- 写入时先写同目录下的临时文件再原子替换，调度器任何时候读到的都是完整的文件
+- 读-改-写在咨询锁（config.json.lock，fcntl.flock）内进行，多个进程、线程同时修改不会互相覆盖
+- 版本号为文件内容的 MD5（与 ConfigWatcher 判断变化的摘要一致），用于 Web 接口的乐观并发控制
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，只做进程内互斥
+    fcntl = None
+
+try:
+    from .cron import build_trigger
+except ImportError:
+    from cron import build_trigger
+
+_thread_lock = threading.Lock()
+
+
+class ConfigConflictError(Exception):
+    """配置文件在读取之后已被修改（版本号不一致）"""
+
+    def __init__(self, current_version: Optional[str]):
+        super().__init__("配置已被修改，请刷新后重试")
+        self.current_version = current_version
+
+
+def config_version(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+def read_config(path) -> Tuple[dict, str]:
+    """
+    读取配置文件
+
+    Returns:
+        tuple: (配置, 版本号)
+    """
+    data = Path(path).read_bytes()
+    return json.loads(data.decode("utf-8")), config_version(data)
+
+
+def validate_config(config: dict):
+    """
+    检查配置结构、任务ID和调度参数
+
+    Raises:
+        ValueError: 配置无效
+    """
+    if not isinstance(config, dict):
+        raise ValueError("配置必须是 JSON 对象")
+    settings = config.get("settings", {})
+    tasks = config.get("tasks", [])
+    if not isinstance(settings, dict):
+        raise ValueError("settings 必须是 JSON 对象")
+    if not isinstance(tasks, list):
+        raise ValueError("tasks 必须是列表")
+
+    timezone = settings.get("timezone", "Asia/Shanghai")
+    seen = set()
+    for index, task in enumerate(tasks):
+        if not isinstance(task, dict):
+            raise ValueError(f"第 {index + 1} 个任务不是 JSON 对象")
+        task_id = task.get("id")
+        if not task_id or not isinstance(task_id, str):
+            raise ValueError(f"第 {index + 1} 个任务缺少 id")
+        if task_id in seen:
+            raise ValueError(f"任务ID重复: {task_id}")
+        seen.add(task_id)
+        if not task.get("command") or not isinstance(task["command"], str):
+            raise ValueError(f"任务 {task_id} 缺少 command")
+        timeout = task.get("timeout", 300)
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError(f"任务 {task_id} 的 timeout 无效: {timeout}")
+        try:
+            build_trigger(task.get("schedule", {}), timezone)
+        except Exception as e:
+            raise ValueError(f"任务 {task_id} 的调度配置无效: {e}")
+
+
+@contextmanager
+def config_lock(path):
+    """配置文件的独占咨询锁，锁文件为 <配置文件>.lock"""
+    lock_path = Path(str(path) + ".lock")
+    with _thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def write_config(path, config: dict) -> str:
+    """
+    原子写入配置文件，调用方需持有 config_lock
+
+    Returns:
+        str: 新的版本号
+    """
+    path = Path(path)
+    data = json.dumps(config, ensure_ascii=False, indent=2).encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # mkstemp 创建的文件权限为 0600，沿用原文件的权限
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    return config_version(data)
+
+
+def update_config(path, mutate: Callable[[dict], object], expected_version: Optional[str] = None):
+    """
+    在锁内读取配置、调用 mutate 原地修改、校验后原子写回
+
+    Args:
+        mutate: 修改配置的函数，返回值原样返回给调用方；抛出的异常会中止本次修改
+        expected_version: 调用方读取时的版本号，与当前文件不一致时拒绝修改
+
+    Returns:
+        tuple: (mutate 的返回值, 新的版本号)
+
+    Raises:
+        ConfigConflictError: 版本号不一致
+        ValueError: 修改后的配置校验失败
+    """
+    with config_lock(path):
+        config, version = read_config(path)
+        if expected_version and expected_version != version:
+            raise ConfigConflictError(version)
+        result = mutate(config)
+        validate_config(config)
+        return result, write_config(path, config)
@@ -0,0 +1,159 @@
+"""
+调度器控制通道
+调度器进程在本地 unix socket 上接收控制命令。Web 服务的"立即运行"和命令行 --run 通过它把任务提交给
+正在运行的调度器，与定时触发共用同一个执行器（并发限制、优先级、重试）、监控记录和日志管道
+
+协议：每个连接发送一行 JSON 请求 {"command": ..., 其他参数}，收到一行 JSON 响应，至少包含 success 和 message
+"""
+import json
+import logging
+import os
+import socket
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+DEFAULT_SOCKET_PATH = "scheduler/scheduler.sock"
+
+# 单个请求的读写超时（秒）
+REQUEST_TIMEOUT = 5
+# 请求最大长度
+MAX_REQUEST_SIZE = 64 * 1024
+
+
+class ControlUnavailable(Exception):
+    """调度器未运行，或当前平台不支持 unix socket"""
+
+
+def is_available() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def _read_line(conn: socket.socket) -> bytes:
+    data = b""
+    while b"\n" not in data:
+        chunk = conn.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_REQUEST_SIZE:
+            raise ValueError("请求过长")
+    return data.split(b"\n", 1)[0]
+
+
+def send_command(socket_path: str, command: str, timeout: float = REQUEST_TIMEOUT, **params) -> dict:
+    """
+    向调度器发送控制命令
+
+    Returns:
+        dict: 调度器的响应
+
+    Raises:
+        ControlUnavailable: 调度器未运行或无法连接
+    """
+    if not is_available():
+        raise ControlUnavailable("当前平台不支持 unix socket")
+    request = dict(params, command=command)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(timeout)
+            conn.connect(str(socket_path))
+            conn.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+            line = _read_line(conn)
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        raise ControlUnavailable(f"调度器未运行: {e}")
+    except OSError as e:
+        raise ControlUnavailable(f"无法连接调度器: {e}")
+    if not line:
+        raise ControlUnavailable("调度器未返回响应")
+    return json.loads(line.decode("utf-8"))
+
+
+class ControlServer(threading.Thread):
+    """
+    控制通道服务端
+
+    handler 接收请求 dict 并返回响应 dict；命令都只是提交或查询，处理很快，在同一线程中逐个处理连接
+    """
+
+    def __init__(self, socket_path: str, handler: Callable[[dict], dict]):
+        super().__init__(daemon=True, name="ControlServer")
+        self.socket_path = Path(socket_path)
+        self.handler = handler
+        self.logger = logging.getLogger("ControlServer")
+        self._sock: Optional[socket.socket] = None
+        self._stopped = threading.Event()
+
+    def start_serving(self) -> bool:
+        """
+        绑定 socket 并启动服务线程
+
+        Returns:
+            bool: 是否已启动；socket 正被其他调度器进程使用或平台不支持时返回 False
+        """
+        if not is_available():
+            self.logger.info("当前平台不支持 unix socket，控制通道未启用")
+            return False
+        if self.socket_path.exists():
+            try:
+                send_command(str(self.socket_path), "ping", timeout=1)
+                self.logger.warning(f"控制通道 {self.socket_path} 已被其他调度器进程使用，本进程不启用")
+                return False
+            except ControlUnavailable:
+                # 上次进程异常退出留下的 socket 文件
+                self.socket_path.unlink()
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(self.socket_path))
+        # 只允许同一用户（和同组）连接
+        os.chmod(self.socket_path, 0o660)
+        sock.listen(16)
+        sock.settimeout(1.0)
+        self._sock = sock
+        self.start()
+        self.logger.info(f"控制通道已启动: {self.socket_path}")
+        return True
+
+    def stop(self):
+        self._stopped.set()
+        if self._sock is None:
+            return
+        if self.is_alive():
+            self.join(timeout=2)
+        self._sock.close()
+        try:
+            self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+        self.logger.info("控制通道已停止")
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                if self._stopped.is_set():
+                    return
+                raise
+            with conn:
+                self._handle_connection(conn)
+
+    def _handle_connection(self, conn: socket.socket):
+        try:
+            conn.settimeout(REQUEST_TIMEOUT)
+            try:
+                request = json.loads(_read_line(conn).decode("utf-8"))
+                if not isinstance(request, dict):
+                    raise ValueError("请求必须是 JSON 对象")
+                response = self.handler(request)
+            except ValueError as e:
+                response = {"success": False, "error": "bad_request", "message": f"无效的请求: {e}"}
+            except Exception as e:
+                self.logger.error(f"处理控制命令失败: {e}")
+                response = {"success": False, "error": "internal", "message": str(e)}
+            conn.sendall(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        except OSError as e:
+            self.logger.warning(f"控制连接异常: {e}")
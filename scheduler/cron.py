@@ -0,0 +1,224 @@
+"""
+调度触发器模块
+提供 cron 表达式解析以及 cron / daily / interval 三种触发器，
+每个触发器根据给定时间计算下一次触发时间（带时区）
+"""
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+import pytz
+
+
+# 字段范围: (最小值, 最大值)
+_FIELD_RANGES = [
+    (0, 59),   # 分钟
+    (0, 23),   # 小时
+    (1, 31),   # 日
+    (1, 12),   # 月
+    (0, 7),    # 星期（0 和 7 都表示周日）
+]
+
+_MONTH_NAMES = {name: i + 1 for i, name in enumerate(
+    ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"])}
+_DOW_NAMES = {name: i for i, name in enumerate(["SUN", "MON", "TUE", "WED", "THU", "FRI", "SAT"])}
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# 向后搜索的最大年数，超过则认为表达式永远不会触发（如 2 月 30 日）
+_MAX_SEARCH_YEARS = 5
+
+
+def _parse_value(value: str, names: Optional[dict]) -> int:
+    upper = value.upper()
+    if names and upper in names:
+        return names[upper]
+    if not value.isdigit():
+        raise ValueError(f"无法识别的取值: {value}")
+    return int(value)
+
+
+def _parse_field(field: str, min_value: int, max_value: int, names: Optional[dict] = None) -> Set[int]:
+    """解析单个 cron 字段，支持 *、列表(,)、范围(-)和步长(/)"""
+    values = set()
+    for part in field.split(","):
+        if not part:
+            raise ValueError(f"字段 '{field}' 含有空项")
+
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            if not step_str.isdigit() or int(step_str) == 0:
+                raise ValueError(f"无效的步长: {step_str}")
+            step = int(step_str)
+
+        if part == "*":
+            start, end = min_value, max_value
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start, end = _parse_value(start_str, names), _parse_value(end_str, names)
+        else:
+            start = _parse_value(part, names)
+            # "5/15" 表示从 5 开始每 15 取一次
+            end = max_value if step > 1 else start
+
+        if start < min_value or end > max_value or start > end:
+            raise ValueError(f"取值超出范围 [{min_value}-{max_value}]: {part}")
+
+        values.update(range(start, end + 1, step))
+    return values
+
+
+def _localize(tz, naive: datetime) -> datetime:
+    if hasattr(tz, "localize"):
+        return tz.normalize(tz.localize(naive))
+    return naive.replace(tzinfo=tz)
+
+
+class CronExpression:
+    """
+    5 字段 cron 表达式: 分 时 日 月 星期
+
+    日和星期同时被限定（都不以 * 开头）时，任一匹配即触发，与标准 cron 行为一致
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        expanded = _MACROS.get(self.expression.lower(), self.expression)
+        parts = expanded.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 表达式需要 5 个字段: {expression}")
+
+        minute, hour, day, month, day_of_week = parts
+        self.minutes = _parse_field(minute, *_FIELD_RANGES[0])
+        self.hours = _parse_field(hour, *_FIELD_RANGES[1])
+        self.days = _parse_field(day, *_FIELD_RANGES[2])
+        self.months = _parse_field(month, *_FIELD_RANGES[3], names=_MONTH_NAMES)
+        self.days_of_week = {d % 7 for d in _parse_field(day_of_week, *_FIELD_RANGES[4], names=_DOW_NAMES)}
+        self._day_restricted = not day.startswith("*")
+        self._dow_restricted = not day_of_week.startswith("*")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        # Python 中周一为 0，cron 中周日为 0
+        dow_ok = (moment.weekday() + 1) % 7 in self.days_of_week
+        if self._day_restricted and self._dow_restricted:
+            return day_ok or dow_ok
+        return day_ok and dow_ok
+
+    def next_fire(self, after: datetime, tz) -> datetime:
+        """
+        计算严格晚于 after 的下一次触发时间
+
+        Args:
+            after: 带时区的起始时间
+            tz: 表达式所在时区
+
+        Returns:
+            datetime: 带时区的下一次触发时间
+        """
+        local_after = after.astimezone(tz)
+        moment = local_after.replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        limit_year = moment.year + _MAX_SEARCH_YEARS
+
+        while moment.year <= limit_year:
+            if moment.month not in self.months:
+                year, month = (moment.year + 1, 1) if moment.month == 12 else (moment.year, moment.month + 1)
+                moment = datetime(year, month, 1)
+                continue
+            if not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+                continue
+            if moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+                continue
+
+            fire_time = _localize(tz, moment)
+            # 夏令时切换时本地时间可能不存在或重复，确保结果严格递增
+            if fire_time > after:
+                return fire_time
+            moment += timedelta(minutes=1)
+
+        raise ValueError(f"cron 表达式在 {_MAX_SEARCH_YEARS} 年内不会触发: {self.expression}")
+
+
+class CronTrigger:
+    def __init__(self, expression: str, tz):
+        self.cron = CronExpression(expression)
+        self.tz = tz
+
+    def next_fire(self, after: datetime) -> datetime:
+        return self.cron.next_fire(after, self.tz)
+
+    def describe(self) -> str:
+        return f"cron: {self.cron.expression}"
+
+
+class DailyTrigger:
+    def __init__(self, time_str: str, tz):
+        parts = time_str.split(":")
+        if len(parts) not in (2, 3) or not all(p.isdigit() for p in parts):
+            raise ValueError(f"无效的时间格式: {time_str}")
+        self.hour, self.minute = int(parts[0]), int(parts[1])
+        self.second = int(parts[2]) if len(parts) == 3 else 0
+        if not (0 <= self.hour <= 23 and 0 <= self.minute <= 59 and 0 <= self.second <= 59):
+            raise ValueError(f"无效的时间: {time_str}")
+        self.time_str = time_str
+        self.tz = tz
+
+    def next_fire(self, after: datetime) -> datetime:
+        local_date = after.astimezone(self.tz).date()
+        for offset in range(3):
+            day = local_date + timedelta(days=offset)
+            fire_time = _localize(self.tz, datetime(day.year, day.month, day.day, self.hour, self.minute, self.second))
+            if fire_time > after:
+                return fire_time
+        raise ValueError(f"无法计算下一次触发时间: {self.time_str}")
+
+    def describe(self) -> str:
+        return f"每天 {self.time_str}"
+
+
+class IntervalTrigger:
+    def __init__(self, minutes: float):
+        if minutes <= 0:
+            raise ValueError(f"间隔必须大于 0: {minutes}")
+        self.interval = timedelta(minutes=minutes)
+        self.minutes = minutes
+
+    def next_fire(self, after: datetime) -> datetime:
+        return after + self.interval
+
+    def describe(self) -> str:
+        return f"每 {self.minutes} 分钟"
+
+
+def build_trigger(schedule_config: dict, timezone: str):
+    """
+    根据任务的 schedule 配置创建触发器
+
+    Raises:
+        ValueError: 调度类型未知或参数无效
+    """
+    tz = pytz.timezone(timezone)
+    schedule_type = schedule_config.get('type')
+
+    if schedule_type == 'cron':
+        # 兼容 README 中使用的 "cron" 字段名
+        expression = schedule_config.get('expression') or schedule_config.get('cron', '')
+        return CronTrigger(expression, tz)
+    if schedule_type == 'interval':
+        return IntervalTrigger(schedule_config.get('minutes', 60))
+    if schedule_type == 'daily':
+        return DailyTrigger(schedule_config.get('time', '00:00'), tz)
+    raise ValueError(f"未知的调度类型: {schedule_type}")
@@ -0,0 +1,275 @@
+"""
+任务执行历史存储模块
+使用 sqlite（WAL 模式）保存任务执行记录，调度器和 Web 进程共享同一个数据库文件：
+追加记录只写一行，按任务、状态和时间范围的查询走索引
+同一数据库中的 running 表登记各进程正在运行的任务，运行方定期写入心跳，
+进程崩溃后心跳过期的任务会被移入历史记录
+"""
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT NOT NULL,
+    task_name TEXT NOT NULL DEFAULT '',
+    task_type TEXT NOT NULL DEFAULT 'scheduled',
+    status TEXT NOT NULL,
+    pid INTEGER,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    duration REAL,
+    output TEXT NOT NULL DEFAULT '',
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_executions_start ON executions (start_time);
+-- 含 duration 的覆盖索引，分位数查询无需回表
+CREATE INDEX IF NOT EXISTS idx_executions_task_start ON executions (task_id, start_time, duration);
+CREATE INDEX IF NOT EXISTS idx_executions_status_start ON executions (status, start_time);
+CREATE TABLE IF NOT EXISTS running (
+    owner TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    task_name TEXT NOT NULL DEFAULT '',
+    task_type TEXT NOT NULL DEFAULT 'scheduled',
+    pid INTEGER,
+    start_time REAL NOT NULL,
+    heartbeat REAL NOT NULL,
+    PRIMARY KEY (owner, task_id)
+);
+"""
+
+# 资源统计列（调度器通过 /proc 采样），旧数据库启动时自动补列
+RESOURCE_COLUMNS = {
+    "cpu_time": "REAL",
+    "peak_rss": "INTEGER",
+    "read_bytes": "INTEGER",
+    "write_bytes": "INTEGER",
+}
+
+# 单条记录保存的输出和错误信息的最大长度
+MAX_TEXT_LENGTH = 1000
+
+
+class ExecutionStore:
+    """
+    任务执行历史存储
+
+    每个线程使用独立的连接；WAL 模式下读写互不阻塞，多个进程可以同时读写
+    """
+
+    def __init__(self, db_path: str = "scheduler/task_history.db"):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(executions)")}
+        for name, column_type in RESOURCE_COLUMNS.items():
+            if name not in columns:
+                conn.execute(f"ALTER TABLE executions ADD COLUMN {name} {column_type}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, task_id: str, task_name: str, task_type: str, status: str, start_time: float,
+            end_time: Optional[float] = None, pid: Optional[int] = None, output: str = "", error: str = "",
+            resources: Optional[Dict] = None) -> int:
+        """
+        追加一条执行记录
+
+        Args:
+            resources: 资源统计，键为 RESOURCE_COLUMNS 中的列名
+
+        Returns:
+            int: 记录ID
+        """
+        duration = end_time - start_time if end_time is not None else None
+        resources = resources or {}
+        cursor = self._connect().execute(
+            "INSERT INTO executions (task_id, task_name, task_type, status, pid, start_time, end_time, duration, "
+            "output, error, cpu_time, peak_rss, read_bytes, write_bytes) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (task_id, task_name, task_type, status, pid, start_time, end_time, duration,
+             (output or "")[:MAX_TEXT_LENGTH], (error or "")[:MAX_TEXT_LENGTH],
+             *(resources.get(name) for name in RESOURCE_COLUMNS)),
+        )
+        return cursor.lastrowid
+
+    @staticmethod
+    def _where(task_id: Optional[str], status: Optional[str], since: Optional[float], until: Optional[float]):
+        clauses, params = [], []
+        if task_id:
+            clauses.append("task_id = ?")
+            params.append(task_id)
+        if status:
+            statuses = [status] if isinstance(status, str) else list(status)
+            clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if since is not None:
+            clauses.append("start_time >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("start_time < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, task_id: Optional[str] = None, status=None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        按任务、状态（单个或列表）和开始时间范围查询，按开始时间从新到旧返回
+        """
+        where, params = self._where(task_id, status, since, until)
+        rows = self._connect().execute(
+            f"SELECT * FROM executions{where} ORDER BY start_time DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, task_id: Optional[str] = None, status=None, since: Optional[float] = None,
+              until: Optional[float] = None) -> int:
+        where, params = self._where(task_id, status, since, until)
+        return self._connect().execute(f"SELECT COUNT(*) FROM executions{where}", params).fetchone()[0]
+
+    def duration_percentile(self, task_id: str, percentile: float, since: Optional[float] = None) -> Optional[float]:
+        """
+        计算任务执行时长的分位数（最近邻法），如 percentile=95 表示 p95
+
+        Returns:
+            float: 秒数；没有记录时返回 None
+        """
+        where, params = self._where(task_id, None, since, None)
+        where += (" AND " if where else " WHERE ") + "duration IS NOT NULL"
+        conn = self._connect()
+        total = conn.execute(f"SELECT COUNT(*) FROM executions{where}", params).fetchone()[0]
+        if total == 0:
+            return None
+        index = max(0, min(total - 1, math.ceil(percentile / 100 * total) - 1))
+        row = conn.execute(
+            f"SELECT duration FROM executions{where} ORDER BY duration LIMIT 1 OFFSET ?", params + [index]
+        ).fetchone()
+        return round(row[0], 3) if row else None
+
+    def stats(self, task_id: str, since: Optional[float] = None) -> Dict:
+        """任务在时间范围内的执行次数、成功率和时长统计"""
+        where, params = self._where(task_id, None, since, None)
+        row = self._connect().execute(
+            f"SELECT COUNT(*) AS total, SUM(status = 'completed') AS completed, "
+            f"AVG(duration) AS avg_duration, MAX(duration) AS max_duration, "
+            f"AVG(cpu_time) AS avg_cpu_time, MAX(peak_rss) AS max_peak_rss FROM executions{where}",
+            params,
+        ).fetchone()
+        total = row["total"] or 0
+        completed = row["completed"] or 0
+        return {
+            "task_id": task_id,
+            "total": total,
+            "completed": completed,
+            "success_rate": round(completed / total, 4) if total else None,
+            "avg_duration": round(row["avg_duration"], 3) if row["avg_duration"] is not None else None,
+            "max_duration": round(row["max_duration"], 3) if row["max_duration"] is not None else None,
+            "p50_duration": self.duration_percentile(task_id, 50, since),
+            "p95_duration": self.duration_percentile(task_id, 95, since),
+            "avg_cpu_time": round(row["avg_cpu_time"], 3) if row["avg_cpu_time"] is not None else None,
+            "max_peak_rss": row["max_peak_rss"],
+        }
+
+    # ==================== 运行中任务登记 ====================
+
+    def register_running(self, owner: str, task_id: str, task_name: str, task_type: str,
+                         start_time: float, pid: Optional[int] = None):
+        """登记正在运行的任务，owner 为运行方进程标识"""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO running (owner, task_id, task_name, task_type, pid, start_time, heartbeat) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (owner, task_id, task_name, task_type, pid, start_time, time.time()),
+        )
+
+    def update_running_pid(self, owner: str, task_id: str, pid: int):
+        self._connect().execute(
+            "UPDATE running SET pid = ?, heartbeat = ? WHERE owner = ? AND task_id = ?",
+            (pid, time.time(), owner, task_id),
+        )
+
+    def heartbeat(self, owner: str) -> int:
+        """刷新该进程所有运行中任务的心跳"""
+        return self._connect().execute(
+            "UPDATE running SET heartbeat = ? WHERE owner = ?", (time.time(), owner)
+        ).rowcount
+
+    def finish_running(self, owner: str, task_id: str, record: Dict) -> int:
+        """在同一事务中注销运行中任务并写入执行记录"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM running WHERE owner = ? AND task_id = ?", (owner, task_id))
+            record_id = self.add(**record)
+            conn.execute("COMMIT")
+            return record_id
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def list_running(self, task_id: Optional[str] = None) -> List[Dict]:
+        """所有进程正在运行的任务，按开始时间排序"""
+        sql, params = "SELECT * FROM running", []
+        if task_id:
+            sql += " WHERE task_id = ?"
+            params.append(task_id)
+        rows = self._connect().execute(sql + " ORDER BY start_time", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def expire_running(self, heartbeat_before: float, error: str = "") -> int:
+        """
+        将心跳早于 heartbeat_before 的任务（运行方进程已退出）移入历史记录，状态记为 error
+
+        Returns:
+            int: 过期的任务数
+        """
+        conn = self._connect()
+        # 常见情况下没有过期任务，先用只读查询判断，避免每次都获取写锁
+        if conn.execute("SELECT 1 FROM running WHERE heartbeat < ? LIMIT 1", (heartbeat_before,)).fetchone() is None:
+            return 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute("SELECT * FROM running WHERE heartbeat < ?", (heartbeat_before,)).fetchall()
+            for row in rows:
+                self.add(task_id=row["task_id"], task_name=row["task_name"], task_type=row["task_type"],
+                         status="error", start_time=row["start_time"], end_time=row["heartbeat"],
+                         pid=row["pid"], error=error)
+            conn.execute("DELETE FROM running WHERE heartbeat < ?", (heartbeat_before,))
+            conn.execute("COMMIT")
+            return len(rows)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def prune(self, before: float) -> int:
+        """删除开始时间早于 before 的记录"""
+        return self._connect().execute("DELETE FROM executions WHERE start_time < ?", (before,)).rowcount
+
+    def clear(self):
+        self._connect().execute("DELETE FROM executions")
+
+    def is_empty(self) -> bool:
+        return self._connect().execute("SELECT 1 FROM executions LIMIT 1").fetchone() is None
+
+    def add_many(self, records: List[Dict]):
+        """批量导入记录（用于从旧的 JSON 历史文件迁移）"""
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            for record in records:
+                self.add(**record)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
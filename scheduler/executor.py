@@ -0,0 +1,200 @@
+"""
+任务执行器模块
+有界线程池 + 优先级队列，限制同时运行的任务总数（max_concurrent_tasks），
+并支持按并发组（如 "llm"、"scrape"）分别限制并发数
+"""
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict
+from threading import Thread, Condition
+from typing import Callable, Dict, List, Optional, Set
+
+
+class TaskExecutor:
+    """
+    有界任务执行器
+
+    - 队列按任务优先级排序（priority 数值越大越先执行），同优先级按提交顺序
+    - 某个并发组已满时，跳过该组任务，继续调度其他组的任务
+    - 同一任务在排队或运行中时不会重复提交
+    - 任务结束并释放并发名额后调用 on_done(runner, attempt, status, task_type)，由调用方决定是否重试
+    """
+
+    def __init__(self, max_workers: int = 3, group_limits: Optional[Dict[str, int]] = None,
+                 on_done: Optional[Callable] = None):
+        self.logger = logging.getLogger("TaskExecutor")
+        self.max_workers = max(1, int(max_workers))
+        self.group_limits: Dict[str, int] = dict(group_limits or {})
+        self.on_done = on_done
+
+        # 队列条目: (-优先级, 序号, runner, 入队时间, 第几次尝试, 触发方式)
+        self._queue: List[tuple] = []
+        self._cond = Condition()
+        self._seq = itertools.count()
+        self._workers: List[Thread] = []
+        self._stopped = False
+
+        self._running_count = 0
+        self._group_running: Dict[str, int] = defaultdict(int)
+        self._active_ids: Set[str] = set()   # 排队中或运行中
+        self._running_ids: Set[str] = set()
+
+        # 统计信息
+        self._submitted = 0
+        self._completed = 0
+        self._skipped = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._last_wait: Dict[str, float] = {}
+
+    def configure(self, max_workers: int, group_limits: Optional[Dict[str, int]] = None):
+        """更新并发限制（配置重载时调用），正在运行的任务不受影响"""
+        with self._cond:
+            self.max_workers = max(1, int(max_workers))
+            self.group_limits = dict(group_limits or {})
+            self._ensure_workers()
+            self._cond.notify_all()
+
+    def submit(self, runner, attempt: int = 1, task_type: str = "scheduled") -> bool:
+        """
+        提交任务到队列
+
+        Args:
+            runner: TaskRunner
+            attempt: 第几次尝试，重试时大于 1
+            task_type: 触发方式，scheduled（定时）或 manual（手动），记录到任务监控
+
+        Returns:
+            bool: 已入队返回 True；任务已在排队或运行中返回 False
+        """
+        task_id = runner.task.id
+        with self._cond:
+            if task_id in self._active_ids:
+                self._skipped += 1
+                return False
+
+            self._active_ids.add(task_id)
+            heapq.heappush(self._queue, (-runner.task.priority, next(self._seq), runner, time.time(), attempt,
+                                         task_type))
+            self._submitted += 1
+            self._stopped = False
+            self._ensure_workers()
+            self._cond.notify()
+        return True
+
+    def shutdown(self):
+        """停止分发新任务并丢弃队列，正在运行的任务继续执行到结束"""
+        with self._cond:
+            self._stopped = True
+            for _, _, runner, _, _, _ in self._queue:
+                self._active_ids.discard(runner.task.id)
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def is_queued(self, task_id: str) -> bool:
+        with self._cond:
+            return task_id in self._active_ids and task_id not in self._running_ids
+
+    def get_last_wait(self, task_id: str) -> Optional[float]:
+        with self._cond:
+            return self._last_wait.get(task_id)
+
+    def get_stats(self) -> dict:
+        """获取队列深度、等待时间等统计信息"""
+        with self._cond:
+            queue_by_group: Dict[str, int] = defaultdict(int)
+            for _, _, runner, _, _, _ in self._queue:
+                queue_by_group[runner.task.group or "default"] += 1
+            started = self._completed + self._running_count
+            return {
+                "max_concurrent_tasks": self.max_workers,
+                "group_limits": dict(self.group_limits),
+                "running": self._running_count,
+                "running_by_group": {g: n for g, n in self._group_running.items() if n},
+                "queue_depth": len(self._queue),
+                "queue_depth_by_group": dict(queue_by_group),
+                "oldest_wait_seconds": round(time.time() - min(e[3] for e in self._queue), 3) if self._queue else 0,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "skipped": self._skipped,
+                "avg_wait_seconds": round(self._wait_total / started, 3) if started else 0,
+                "max_wait_seconds": round(self._wait_max, 3),
+            }
+
+    def _ensure_workers(self):
+        """调用方需持有 _cond"""
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = Thread(target=self._worker_loop, name=f"TaskWorker-{len(self._workers) + 1}", daemon=True)
+            self._workers.append(worker)
+            worker.start()
+
+    def _take_next(self) -> Optional[tuple]:
+        """取出优先级最高且所在并发组未满的任务，调用方需持有 _cond"""
+        if self._running_count >= self.max_workers:
+            return None
+
+        skipped = []
+        chosen = None
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            group = entry[2].task.group
+            limit = self.group_limits.get(group) if group else None
+            if limit is not None and self._group_running[group] >= limit:
+                skipped.append(entry)
+                continue
+            chosen = entry
+            break
+
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return chosen
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                entry = None
+                while not self._stopped:
+                    entry = self._take_next()
+                    if entry is not None:
+                        break
+                    self._cond.wait()
+                if entry is None:
+                    return
+
+                _, _, runner, enqueued_at, attempt, task_type = entry
+                task = runner.task
+                wait_seconds = time.time() - enqueued_at
+                self._running_count += 1
+                if task.group:
+                    self._group_running[task.group] += 1
+                self._running_ids.add(task.id)
+                self._wait_total += wait_seconds
+                self._wait_max = max(self._wait_max, wait_seconds)
+                self._last_wait[task.id] = round(wait_seconds, 3)
+
+            if wait_seconds >= 1:
+                self.logger.info(f"任务 {task.name} 排队等待 {wait_seconds:.1f} 秒后开始执行")
+
+            status = "error"
+            try:
+                status = runner.run(attempt, task_type)
+            except Exception as e:
+                self.logger.error(f"任务 {task.name} 执行异常: {e}")
+            finally:
+                with self._cond:
+                    self._running_count -= 1
+                    if task.group:
+                        self._group_running[task.group] -= 1
+                    self._running_ids.discard(task.id)
+                    self._active_ids.discard(task.id)
+                    self._completed += 1
+                    self._cond.notify_all()
+
+            if self.on_done:
+                try:
+                    self.on_done(runner, attempt, status, task_type)
+                except Exception as e:
+                    self.logger.error(f"任务 {task.name} 完成回调异常: {e}")
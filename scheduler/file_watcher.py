@@ -0,0 +1,112 @@
+"""
+文件变化监听模块
+Linux 下通过 inotify（ctypes 调用 libc，无需额外依赖）监听配置文件所在目录，
+文件写入完成或被替换（编辑器的原子保存）时立即得到通知；其他平台由调用方退回轮询
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+from pathlib import Path
+from typing import Optional
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+
+# 只关心写入完成和文件替换，不监听 IN_MODIFY，避免同目录下持续写入的日志文件频繁唤醒
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class WatcherClosed(Exception):
+    """被监听的目录已删除或移动，inotify 监听失效"""
+
+
+class InotifyWatcher:
+    """
+    监听单个文件的 inotify 封装
+
+    监听的是文件所在目录而非文件本身，这样文件被重命名替换后仍能收到事件
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path).resolve()
+        self.filename = os.fsencode(self.path.name)
+        self.logger = logging.getLogger("InotifyWatcher")
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+
+        wd = libc.inotify_add_watch(self._fd, os.fsencode(str(self.path.parent)), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"无法监听目录: {self.path.parent}")
+
+    @staticmethod
+    def is_available() -> bool:
+        return sys.platform.startswith("linux")
+
+    def wait(self, timeout: float) -> bool:
+        """
+        等待目标文件发生变化
+
+        Returns:
+            bool: 超时前目标文件有变化返回 True
+
+        Raises:
+            WatcherClosed: 被监听的目录已失效
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return False
+        return self.drain()
+
+    def drain(self) -> bool:
+        """读取并清空已排队的事件，返回其中是否包含目标文件的变化"""
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                return changed
+            if not data:
+                return changed
+
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + _EVENT_HEADER.size: offset + _EVENT_HEADER.size + name_len].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + name_len
+
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    raise WatcherClosed(str(self.path.parent))
+                if name == self.filename:
+                    changed = True
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(path: Path) -> Optional[InotifyWatcher]:
+    """创建 inotify 监听，平台不支持或初始化失败时返回 None"""
+    if not InotifyWatcher.is_available():
+        return None
+    try:
+        return InotifyWatcher(path)
+    except OSError as e:
+        logging.getLogger("InotifyWatcher").warning(f"inotify 初始化失败，改用轮询: {e}")
+        return None
@@ -0,0 +1,249 @@
+"""
+多节点调度租约模块
+多台机器同时运行调度器时，通过共享的 sqlite 文件选出唯一的主节点：
+- 主节点持有带过期时间的租约，并定期续约；主节点宕机后，备用节点在租约过期后接管
+- 每次接管租约时 fencing token 加一，分发任务前以当前 token 认领本次触发，
+  已失去租约的旧主节点（如进程被挂起后恢复）无法再认领，保证每次触发只执行一次
+- 各任务最近一次认领的计划触发时间也保存在共享文件中，新主节点据此补跑和对齐间隔任务，
+  而不是依赖本节点的状态文件
+"""
+import logging
+import os
+import socket
+import sqlite3
+import time
+from typing import Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leader (
+    name TEXT PRIMARY KEY,
+    node_id TEXT NOT NULL,
+    token INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fires (
+    task_id TEXT NOT NULL,
+    fire_time REAL NOT NULL,
+    node_id TEXT NOT NULL,
+    token INTEGER NOT NULL,
+    claimed_at REAL NOT NULL,
+    PRIMARY KEY (task_id, fire_time)
+);
+-- 各任务最近一次认领的计划触发时间（重试不计入）
+CREATE TABLE IF NOT EXISTS last_fires (
+    task_id TEXT PRIMARY KEY,
+    fire_time REAL NOT NULL
+);
+"""
+
+_LEADER_NAME = "scheduler"
+
+# 认领记录保留时间（秒）
+_FIRE_RETENTION = 7 * 24 * 3600
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SchedulerLease:
+    """
+    基于 sqlite 的主节点租约
+
+    所有读写都在 BEGIN IMMEDIATE 事务中完成，多个进程通过 sqlite 的文件锁互斥；
+    sqlite 文件需放在所有节点都能访问且支持文件锁的存储上
+    """
+
+    def __init__(self, db_path: str, node_id: Optional[str] = None, ttl: float = 15):
+        self.db_path = db_path
+        self.node_id = node_id or default_node_id()
+        self.ttl = ttl
+        self.token: Optional[int] = None
+        self._expires_at = 0.0
+        self.logger = logging.getLogger("SchedulerLease")
+
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+
+    @property
+    def is_leader(self) -> bool:
+        """本地判断是否仍持有租约（不访问数据库）"""
+        return self.token is not None and time.time() < self._expires_at
+
+    def try_acquire(self) -> Optional[int]:
+        """
+        获取或续约主节点租约
+
+        Returns:
+            int: 持有租约时返回 fencing token，否则返回 None
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT node_id, token, expires_at FROM leader WHERE name = ?", (_LEADER_NAME,)
+            ).fetchone()
+
+            if row is None:
+                token = 1
+                conn.execute(
+                    "INSERT INTO leader (name, node_id, token, expires_at) VALUES (?, ?, ?, ?)",
+                    (_LEADER_NAME, self.node_id, token, now + self.ttl),
+                )
+            else:
+                holder, current_token, expires_at = row
+                if holder == self.node_id and current_token == self.token and expires_at > now:
+                    token = current_token
+                elif expires_at <= now:
+                    token = current_token + 1
+                else:
+                    conn.execute("COMMIT")
+                    self.token = None
+                    return None
+                conn.execute(
+                    "UPDATE leader SET node_id = ?, token = ?, expires_at = ? WHERE name = ?",
+                    (self.node_id, token, now + self.ttl, _LEADER_NAME),
+                )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            self.logger.error(f"租约续约失败: {e}")
+            self.token = None
+            return None
+        finally:
+            conn.close()
+
+        self.token = token
+        self._expires_at = now + self.ttl
+        return token
+
+    def _holds_lease(self, conn: sqlite3.Connection, now: float) -> bool:
+        """在事务中确认租约仍由本节点以当前 token 持有，否则清除本地 token"""
+        row = conn.execute(
+            "SELECT node_id, token, expires_at FROM leader WHERE name = ?", (_LEADER_NAME,)
+        ).fetchone()
+        if row is None or row[0] != self.node_id or row[1] != self.token or row[2] <= now:
+            self.token = None
+            return False
+        return True
+
+    def claim_fire(self, task_id: str, fire_time: float, scheduled: bool = True) -> bool:
+        """
+        以当前 fencing token 认领一次触发
+
+        Args:
+            scheduled: 是否为计划触发（含补跑）；计划触发认领成功后同时更新该任务最近一次触发时间
+
+        Returns:
+            bool: 本节点仍是主节点且该次触发尚未被认领时返回 True
+        """
+        if self.token is None:
+            return False
+
+        now = time.time()
+        fire_time = round(fire_time, 3)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if not self._holds_lease(conn, now):
+                conn.execute("COMMIT")
+                return False
+
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO fires (task_id, fire_time, node_id, token, claimed_at) VALUES (?, ?, ?, ?, ?)",
+                (task_id, fire_time, self.node_id, self.token, now),
+            )
+            claimed = cursor.rowcount == 1
+            if claimed and scheduled:
+                conn.execute(
+                    "INSERT INTO last_fires (task_id, fire_time) VALUES (?, ?) "
+                    "ON CONFLICT (task_id) DO UPDATE SET fire_time = MAX(fire_time, excluded.fire_time)",
+                    (task_id, fire_time),
+                )
+            conn.execute("COMMIT")
+            return claimed
+        except sqlite3.Error as e:
+            self.logger.error(f"认领任务触发失败: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def verify(self) -> bool:
+        """
+        访问数据库确认本节点仍是主节点（本地 is_leader 可能已过时，如进程曾被挂起）
+
+        Returns:
+            bool: 租约仍由本节点以当前 token 持有时返回 True
+        """
+        if self.token is None:
+            return False
+        conn = self._connect()
+        try:
+            return self._holds_lease(conn, time.time())
+        except sqlite3.Error as e:
+            self.logger.error(f"检查租约失败: {e}")
+            return False
+        finally:
+            conn.close()
+
+    def holder(self) -> Optional[str]:
+        """当前持有有效租约的节点，没有时返回 None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT node_id FROM leader WHERE name = ? AND expires_at > ?", (_LEADER_NAME, time.time())
+            ).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            self.logger.error(f"读取租约失败: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def get_last_fires(self) -> Dict[str, float]:
+        """
+        各任务最近一次认领的计划触发时间（所有节点共享）
+
+        Returns:
+            dict: 任务ID -> 触发时间戳；读取失败时返回空字典
+        """
+        conn = self._connect()
+        try:
+            return dict(conn.execute("SELECT task_id, fire_time FROM last_fires").fetchall())
+        except sqlite3.Error as e:
+            self.logger.error(f"读取共享触发记录失败: {e}")
+            return {}
+        finally:
+            conn.close()
+
+    def release(self):
+        """主动释放租约（正常停止时调用），备用节点下一次续约即可接管"""
+        if self.token is None:
+            return
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE leader SET expires_at = 0 WHERE name = ? AND node_id = ? AND token = ?",
+                (_LEADER_NAME, self.node_id, self.token),
+            )
+        except sqlite3.Error as e:
+            self.logger.error(f"释放租约失败: {e}")
+        finally:
+            conn.close()
+            self.token = None
+
+    def prune(self):
+        """清理过期的触发认领记录"""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM fires WHERE claimed_at < ?", (time.time() - _FIRE_RETENTION,))
+        except sqlite3.Error as e:
+            self.logger.error(f"清理触发记录失败: {e}")
+        finally:
+            conn.close()
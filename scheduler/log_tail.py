@@ -0,0 +1,86 @@
+"""
+日志尾部读取模块
+从文件末尾按块反向读取，获取最后 N 行的开销只与 N 行的长度有关，与文件总大小无关
+"""
+import os
+from typing import Iterator, Optional
+
+# 每次向前读取的块大小
+BLOCK_SIZE = 64 * 1024
+
+
+def _iter_reverse_blocks(f, block_size: int, end_offset: Optional[int] = None) -> Iterator[bytes]:
+    f.seek(0, os.SEEK_END)
+    position = f.tell() if end_offset is None else min(end_offset, f.tell())
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        yield f.read(read_size)
+
+
+def tail_lines(path: str, lines: int = 100, encoding: str = "utf-8", block_size: int = BLOCK_SIZE,
+               end_offset: Optional[int] = None) -> str:
+    """
+    读取文件最后 lines 行
+
+    与 "".join(f.readlines()[-lines:]) 结果一致，但只读取文件末尾所需的块
+
+    Args:
+        path: 文件路径
+        lines: 行数
+        encoding: 文件编码，无法解码的字节会被忽略
+        end_offset: 只读取该字节位置之前的内容（默认到文件末尾）
+
+    Returns:
+        str: 最后 lines 行的内容
+    """
+    if lines <= 0:
+        return ""
+
+    with open(path, "rb") as f:
+        chunks = []
+        newlines = 0
+        first = True
+        for block in _iter_reverse_blocks(f, block_size, end_offset):
+            if first:
+                # 末尾的换行属于最后一行，不计入行分隔
+                if block.endswith(b"\n"):
+                    newlines -= 1
+                first = False
+            chunks.append(block)
+            newlines += block.count(b"\n")
+            if newlines >= lines:
+                break
+
+    data = b"".join(reversed(chunks))
+    # 去掉多读的部分：保留最后 lines 个行分隔之后的内容
+    end = len(data) - 1 if data.endswith(b"\n") else len(data)
+    start = end
+    for _ in range(lines):
+        start = data.rfind(b"\n", 0, start)
+        if start < 0:
+            break
+    data = data[start + 1:] if start >= 0 else data
+    return data.decode(encoding, errors="ignore")
+
+
+def iter_reverse_lines(path: str, encoding: str = "utf-8", block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    从文件末尾开始逐行向前迭代（不含换行符），适合从后向前查找最近的匹配行
+    """
+    with open(path, "rb") as f:
+        remainder = b""
+        first = True
+        for block in _iter_reverse_blocks(f, block_size):
+            data = block + remainder
+            if first:
+                if data.endswith(b"\n"):
+                    data = data[:-1]
+                first = False
+            parts = data.split(b"\n")
+            remainder = parts[0]
+            for part in reversed(parts[1:]):
+                yield part.decode(encoding, errors="ignore").rstrip("\r")
+        if not first:
+            yield remainder.decode(encoding, errors="ignore").rstrip("\r")
@@ -0,0 +1,237 @@
+"""
+任务资源采样模块
+运行期间通过 /proc 定期采样任务进程及其所有子进程，统计 CPU 时间、峰值内存和磁盘读写量
+
+统计方法：
+- 进程退出并被父进程回收后，它的 CPU 时间（cutime/cstime）和 I/O 计数会累加到父进程上，
+  因此进程树中存活进程的 "自身 + 已回收子进程" 之和就是整棵树到目前为止的总量，取各次采样的最大值
+- 峰值内存取 "进程树 RSS 之和" 的最大值与单个进程 VmHWM 的最大值中较大者
+- 采样间隔从 0.1 秒逐步增加到 1 秒，短任务也能采到数据
+- 进程退出后 /proc 中已没有数据，最后一次采样之后的 CPU 时间和磁盘读写由 wait_child 回收进程时
+  内核返回的 rusage 补齐（包含该进程及其已回收的子进程）
+非 Linux 平台（没有 /proc）不采样
+"""
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_PROC = "/proc"
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# 采样间隔（秒）：从 MIN 开始每次翻倍，最大 MAX
+MIN_INTERVAL = 0.1
+MAX_INTERVAL = 1.0
+
+
+def is_available() -> bool:
+    return os.path.isdir(os.path.join(_PROC, "self"))
+
+
+def wait_child(pid: int, timeout: Optional[float] = None) -> Optional[Tuple[int, object]]:
+    """
+    等待并回收子进程（需要 os.wait4，仅 Unix）
+
+    Returns:
+        tuple: (wait 状态, rusage)；超时返回 None，此时进程未被回收
+    """
+    if timeout is None:
+        _, status, rusage = os.wait4(pid, 0)
+        return status, rusage
+    deadline = time.monotonic() + timeout
+    interval = 0.005
+    while True:
+        waited_pid, status, rusage = os.wait4(pid, os.WNOHANG)
+        if waited_pid == pid:
+            return status, rusage
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, 0.1)
+
+
+def _read_stat(pid: int) -> Optional[dict]:
+    try:
+        with open(f"{_PROC}/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # 进程名可能包含空格和括号，从最后一个 ')' 之后开始解析
+    fields = data[data.rfind(b")") + 2:].split()
+    return {
+        "ppid": int(fields[1]),
+        "cpu": (int(fields[11]) + int(fields[12]) + int(fields[13]) + int(fields[14])) / _CLK_TCK,
+    }
+
+
+def _read_status_memory(pid: int):
+    """返回 (VmRSS, VmHWM)，单位字节；僵尸进程没有这两项"""
+    rss = hwm = 0
+    try:
+        with open(f"{_PROC}/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith(b"VmHWM:"):
+                    hwm = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return rss, hwm
+
+
+def _read_io(pid: int):
+    """返回 (read_bytes, write_bytes)；无权限读取时返回 (0, 0)"""
+    read_bytes = write_bytes = 0
+    try:
+        with open(f"{_PROC}/{pid}/io", "rb") as f:
+            for line in f:
+                if line.startswith(b"read_bytes:"):
+                    read_bytes = int(line.split()[1])
+                elif line.startswith(b"write_bytes:"):
+                    write_bytes = int(line.split()[1])
+    except OSError:
+        pass
+    return read_bytes, write_bytes
+
+
+def _children_map() -> Dict[int, List[int]]:
+    """扫描 /proc 得到 父进程 -> 子进程 列表"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.scandir(_PROC):
+        if not entry.name.isdigit():
+            continue
+        stat = _read_stat(int(entry.name))
+        if stat:
+            children.setdefault(stat["ppid"], []).append(int(entry.name))
+    return children
+
+
+def _read_children(pid: int) -> Optional[List[int]]:
+    """通过 /proc/<pid>/task/<tid>/children 读取直接子进程，内核不支持时返回 None"""
+    result = []
+    try:
+        tids = os.listdir(f"{_PROC}/{pid}/task")
+    except OSError:
+        return []
+    for tid in tids:
+        try:
+            with open(f"{_PROC}/{pid}/task/{tid}/children", "rb") as f:
+                result.extend(int(c) for c in f.read().split())
+        except FileNotFoundError:
+            return None
+        except OSError:
+            continue
+    return result
+
+
+def _process_tree(root: int) -> Iterable[int]:
+    pids = [root]
+    children_map = None
+    index = 0
+    while index < len(pids):
+        pid = pids[index]
+        index += 1
+        children = None if children_map is not None else _read_children(pid)
+        if children is None:
+            if children_map is None:
+                children_map = _children_map()
+            children = children_map.get(pid, [])
+        pids.extend(children)
+    return pids
+
+
+class ResourceSampler:
+    """
+    后台线程采样一个进程树的资源消耗
+
+    用法:
+        sampler = ResourceSampler(process.pid)
+        sampler.start()
+        ...等待进程结束...
+        usage = sampler.stop()
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.cpu_time = 0.0
+        self.peak_rss = 0
+        self.read_bytes = 0
+        self.write_bytes = 0
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not is_available():
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def sample(self):
+        """采样一次整棵进程树"""
+        cpu = 0.0
+        rss_total = 0
+        read_bytes = write_bytes = 0
+        found = False
+        for pid in _process_tree(self.pid):
+            stat = _read_stat(pid)
+            if stat is None:
+                continue
+            found = True
+            cpu += stat["cpu"]
+            rss, hwm = _read_status_memory(pid)
+            rss_total += rss
+            self.peak_rss = max(self.peak_rss, hwm)
+            pid_read, pid_write = _read_io(pid)
+            read_bytes += pid_read
+            write_bytes += pid_write
+        if not found:
+            return
+        self.samples += 1
+        self.cpu_time = max(self.cpu_time, cpu)
+        self.peak_rss = max(self.peak_rss, rss_total)
+        self.read_bytes = max(self.read_bytes, read_bytes)
+        self.write_bytes = max(self.write_bytes, write_bytes)
+
+    def add_rusage(self, rusage):
+        """并入回收进程时得到的 rusage，补上最后一次采样之后的消耗"""
+        self.samples += 1
+        self.cpu_time = max(self.cpu_time, rusage.ru_utime + rusage.ru_stime)
+        # ru_maxrss 包含 fork 之后、exec 之前从调度器进程复制来的内存，会把小任务的峰值算成调度器的内存，
+        # 因此峰值内存只取采样结果；ru_inblock / ru_oublock 以 512 字节为单位
+        self.read_bytes = max(self.read_bytes, rusage.ru_inblock * 512)
+        self.write_bytes = max(self.write_bytes, rusage.ru_oublock * 512)
+
+    def _run(self):
+        interval = MIN_INTERVAL
+        while True:
+            try:
+                self.sample()
+            except Exception:
+                pass
+            if self._stop.wait(interval):
+                return
+            interval = min(interval * 2, MAX_INTERVAL)
+
+    def stop(self) -> Optional[Dict]:
+        """
+        停止采样
+
+        Returns:
+            dict: cpu_time（秒）、peak_rss、read_bytes、write_bytes（字节）；没有采到数据时返回 None
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=2)
+        if self.samples == 0:
+            return None
+        return self.usage()
+
+    def usage(self) -> Dict:
+        return {
+            "cpu_time": round(self.cpu_time, 3),
+            "peak_rss": self.peak_rss,
+            "read_bytes": self.read_bytes,
+            "write_bytes": self.write_bytes,
+        }
@@ -7,6 +7,7 @@
     python scheduler/run.py --status     # 查看任务状态
     python scheduler/run.py --run task_1 # 立即运行指定任务
     python scheduler/run.py --reload     # 重新加载配置
+    python scheduler/run.py --node-id n1 # 多节点部署时指定节点标识
 """
 
 import argparse
@@ -18,6 +19,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from scheduler import TaskScheduler
+from scheduler.control import ControlUnavailable, send_command
 
 
 def main():
@@ -26,10 +28,11 @@ def main():
     parser.add_argument('--run', metavar='TASK_ID', help='立即运行指定任务')
     parser.add_argument('--reload', action='store_true', help='重新加载配置')
     parser.add_argument('--config', default='scheduler/config.json', help='配置文件路径')
+    parser.add_argument('--node-id', help='多节点部署时的节点标识（默认 主机名:进程号）')
     
     args = parser.parse_args()
     
-    scheduler = TaskScheduler(config_path=args.config)
+    scheduler = TaskScheduler(config_path=args.config, node_id=args.node_id)
     
     if args.status:
         print("=" * 80)
@@ -49,8 +52,16 @@ def main():
         return
     
     if args.run:
+        print(f"正在立即运行任务: {args.run}")
+        # 调度器正在运行时交给它执行，与定时触发共用并发控制和重试
+        if scheduler.settings.control_socket:
+            try:
+                result = send_command(scheduler.settings.control_socket, "run", task_id=args.run)
+                print(result["message"])
+                sys.exit(0 if result["success"] else 1)
+            except ControlUnavailable:
+                print("调度器未运行，在当前进程中执行")
         try:
-            print(f"正在立即运行任务: {args.run}")
             scheduler.run_task_now(args.run)
             time.sleep(2)
             print("任务已启动")
@@ -60,8 +71,12 @@ def main():
         return
     
     if args.reload:
-        scheduler.reload_config()
-        print("配置已重新加载")
+        try:
+            scheduler.reload_config()
+            print("配置已重新加载")
+        except ValueError as e:
+            print(f"配置校验失败: {e}")
+            sys.exit(1)
         return
     
     # 默认启动调度器
@@ -78,7 +93,7 @@ def main():
         schedule_type = schedule_info.get('type', 'unknown')
         
         if schedule_type == 'cron':
-            schedule_desc = f"cron: {schedule_info.get('expression')}"
+            schedule_desc = f"cron: {schedule_info.get('expression') or schedule_info.get('cron')}"
         elif schedule_type == 'interval':
             schedule_desc = f"每 {schedule_info.get('minutes')} 分钟"
         elif schedule_type == 'daily':
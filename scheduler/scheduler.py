@@ -1,78 +1,158 @@
+import hashlib
+import heapq
+import itertools
 import json
 import logging
 import os
+import random
+import sqlite3
 import subprocess
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from threading import Thread, Lock
+from threading import Thread, Lock, Condition
 from typing import Dict, List, Optional
-import schedule
 import pytz
 
+logger = logging.getLogger("TaskScheduler")
+
+# 任务监控依赖 sqlite 执行历史数据库，数据库无法打开时不启用任务监控，调度本身不受影响
 try:
-    from .task_monitor import task_monitor
-    from .task_log_manager import task_log_manager
-    TASK_MONITOR_AVAILABLE = True
-    TASK_LOG_AVAILABLE = True
-except ImportError:
     try:
+        from .task_monitor import task_monitor
+    except ImportError:
         from task_monitor import task_monitor
-        from task_log_manager import task_log_manager
-        TASK_MONITOR_AVAILABLE = True
-        TASK_LOG_AVAILABLE = True
+    TASK_MONITOR_AVAILABLE = True
+except (ImportError, sqlite3.Error, OSError) as e:
+    logger.warning(f"任务监控不可用: {e}")
+    task_monitor = None
+    TASK_MONITOR_AVAILABLE = False
+
+# 任务日志只写文件，不依赖任务监控
+try:
+    try:
+        from .task_log_manager import task_log_manager
     except ImportError:
-        task_monitor = None
-        task_log_manager = None
-        TASK_MONITOR_AVAILABLE = False
-        TASK_LOG_AVAILABLE = False
+        from task_log_manager import task_log_manager
+    TASK_LOG_AVAILABLE = True
+except (ImportError, OSError) as e:
+    logger.warning(f"任务日志不可用: {e}")
+    task_log_manager = None
+    TASK_LOG_AVAILABLE = False
+
+try:
+    from .worker_pool import WorkerPool
+    from .cron import build_trigger, IntervalTrigger
+    from .executor import TaskExecutor
+    from .file_watcher import create_watcher, WatcherClosed
+    from .state_store import SchedulerStateStore
+    from .lease import SchedulerLease
+    from .resource_sampler import ResourceSampler, wait_child
+    from .search_index import SearchIndex
+    from .config_file import validate_config
+    from .control import ControlServer, DEFAULT_SOCKET_PATH
+except ImportError:
+    from worker_pool import WorkerPool
+    from cron import build_trigger, IntervalTrigger
+    from executor import TaskExecutor
+    from file_watcher import create_watcher, WatcherClosed
+    from state_store import SchedulerStateStore
+    from lease import SchedulerLease
+    from resource_sampler import ResourceSampler, wait_child
+    from search_index import SearchIndex
+    from config_file import validate_config
+    from control import ControlServer, DEFAULT_SOCKET_PATH
+
+# 调度线程单次最长等待时间（秒），用于在系统休眠或时钟调整后重新校准
+MAX_TIMER_WAIT = 300
+
+# shell 返回 126（无执行权限）/ 127（命令不存在）时视为启动失败
+SPAWN_ERROR_RETURNCODES = (126, 127)
+
+# 单个任务启动补跑时最多执行的次数（coalesce 关闭时）
+MAX_CATCH_UP_RUNS = 10
 
 
 class ConfigWatcher(Thread):
+    """
+    配置文件监控
+
+    Linux 下使用 inotify 在文件保存后立即触发重载，其他平台或 inotify 不可用时按 check_interval 轮询；
+    以文件内容摘要判断是否真的变化，仅修改时间变化不会触发重载
+    """
+
+    # inotify 收到事件后等待的时间，合并编辑器保存时产生的多次写入
+    DEBOUNCE_SECONDS = 0.2
+    # inotify 模式下单次等待的超时，用于及时响应 stop_watching
+    WAIT_TIMEOUT = 1.0
+
     def __init__(self, scheduler: 'TaskScheduler', check_interval: int = 5):
         super().__init__(daemon=True)
         self.scheduler = scheduler
         self.check_interval = check_interval
-        self.last_mtime: Optional[float] = None
+        self.last_digest: Optional[str] = None
         self.running = False
         self.logger = logging.getLogger("ConfigWatcher")
         
     def start_watching(self):
         self.running = True
-        self.last_mtime = self._get_mtime()
+        self.last_digest = self._get_digest()
         self.start()
-        self.logger.info(f"配置文件监控已启动，检查间隔: {self.check_interval}秒")
         
     def stop_watching(self):
         self.running = False
         self.logger.info("配置文件监控已停止")
         
-    def _get_mtime(self) -> Optional[float]:
+    def _get_digest(self) -> Optional[str]:
         try:
-            return self.scheduler.config_path.stat().st_mtime
+            return hashlib.md5(self.scheduler.config_path.read_bytes()).hexdigest()
         except FileNotFoundError:
             return None
+
+    def _check(self):
+        current_digest = self._get_digest()
+        if current_digest is not None and self.last_digest is not None and current_digest != self.last_digest:
+            self.logger.info("检测到配置文件变化，正在重新加载...")
+            try:
+                self.scheduler.reload_config()
+                self.logger.info("配置文件重载成功")
+            except Exception as e:
+                self.logger.error(f"配置文件重载失败: {e}")
+        self.last_digest = current_digest
             
     def run(self):
-        while self.running:
-            time.sleep(self.check_interval)
-            current_mtime = self._get_mtime()
-            
-            if current_mtime is not None and self.last_mtime is not None:
-                if current_mtime != self.last_mtime:
-                    self.logger.info("检测到配置文件变化，正在重新加载...")
-                    try:
-                        self.scheduler.reload_config()
-                        self.last_mtime = current_mtime
-                        self.logger.info("配置文件重载成功")
-                    except Exception as e:
-                        self.logger.error(f"配置文件重载失败: {e}")
-            
-            self.last_mtime = current_mtime
+        watcher = create_watcher(self.scheduler.config_path)
+        if watcher:
+            self.logger.info("配置文件监控已启动（inotify）")
+        else:
+            self.logger.info(f"配置文件监控已启动，检查间隔: {self.check_interval}秒")
+
+        try:
+            while self.running:
+                if watcher is None:
+                    time.sleep(self.check_interval)
+                    self._check()
+                    continue
+
+                try:
+                    if not watcher.wait(self.WAIT_TIMEOUT):
+                        continue
+                    time.sleep(self.DEBOUNCE_SECONDS)
+                    watcher.drain()
+                except WatcherClosed:
+                    self.logger.warning("配置目录监听失效，改用轮询")
+                    watcher.close()
+                    watcher = None
+                self._check()
+        finally:
+            if watcher:
+                watcher.close()
 
 
 class TaskConfig:
     def __init__(self, config_dict: dict):
+        # 原始配置，重载时用于判断任务是否有变化
+        self.raw = config_dict
         self.id = config_dict.get('id')
         self.name = config_dict.get('name', '')
         self.description = config_dict.get('description', '')
@@ -81,6 +161,13 @@ class TaskConfig:
         self.enabled = config_dict.get('enabled', True)
         self.working_directory = config_dict.get('working_directory', '.')
         self.timeout = config_dict.get('timeout', 300)
+        # 执行方式: shell - 每次启动子进程; forkserver - 在预热进程中执行 Python 入口
+        self.executor = config_dict.get('executor', 'shell')
+        # 优先级（数值越大越先执行）和并发组（如 "llm"、"scrape"）
+        self.priority = config_dict.get('priority', 0)
+        self.group = config_dict.get('group')
+        # 错过触发的容忍时间（秒），不设置时使用 settings.misfire_grace_time
+        self.misfire_grace_time = config_dict.get('misfire_grace_time')
 
 
 class SchedulerSettings:
@@ -90,136 +177,222 @@ class SchedulerSettings:
         self.max_concurrent_tasks = settings_dict.get('max_concurrent_tasks', 3)
         self.retry_count = settings_dict.get('retry_count', 3)
         self.retry_delay = settings_dict.get('retry_delay', 60)
+        # 重试退避: 第 n 次重试等待 retry_delay * retry_backoff^(n-1)，上限 retry_max_delay，并加 ±retry_jitter 比例的随机抖动
+        self.retry_backoff = settings_dict.get('retry_backoff', 2)
+        self.retry_max_delay = settings_dict.get('retry_max_delay', 1800)
+        self.retry_jitter = settings_dict.get('retry_jitter', 0.2)
+        # 哪些失败类型需要重试: failed（非零退出）、timeout（超时）、error（命令无法启动）
+        self.retry_on = settings_dict.get('retry_on', ['failed', 'timeout'])
+        self.worker_preload_modules = settings_dict.get('worker_preload_modules')
+        # 各并发组的最大并发数，如 {"llm": 1, "scrape": 2}
+        self.concurrency_groups = settings_dict.get('concurrency_groups', {})
+        # 调度状态文件，记录每个任务最近的触发时间和执行结果，重启后恢复
+        self.state_file = settings_dict.get('state_file', 'scheduler/scheduler_state.json')
+        # 启动补跑: 停机期间错过、且距今不超过 misfire_grace_time 秒的触发会在启动时补跑（0 表示不补跑）
+        # coalesce 为 true 时多次错过的触发只补跑一次
+        self.misfire_grace_time = settings_dict.get('misfire_grace_time', 3600)
+        self.coalesce = settings_dict.get('coalesce', True)
+        # 多节点部署: 所有节点指向同一个 sqlite 租约文件，只有持有租约的主节点分发定时任务（不设置则单节点运行）
+        self.lease_db = settings_dict.get('lease_db')
+        self.lease_ttl = settings_dict.get('lease_ttl', 15)
+        # 报告全文索引: 任务执行结束后增量索引 search_data_dir 下的报告和新闻 JSON（search_index_db 设为 null 关闭）
+        self.search_index_db = settings_dict.get('search_index_db', 'data/search_index.db')
+        self.search_data_dir = settings_dict.get('search_data_dir', 'data')
+        # 控制通道: Web 服务和命令行通过该 unix socket 把手动执行提交给调度器（设为 null 关闭）
+        self.control_socket = settings_dict.get('control_socket', DEFAULT_SOCKET_PATH)
 
 
 class TaskRunner:
-    def __init__(self, task: TaskConfig, settings: SchedulerSettings):
+    def __init__(self, task: TaskConfig, settings: SchedulerSettings, worker_pool: Optional[WorkerPool] = None):
         self.task = task
         self.settings = settings
+        self.worker_pool = worker_pool
         self.logger = logging.getLogger(f"Task-{task.id}")
         self.running = False
         self.last_run: Optional[datetime] = None
         self.last_status: Optional[str] = None
         self.last_output: Optional[str] = None
+        self.last_duration: Optional[float] = None
 
-    def run(self):
-        if not self.task.enabled:
-            self.logger.info(f"任务 {self.task.name} 已禁用，跳过执行")
-            return
+    def run(self, attempt: int = 1, task_type: str = "scheduled") -> Optional[str]:
+        """
+        执行一次任务（不在此处等待重试，重试由调度器重新入队）
+
+        Args:
+            attempt: 第几次尝试，从 1 开始
+            task_type: 触发方式，scheduled（定时）或 manual（手动）
+
+        Returns:
+            str: 最终状态 completed / failed（非零退出）/ timeout（超时）/ error（启动失败）；
+                 任务已禁用时返回 None
+        """
+        # 固定本次执行使用的配置，执行期间配置重载不影响正在运行的任务
+        task = self.task
+        if not task.enabled:
+            self.logger.info(f"任务 {task.name} 已禁用，跳过执行")
+            return None
 
         self.running = True
-        self.logger.info(f"开始执行任务: {self.task.name}")
-        self.logger.info(f"执行命令: {self.task.command}")
-        self.logger.info(f"工作目录: {self.task.working_directory}")
+        started = time.monotonic()
+        self.logger.info(f"开始执行任务: {task.name}")
+        self.logger.info(f"执行命令: {task.command}")
+        self.logger.info(f"工作目录: {task.working_directory}")
 
         # 记录任务开始到监控器
         if TASK_MONITOR_AVAILABLE and task_monitor:
             execution = task_monitor.start_task(
-                task_id=self.task.id,
-                task_name=self.task.name,
-                task_type="scheduled"
+                task_id=task.id,
+                task_name=task.name,
+                task_type=task_type
             )
 
         # 开始记录任务日志
         log_file = None
         if TASK_LOG_AVAILABLE and task_log_manager:
-            log_file = task_log_manager.start_task_log(self.task.id, self.task.name)
+            log_file = task_log_manager.start_task_log(task.id, task.name)
             self.logger.info(f"任务日志文件: {log_file}")
 
         final_status = "failed"
         final_output = ""
         final_error = ""
+        resources = None
 
-        for attempt in range(self.settings.retry_count):
-            try:
-                self.logger.info(f"第 {attempt + 1} 次尝试执行...")
-                result = self._execute_command_with_logging()
-                self.last_run = datetime.now(pytz.timezone(self.settings.timezone))
-
-                self.logger.info(f"子进程返回码: {result['returncode']}")
-
-                if result['returncode'] == 0:
-                    self.last_status = "success"
-                    self.last_output = result['stdout']
-                    final_status = "completed"
-                    final_output = result['stdout']
-                    self.logger.info(f"任务 {self.task.name} 执行成功")
-                    break
-                else:
-                    self.last_status = "failed"
-                    self.last_output = result['stderr']
-                    final_status = "failed"
-                    final_error = result['stderr']
-                    self.logger.error(f"任务 {self.task.name} 执行失败")
-
-                    if attempt < self.settings.retry_count - 1:
-                        self.logger.info(f"{self.settings.retry_delay}秒后重试...")
-                        time.sleep(self.settings.retry_delay)
-
-            except subprocess.TimeoutExpired as e:
-                self.last_status = "timeout"
-                self.last_output = f"任务执行超时 ({self.task.timeout}秒)"
-                final_status = "timeout"
-                final_error = f"任务执行超时 ({self.task.timeout}秒)"
-                self.logger.error(f"任务 {self.task.name} 执行超时 ({self.task.timeout}秒)")
+        try:
+            self.logger.info(f"第 {attempt} 次尝试执行...")
+            result = self._execute_command_with_logging(task)
+            resources = result['resources']
+            if resources:
+                self.logger.info(
+                    f"资源消耗: CPU {resources['cpu_time']:.2f} 秒, "
+                    f"峰值内存 {resources['peak_rss'] / 1024 / 1024:.1f} MB, "
+                    f"磁盘读 {resources['read_bytes'] / 1024 / 1024:.1f} MB, "
+                    f"磁盘写 {resources['write_bytes'] / 1024 / 1024:.1f} MB"
+                )
+            self.last_run = datetime.now(pytz.timezone(self.settings.timezone))
 
-                if attempt < self.settings.retry_count - 1:
-                    time.sleep(self.settings.retry_delay)
+            self.logger.info(f"子进程返回码: {result['returncode']}")
 
-            except Exception as e:
+            if result['timed_out']:
+                self.last_status = "timeout"
+                self.last_output = f"任务执行超时 ({task.timeout}秒)"
+                final_status = "timeout"
+                final_output = result['stdout']
+                final_error = f"任务执行超时 ({task.timeout}秒)"
+                self.logger.error(f"任务 {task.name} 执行超时 ({task.timeout}秒)")
+            elif result['returncode'] == 0:
+                self.last_status = "success"
+                self.last_output = result['stdout']
+                final_status = "completed"
+                final_output = result['stdout']
+                self.logger.info(f"任务 {task.name} 执行成功")
+            elif result['returncode'] in SPAWN_ERROR_RETURNCODES:
+                # shell 无法找到或执行命令，属于启动失败
                 self.last_status = "error"
-                self.last_output = str(e)
+                self.last_output = result['stderr']
                 final_status = "error"
-                final_error = str(e)
-                self.logger.error(f"任务 {self.task.name} 执行异常: {e}")
+                final_error = result['stderr']
+                self.logger.error(f"任务 {task.name} 命令无法执行 (返回码 {result['returncode']})")
+            else:
+                self.last_status = "failed"
+                self.last_output = result['stderr']
+                final_status = "failed"
+                final_error = result['stderr']
+                self.logger.error(f"任务 {task.name} 执行失败")
 
-                if attempt < self.settings.retry_count - 1:
-                    time.sleep(self.settings.retry_delay)
+        except Exception as e:
+            self.last_run = datetime.now(pytz.timezone(self.settings.timezone))
+            self.last_status = "error"
+            self.last_output = str(e)
+            final_status = "error"
+            final_error = str(e)
+            self.logger.error(f"任务 {task.name} 执行异常: {e}")
 
         # 结束任务日志记录
         if TASK_LOG_AVAILABLE and task_log_manager:
-            task_log_manager.end_task_log(self.task.id, final_status)
+            task_log_manager.end_task_log(task.id, final_status)
 
         # 记录任务结束到监控器
         if TASK_MONITOR_AVAILABLE and task_monitor:
             task_monitor.end_task(
-                task_id=self.task.id,
+                task_id=task.id,
                 status=final_status,
                 output=final_output,
-                error=final_error
+                error=final_error,
+                resources=resources
             )
 
-        self.logger.info(f"任务 {self.task.name} 执行结束，最终状态: {self.last_status}")
+        self.last_duration = round(time.monotonic() - started, 3)
+        self.logger.info(f"任务 {task.name} 执行结束，最终状态: {self.last_status}")
         self.running = False
+        return final_status
+
+    @staticmethod
+    def _wait_process(process, timeout: Optional[float], sampler: ResourceSampler) -> int:
+        """
+        等待进程结束
+
+        本地子进程用 os.wait4 回收，进程退出前最后一段时间的 CPU 时间和磁盘读写由 rusage 并入采样结果；
+        预热进程（不是本进程的子进程）和没有 wait4 的平台直接等待
+
+        Raises:
+            subprocess.TimeoutExpired: 超时，进程未被回收
+        """
+        if not isinstance(process, subprocess.Popen) or not hasattr(os, "wait4"):
+            return process.wait(timeout=timeout)
+        waited = wait_child(process.pid, timeout)
+        if waited is None:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+        status, rusage = waited
+        sampler.add_rusage(rusage)
+        # 进程已由 wait4 回收，直接设置返回码，之后 Popen 不会再等待
+        process.returncode = os.waitstatus_to_exitcode(status)
+        return process.returncode
 
-    def _execute_command_with_logging(self) -> dict:
+    def _execute_command_with_logging(self, task: TaskConfig) -> dict:
         """
         执行命令并实时捕获输出到日志文件
         
         Returns:
-            dict: 包含 returncode, stdout, stderr
+            dict: 包含 returncode, timed_out, stdout, stderr
         """
-        work_dir = Path(self.task.working_directory).expanduser().resolve()
+        work_dir = Path(task.working_directory).expanduser().resolve()
         
         # 设置环境变量，确保子进程使用 UTF-8 编码
         env = os.environ.copy()
         env['PYTHONIOENCODING'] = 'utf-8'
         env['LANG'] = 'en_US.UTF-8'
         
-        self.logger.info(f"启动子进程: {self.task.command}")
+        process = None
+        if task.executor == 'forkserver' and self.worker_pool:
+            # 在预热进程中执行，返回与 Popen 接口一致的进程句柄
+            process = self.worker_pool.spawn(task.command, work_dir, env)
+            if process is None:
+                self.logger.warning(f"命令不是 Python 入口或平台不支持 forkserver，回退为子进程执行")
+            else:
+                self.logger.info(f"在预热进程中启动任务: {task.command} (PID: {process.pid})")
         
-        # 使用 Popen 启动子进程，捕获输出
-        process = subprocess.Popen(
-            self.task.command,
-            shell=True,
-            cwd=work_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=env,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
+        if process is None:
+            self.logger.info(f"启动子进程: {task.command}")
+            
+            # 使用 Popen 启动子进程，捕获输出
+            process = subprocess.Popen(
+                task.command,
+                shell=True,
+                cwd=work_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env,
+                text=True,
+                encoding='utf-8',
+                errors='replace'
+            )
+        
+        if TASK_MONITOR_AVAILABLE and task_monitor:
+            task_monitor.update_task_pid(task.id, process.pid)
+        
+        # 采样子进程树的 CPU、内存和磁盘读写
+        sampler = ResourceSampler(process.pid)
+        sampler.start()
         
         stdout_lines = []
         stderr_lines = []
@@ -232,7 +405,7 @@ class TaskRunner:
                         line_str = line.rstrip('\n\r')
                         stdout_lines.append(line_str)
                         if TASK_LOG_AVAILABLE and task_log_manager:
-                            task_log_manager.write_log(self.task.id, line_str, is_error=False)
+                            task_log_manager.write_log(task.id, line_str, is_error=False)
             except Exception as e:
                 self.logger.error(f"读取stdout失败: {e}")
         
@@ -243,7 +416,7 @@ class TaskRunner:
                         line_str = line.rstrip('\n\r')
                         stderr_lines.append(line_str)
                         if TASK_LOG_AVAILABLE and task_log_manager:
-                            task_log_manager.write_log(self.task.id, line_str, is_error=True)
+                            task_log_manager.write_log(task.id, line_str, is_error=True)
             except Exception as e:
                 self.logger.error(f"读取stderr失败: {e}")
         
@@ -254,16 +427,19 @@ class TaskRunner:
         stderr_thread.start()
         
         # 等待进程完成或超时
+        timed_out = False
         try:
-            returncode = process.wait(timeout=self.task.timeout)
+            returncode = self._wait_process(process, task.timeout, sampler)
         except subprocess.TimeoutExpired:
+            timed_out = True
             process.terminate()
             try:
-                process.wait(timeout=5)
+                self._wait_process(process, 5, sampler)
             except subprocess.TimeoutExpired:
                 process.kill()
-                process.wait()
+                self._wait_process(process, None, sampler)
             returncode = -1  # 超时标记
+        resources = sampler.stop()
         
         # 等待读取线程完成
         stdout_thread.join(timeout=2)
@@ -278,22 +454,46 @@ class TaskRunner:
         
         return {
             'returncode': returncode,
+            'timed_out': timed_out,
             'stdout': '\n'.join(stdout_lines),
-            'stderr': '\n'.join(stderr_lines)
+            'stderr': '\n'.join(stderr_lines),
+            'resources': resources
         }
 
 
 class TaskScheduler:
-    def __init__(self, config_path: str = "scheduler/config.json"):
+    def __init__(self, config_path: str = "scheduler/config.json", node_id: Optional[str] = None):
         self.config_path = Path(config_path)
+        self.node_id = node_id
         self.tasks: Dict[str, TaskRunner] = {}
         self.settings: Optional[SchedulerSettings] = None
         self.running = False
         self.lock = Lock()
         self.scheduler_thread: Optional[Thread] = None
         self.config_watcher: Optional[ConfigWatcher] = None
+        self.control_server: Optional[ControlServer] = None
+        self.worker_pool: Optional[WorkerPool] = None
+        self.executor: Optional[TaskExecutor] = None
+        self.state_store: Optional[SchedulerStateStore] = None
+        self.lease: Optional[SchedulerLease] = None
+        self.lease_thread: Optional[Thread] = None
+        self.search_index: Optional[SearchIndex] = None
+        self._lease_stop = Condition()
         self.logger = logging.getLogger("TaskScheduler")
         
+        # 定时器最小堆: (触发时间戳, 序号, 任务ID, generation, 第几次尝试)
+        # 常规触发的尝试次数为 0；重试条目的 generation 为重试令牌
+        self._timer_heap: List[tuple] = []
+        self._timer_cond = Condition()
+        self._timer_seq = itertools.count()
+        self._triggers: Dict[str, object] = {}
+        self._generations: Dict[str, int] = {}
+        self.next_runs: Dict[str, datetime] = {}
+        # 等待中的重试: 任务ID -> (重试令牌, 重试时间, 触发方式)
+        self._pending_retries: Dict[str, tuple] = {}
+        # 启动补跑中还需要执行的次数（coalesce 关闭时）
+        self._catch_up_backlog: Dict[str, int] = {}
+        
         self._setup_logging()
         self._load_config()
 
@@ -308,83 +508,412 @@ class TaskScheduler:
             ]
         )
 
-    def _load_config(self):
+    def _read_config(self) -> dict:
         if not self.config_path.exists():
             raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
             
         with open(self.config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-            
-        self.settings = SchedulerSettings(config.get('settings', {}))
+            return json.load(f)
+
+    def _apply_settings(self, settings: SchedulerSettings):
+        self.settings = settings
+        if self.worker_pool is None:
+            self.worker_pool = WorkerPool(self.settings.worker_preload_modules)
+        if self.executor is None:
+            self.executor = TaskExecutor(self.settings.max_concurrent_tasks, self.settings.concurrency_groups,
+                                         on_done=self._on_task_done)
+        else:
+            self.executor.configure(self.settings.max_concurrent_tasks, self.settings.concurrency_groups)
+        if self.state_store is None:
+            self.state_store = SchedulerStateStore(self.settings.state_file)
+        if self.lease is None and self.settings.lease_db:
+            self.lease = SchedulerLease(self.settings.lease_db, self.node_id, self.settings.lease_ttl)
+        if self.search_index is None and self.settings.search_index_db:
+            try:
+                self.search_index = SearchIndex(self.settings.search_index_db, self.settings.search_data_dir)
+            except Exception as e:
+                self.logger.warning(f"搜索索引不可用: {e}")
+
+    def _restore_runner_state(self, runner: 'TaskRunner'):
+        """从状态文件恢复上次执行结果"""
+        state = self.state_store.get(runner.task.id)
+        if state.get('last_run'):
+            runner.last_run = datetime.fromisoformat(state['last_run'])
+        runner.last_status = state.get('last_status')
+        runner.last_output = state.get('last_output')
+        runner.last_duration = state.get('last_duration')
+
+    def _load_config(self):
+        config = self._read_config()
+        self._apply_settings(SchedulerSettings(config.get('settings', {})))
         
         for task_dict in config.get('tasks', []):
             task = TaskConfig(task_dict)
-            self.tasks[task.id] = TaskRunner(task, self.settings)
+            runner = TaskRunner(task, self.settings, self.worker_pool)
+            self._restore_runner_state(runner)
+            self.tasks[task.id] = runner
             
+        self.state_store.prune(self.tasks.keys())
         self.logger.info(f"已加载 {len(self.tasks)} 个任务")
 
-    def reload_config(self):
+    def reload_config(self) -> dict:
+        """
+        重新加载配置，只对新增、删除和修改过的任务做增量更新
+
+        未变化的任务保留原有 TaskRunner 和下次触发时间；修改过的任务原地替换配置，
+        正在运行的任务以旧配置执行完本次，运行状态和 last_run / last_status 均保留；
+        配置文件校验不通过时不做任何修改
+
+        Returns:
+            dict: 本次变化的任务ID，键为 added / removed / updated / rescheduled
+
+        Raises:
+            ValueError: 配置校验失败
+        """
         self.logger.info("重新加载配置...")
+        config = self._read_config()
+        # 校验失败时抛出异常，继续使用当前配置
+        validate_config(config)
+        new_settings = SchedulerSettings(config.get('settings', {}))
+        new_tasks: Dict[str, TaskConfig] = {}
+        for task_dict in config.get('tasks', []):
+            task = TaskConfig(task_dict)
+            new_tasks[task.id] = task
+
+        changes = {'added': [], 'removed': [], 'updated': [], 'rescheduled': []}
         with self.lock:
-            self.tasks.clear()
-            self._load_config()
-            if self.running:
-                schedule.clear()
-                self._schedule_tasks()
+            timezone_changed = new_settings.timezone != self.settings.timezone
+            self._apply_settings(new_settings)
+
+            with self._timer_cond:
+                now = self._now()
+                for task_id in [t for t in self.tasks if t not in new_tasks]:
+                    del self.tasks[task_id]
+                    self._unschedule_task(task_id)
+                    changes['removed'].append(task_id)
+
+                for task_id, task in new_tasks.items():
+                    runner = self.tasks.get(task_id)
+                    if runner is None:
+                        runner = TaskRunner(task, self.settings, self.worker_pool)
+                        self._restore_runner_state(runner)
+                        self.tasks[task_id] = runner
+                        changes['added'].append(task_id)
+                        reschedule = True
+                    else:
+                        runner.settings = self.settings
+                        old_task = runner.task
+                        reschedule = (timezone_changed or old_task.schedule != task.schedule
+                                      or old_task.enabled != task.enabled)
+                        if old_task.raw != task.raw:
+                            runner.task = task
+                            changes['updated'].append(task_id)
+                        if reschedule:
+                            changes['rescheduled'].append(task_id)
+
+                    if reschedule and self.running:
+                        self._unschedule_task(task_id)
+                        self._schedule_task(runner, now)
+                self._timer_cond.notify()
+
+        if changes['removed']:
+            self.state_store.prune(self.tasks.keys())
+        if changes['rescheduled'] and self.running:
+            self._save_next_runs()
+        self.logger.info(
+            f"配置重载完成: 新增 {len(changes['added'])}，删除 {len(changes['removed'])}，"
+            f"修改 {len(changes['updated'])}，重新调度 {len(changes['rescheduled'])}"
+        )
+        return changes
+
+    def _now(self) -> datetime:
+        return datetime.now(pytz.timezone(self.settings.timezone))
 
     def _schedule_tasks(self):
-        for task_id, runner in self.tasks.items():
-            task = runner.task
-            if not task.enabled:
+        """为所有启用的任务计算下次触发时间并放入最小堆"""
+        with self._timer_cond:
+            self._timer_heap.clear()
+            self._triggers.clear()
+            self.next_runs.clear()
+            self._pending_retries.clear()
+            self._catch_up_backlog.clear()
+            now = self._now()
+            for runner in self.tasks.values():
+                self._schedule_task(runner, now)
+            self._timer_cond.notify()
+        self._save_next_runs()
+
+    def _save_next_runs(self):
+        """把各任务的下次触发时间写入状态文件（Web 服务据此展示任务状态）"""
+        with self._timer_cond:
+            next_runs = {task_id: self.next_runs.get(task_id) for task_id in self.tasks}
+        self.state_store.record_next_runs(next_runs)
+
+    def _schedule_task(self, runner: TaskRunner, now: datetime):
+        """调用方需持有 _timer_cond"""
+        task = runner.task
+        if not task.enabled:
+            return
+
+        try:
+            trigger = build_trigger(task.schedule, self.settings.timezone)
+            next_fire = trigger.next_fire(now)
+        except ValueError as e:
+            self.logger.error(f"任务 {task.name} 调度配置无效: {e}")
+            return
+
+        generation = self._generations.get(task.id, 0) + 1
+        self._generations[task.id] = generation
+        self._triggers[task.id] = trigger
+        self._push_fire(task.id, next_fire, generation)
+        self.logger.info(f"已设置任务: {task.name} ({trigger.describe()})，下次运行: {next_fire.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    def _unschedule_task(self, task_id: str):
+        """使任务在堆中的触发和待执行的重试失效，调用方需持有 _timer_cond"""
+        self._generations[task_id] = self._generations.get(task_id, 0) + 1
+        self._triggers.pop(task_id, None)
+        self.next_runs.pop(task_id, None)
+        self._pending_retries.pop(task_id, None)
+        self._catch_up_backlog.pop(task_id, None)
+
+    def _push_fire(self, task_id: str, fire_time: datetime, generation: int):
+        """调用方需持有 _timer_cond"""
+        heapq.heappush(self._timer_heap, (fire_time.timestamp(), next(self._timer_seq), task_id, generation, 0))
+        self.next_runs[task_id] = fire_time
+
+    def _retry_delay(self, attempt: int) -> float:
+        """第 attempt 次尝试失败后的等待秒数：指数退避，封顶后加随机抖动"""
+        settings = self.settings
+        delay = min(settings.retry_delay * settings.retry_backoff ** (attempt - 1), settings.retry_max_delay)
+        jitter = max(0.0, min(float(settings.retry_jitter), 1.0))
+        return delay * random.uniform(1 - jitter, 1 + jitter)
+
+    def _refresh_search_index(self):
+        try:
+            self.search_index.refresh()
+        except Exception as e:
+            self.logger.error(f"更新搜索索引失败: {e}")
+
+    def _on_task_done(self, runner: TaskRunner, attempt: int, status: Optional[str], task_type: str = "scheduled"):
+        """
+        执行器回调：任务结束且并发名额已释放后，持久化执行结果，按失败类型决定是否重新入队重试，
+        无需重试时继续执行剩余的启动补跑
+        """
+        if status is not None:
+            self.state_store.record_result(runner.task.id, runner.last_run, runner.last_status, runner.last_output,
+                                           runner.last_duration)
+            if self.search_index:
+                # 任务可能生成了新报告，后台增量更新搜索索引
+                Thread(target=self._refresh_search_index, daemon=True).start()
+        if self._schedule_retry(runner, attempt, status, task_type):
+            return
+
+        task_id = runner.task.id
+        with self._timer_cond:
+            remaining = self._catch_up_backlog.get(task_id, 0)
+            if remaining <= 0 or not self.running or self.tasks.get(task_id) is not runner:
+                self._catch_up_backlog.pop(task_id, None)
+                return
+            if remaining == 1:
+                del self._catch_up_backlog[task_id]
+            else:
+                self._catch_up_backlog[task_id] = remaining - 1
+        self.logger.info(f"任务 {runner.task.name} 继续补跑，剩余 {remaining - 1} 次")
+        self._run_task(runner)
+
+    def _schedule_retry(self, runner: TaskRunner, attempt: int, status: Optional[str],
+                        task_type: str = "scheduled") -> bool:
+        """
+        需要重试时将重试放入定时器堆等待，退避期间不占用工作线程和并发名额；重试沿用原执行的触发方式
+
+        Returns:
+            bool: 是否已安排重试
+        """
+        task = runner.task
+        if status is None or status not in self.settings.retry_on or not self.running:
+            return False
+        if attempt >= self.settings.retry_count:
+            if self.settings.retry_count > 1:
+                self.logger.error(f"任务 {task.name} 已尝试 {attempt} 次仍失败，放弃重试")
+            return False
+
+        delay = self._retry_delay(attempt)
+        retry_at = self._now().timestamp() + delay
+        with self._timer_cond:
+            if self.tasks.get(task.id) is not runner:
+                # 任务已从配置中删除，不再重试
+                return False
+            token = next(self._timer_seq)
+            self._pending_retries[task.id] = (token, retry_at, task_type)
+            heapq.heappush(self._timer_heap, (retry_at, next(self._timer_seq), task.id, token, attempt + 1))
+            self._timer_cond.notify()
+        self.logger.info(f"任务 {task.name} {status}，{delay:.0f}秒后进行第 {attempt + 1} 次尝试")
+        return True
+
+    def _pop_due_tasks(self) -> List[tuple]:
+        """
+        等待到最近的触发时间，返回已到期的 (任务, 第几次尝试, 触发方式)，并为常规触发计算下次触发时间
+
+        堆中的过期条目（任务已被重新调度、重试已被取代）通过 generation / 重试令牌比对惰性丢弃；
+        多节点部署时备用节点同样推进定时器堆（以便随时接管），但认领不到触发，不会执行
+        """
+        with self._timer_cond:
+            delay = self._timer_heap[0][0] - time.time() if self._timer_heap else MAX_TIMER_WAIT
+            if delay > 0:
+                self._timer_cond.wait(min(delay, MAX_TIMER_WAIT))
+                return []
+
+            due = []
+            now = self._now()
+            while self._timer_heap and self._timer_heap[0][0] <= now.timestamp():
+                fire_ts, _, task_id, generation, attempt = heapq.heappop(self._timer_heap)
+                runner = self.tasks.get(task_id)
+                if attempt:
+                    pending = self._pending_retries.get(task_id)
+                    if runner is None or pending is None or pending[0] != generation:
+                        continue
+                    del self._pending_retries[task_id]
+                    due.append((runner, attempt, fire_ts, None, pending[2]))
+                    continue
+
+                if self._generations.get(task_id) != generation or runner is None:
+                    continue
+                # 常规触发取代尚未执行的重试和补跑
+                self._pending_retries.pop(task_id, None)
+                self._catch_up_backlog.pop(task_id, None)
+                # 从当前时间计算下次触发，调度线程延迟期间错过的触发不会集中补跑
+                next_fire = self._triggers[task_id].next_fire(now)
+                self._push_fire(task_id, next_fire, generation)
+                due.append((runner, 1, fire_ts, next_fire, "scheduled"))
+
+        dispatched = []
+        for runner, attempt, fire_ts, next_fire, task_type in due:
+            if not self._claim_fire(runner.task.id, fire_ts, scheduled=attempt == 1):
                 continue
-                
-            schedule_type = task.schedule.get('type')
-            
-            if schedule_type == 'cron':
-                self._schedule_cron(task, runner)
-            elif schedule_type == 'interval':
-                self._schedule_interval(task, runner)
-            elif schedule_type == 'daily':
-                self._schedule_daily(task, runner)
+            if attempt == 1:
+                self.state_store.record_fire(runner.task.id, datetime.fromtimestamp(fire_ts, now.tzinfo), next_fire)
+            dispatched.append((runner, attempt, task_type))
+        return dispatched
+
+    def _claim_fire(self, task_id: str, fire_ts: float, scheduled: bool = True) -> bool:
+        """多节点部署时认领本次触发（scheduled 为 False 表示重试），单节点时总是返回 True"""
+        if self.lease is None:
+            return True
+        if self.lease.claim_fire(task_id, fire_ts, scheduled):
+            return True
+        self.logger.debug(f"任务 {task_id} 的本次触发未被本节点认领（非主节点或已被其他节点执行）")
+        return False
+
+    def _run_lease_keeper(self):
+        """定期续约租约，成为主节点时补跑错过的触发"""
+        interval = max(self.lease.ttl / 3, 1)
+        was_leader = False
+        while self.running:
+            token = self.lease.try_acquire()
+            if token is not None and not was_leader:
+                self.logger.info(f"节点 {self.lease.node_id} 成为主节点 (fencing token: {token})")
+                self.lease.prune()
+                self.state_store.reload()
+                # 本节点的状态文件不含旧主节点的触发记录，以共享的触发时间为准
+                shared_last_fires = self.lease.get_last_fires()
+                self._align_interval_tasks(shared_last_fires)
+                self._catch_up_missed_runs(shared_last_fires)
+            elif token is None and was_leader:
+                self.logger.warning(f"节点 {self.lease.node_id} 已失去主节点租约，停止分发任务")
+            was_leader = token is not None
+
+            with self._lease_stop:
+                self._lease_stop.wait(interval)
+
+    def _align_interval_tasks(self, last_fires: Dict[str, float]):
+        """
+        接管后按共享的上次触发时间对齐间隔任务的下次触发
+
+        间隔触发以各节点自己的调度时间为相位，沿用本节点的相位会在旧主节点刚执行过后不久再次触发，
+        且触发时间与旧主节点不同，认领去重无法识别；改为从旧主节点最近一次触发起按整数个间隔推算
+        """
+        now = self._now()
+        with self._timer_cond:
+            for task_id, trigger in self._triggers.items():
+                if not isinstance(trigger, IntervalTrigger) or task_id not in last_fires:
+                    continue
+                last_fire = datetime.fromtimestamp(last_fires[task_id], now.tzinfo)
+                periods = max((now - last_fire) // trigger.interval + 1, 1)
+                generation = self._generations.get(task_id, 0) + 1
+                self._generations[task_id] = generation
+                self._push_fire(task_id, last_fire + trigger.interval * periods, generation)
+            self._timer_cond.notify()
+        self._save_next_runs()
+
+    def _missed_fires(self, trigger, last_fire: datetime, now: datetime, grace: float) -> List[datetime]:
+        """计算 last_fire 之后、距今不超过 grace 秒的错过的触发时间（最多保留最近 MAX_CATCH_UP_RUNS 次）"""
+        cursor = last_fire
+        window_start = now - timedelta(seconds=grace)
+        if cursor < window_start:
+            if isinstance(trigger, IntervalTrigger):
+                # 间隔触发以上次触发时间为相位，按整数个间隔跳到容忍窗口内
+                cursor += trigger.interval * ((window_start - cursor) // trigger.interval)
             else:
-                self.logger.warning(f"未知的调度类型: {schedule_type}")
+                cursor = window_start
+        missed: List[datetime] = []
+        while True:
+            fire_time = trigger.next_fire(cursor)
+            if fire_time > now:
+                return missed
+            missed.append(fire_time)
+            if len(missed) > MAX_CATCH_UP_RUNS:
+                missed.pop(0)
+            cursor = fire_time
 
-    def _schedule_cron(self, task: TaskConfig, runner: TaskRunner):
-        expression = task.schedule.get('expression', '')
-        parts = expression.split()
-        
-        if len(parts) == 5:
-            minute, hour, day, month, day_of_week = parts
-            
-            job = schedule.every()
-            
-            if day_of_week != '*':
-                job = job.day_of_week
-            elif day != '*':
-                job = job.day
-                
-            job.at(f"{hour}:{minute}").do(self._run_task, runner)
-            self.logger.info(f"已设置 cron 任务: {task.name} ({expression})")
-        else:
-            self.logger.error(f"无效的 cron 表达式: {expression}")
+    def _catch_up_missed_runs(self, shared_last_fires: Optional[Dict[str, float]] = None):
+        """
+        启动（或接管主节点）时补跑停机期间错过的触发
 
-    def _schedule_interval(self, task: TaskConfig, runner: TaskRunner):
-        minutes = task.schedule.get('minutes', 60)
-        schedule.every(minutes).minutes.do(self._run_task, runner)
-        self.logger.info(f"已设置间隔任务: {task.name} (每 {minutes} 分钟)")
+        Args:
+            shared_last_fires: 多节点部署时租约数据库中各任务最近一次触发的时间戳，与本地状态文件取较晚者
+        """
+        now = self._now()
+        shared_last_fires = shared_last_fires or {}
+        for task_id, runner in list(self.tasks.items()):
+            trigger = self._triggers.get(task_id)
+            last_fire = self.state_store.get_last_fire(task_id)
+            if task_id in shared_last_fires:
+                shared = datetime.fromtimestamp(shared_last_fires[task_id], now.tzinfo)
+                last_fire = max(last_fire, shared) if last_fire else shared
+            if trigger is None or last_fire is None:
+                continue
 
-    def _schedule_daily(self, task: TaskConfig, runner: TaskRunner):
-        time_str = task.schedule.get('time', '00:00')
-        schedule.every().day.at(time_str).do(self._run_task, runner)
-        self.logger.info(f"已设置每日任务: {task.name} (每天 {time_str})")
+            grace = runner.task.misfire_grace_time
+            if grace is None:
+                grace = self.settings.misfire_grace_time
+            try:
+                if trigger.next_fire(last_fire) > now:
+                    continue
+                missed = self._missed_fires(trigger, last_fire, now, grace) if grace > 0 else []
+            except ValueError as e:
+                self.logger.error(f"任务 {runner.task.name} 计算错过的触发失败: {e}")
+                continue
 
-    def _run_task(self, runner: TaskRunner):
-        if runner.running:
-            self.logger.warning(f"任务 {runner.task.name} 正在运行中，跳过本次执行")
-            return
-            
-        thread = Thread(target=runner.run, daemon=True)
-        thread.start()
+            if not missed:
+                self.logger.warning(f"任务 {runner.task.name} 停机期间错过触发，已超过容忍时间 {grace} 秒，不再补跑")
+                continue
+
+            runs = 1 if self.settings.coalesce else len(missed)
+            self.logger.info(
+                f"任务 {runner.task.name} 停机期间错过 {len(missed)} 次触发"
+                f"（最近一次 {missed[-1].strftime('%Y-%m-%d %H:%M:%S')}），补跑 {runs} 次"
+            )
+            if not self._claim_fire(task_id, missed[-1].timestamp()):
+                continue
+            self.state_store.record_fire(task_id, missed[-1])
+            if runs > 1:
+                with self._timer_cond:
+                    self._catch_up_backlog[task_id] = runs - 1
+            self._run_task(runner)
+
+    def _run_task(self, runner: TaskRunner, attempt: int = 1, task_type: str = "scheduled"):
+        if not self.executor.submit(runner, attempt, task_type):
+            self.logger.warning(f"任务 {runner.task.name} 正在运行或排队中，跳过本次执行")
 
     def start(self, watch_config: bool = True):
         if self.running:
@@ -394,21 +923,45 @@ class TaskScheduler:
         self.running = True
         self._schedule_tasks()
         
+        # 有任务使用预热进程时，提前完成模块预加载
+        if any(r.task.enabled and r.task.executor == 'forkserver' for r in self.tasks.values()):
+            self.worker_pool.warm_up()
+        
+        if self.lease is None:
+            self._catch_up_missed_runs()
+        else:
+            # 多节点部署时由租约线程在成为主节点后补跑
+            self.lease_thread = Thread(target=self._run_lease_keeper, daemon=True)
+            self.lease_thread.start()
+        
         self.scheduler_thread = Thread(target=self._run_scheduler, daemon=True)
         self.scheduler_thread.start()
         
+        if self.search_index:
+            # 索引调度器停止期间新增或修改的报告
+            Thread(target=self._refresh_search_index, daemon=True).start()
+        
         # 启动配置文件监控
         if watch_config:
             self.config_watcher = ConfigWatcher(self, check_interval=5)
             self.config_watcher.start_watching()
         
+        # 启动控制通道，接收 Web 服务和命令行提交的手动执行
+        if self.settings.control_socket:
+            server = ControlServer(self.settings.control_socket, self._handle_control_command)
+            try:
+                if server.start_serving():
+                    self.control_server = server
+            except OSError as e:
+                self.logger.warning(f"控制通道启动失败: {e}")
+        
         self.logger.info("调度器已启动")
 
     def _run_scheduler(self):
         while self.running:
             try:
-                schedule.run_pending()
-                time.sleep(1)
+                for runner, attempt, task_type in self._pop_due_tasks():
+                    self._run_task(runner, attempt, task_type)
             except Exception as e:
                 self.logger.error(f"调度器异常: {e}")
                 time.sleep(5)
@@ -417,34 +970,107 @@ class TaskScheduler:
         self.running = False
         if self.config_watcher:
             self.config_watcher.stop_watching()
+        if self.control_server:
+            self.control_server.stop()
+            self.control_server = None
+        with self._timer_cond:
+            self._timer_cond.notify_all()
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=5)
-        schedule.clear()
+        if self.lease_thread:
+            with self._lease_stop:
+                self._lease_stop.notify_all()
+            self.lease_thread.join(timeout=5)
+            self.lease.release()
+        with self._timer_cond:
+            self._timer_heap.clear()
+            self.next_runs.clear()
+            self._pending_retries.clear()
+            self._catch_up_backlog.clear()
+        self.executor.shutdown()
         self.logger.info("调度器已停止")
 
     def get_task_status(self) -> List[dict]:
         status_list = []
-        for task_id, runner in self.tasks.items():
+        for task_id, runner in list(self.tasks.items()):
             status_list.append({
                 'id': task_id,
                 'name': runner.task.name,
                 'enabled': runner.task.enabled,
                 'running': runner.running,
+                'queued': self.executor.is_queued(task_id),
+                'priority': runner.task.priority,
+                'group': runner.task.group,
+                'last_wait_seconds': self.executor.get_last_wait(task_id),
                 'last_run': runner.last_run.isoformat() if runner.last_run else None,
+                'next_run': self.next_runs[task_id].isoformat() if task_id in self.next_runs else None,
+                'retry_at': self._retry_at(task_id),
                 'last_status': runner.last_status,
                 'last_output': runner.last_output[:500] if runner.last_output else None
             })
         return status_list
 
-    def run_task_now(self, task_id: str):
+    def _retry_at(self, task_id: str) -> Optional[str]:
+        pending = self._pending_retries.get(task_id)
+        if pending is None:
+            return None
+        return datetime.fromtimestamp(pending[1], pytz.timezone(self.settings.timezone)).isoformat()
+
+    def get_executor_stats(self) -> dict:
+        """获取执行器的队列深度、并发组占用和等待时间统计"""
+        return self.executor.get_stats()
+
+    def run_task_now(self, task_id: str, task_type: str = "manual") -> bool:
+        """
+        立即执行任务，与定时触发共用执行器的并发限制和失败重试
+
+        Returns:
+            bool: 已提交返回 True；任务正在运行或排队中返回 False
+
+        Raises:
+            ValueError: 任务不存在
+        """
         if task_id not in self.tasks:
             raise ValueError(f"任务不存在: {task_id}")
             
         runner = self.tasks[task_id]
-        thread = Thread(target=runner.run, daemon=True)
-        thread.start()
+        if not self.executor.submit(runner, task_type=task_type):
+            self.logger.warning(f"任务 {runner.task.name} 正在运行或排队中，跳过本次执行")
+            return False
+        # 手动执行取代尚未执行的重试
+        with self._timer_cond:
+            self._pending_retries.pop(task_id, None)
         return True
 
+    def _handle_control_command(self, request: dict) -> dict:
+        """处理控制通道命令: ping（存活检查）、stats（执行器统计）、run（立即执行任务）"""
+        command = request.get("command")
+        if command == "ping":
+            return {"success": True, "message": "pong", "node_id": self.node_id, "tasks": len(self.tasks)}
+        if command == "stats":
+            return {"success": True, "message": "ok", "node_id": self.node_id, "stats": self.get_executor_stats()}
+        if command == "run":
+            task_id = request.get("task_id")
+            runner = self.tasks.get(task_id)
+            if runner is None:
+                return {"success": False, "error": "not_found", "message": f"任务不存在: {task_id}"}
+            if not runner.task.enabled:
+                return {"success": False, "error": "disabled", "message": "任务已禁用，无法运行"}
+            if self.lease is not None and not self.lease.verify():
+                # 多节点部署时只有主节点执行任务，备用节点的手动执行同样受租约约束
+                leader = self.lease.holder()
+                return {"success": False, "error": "not_leader",
+                        "message": f"本节点不是主节点，请在主节点{f' {leader} ' if leader else ''}上执行"}
+            if not self.run_task_now(task_id):
+                return {"success": False, "error": "busy", "message": "任务正在运行或排队中"}
+            self.logger.info(f"收到手动执行请求: {runner.task.name}")
+            return {
+                "success": True,
+                "message": f"任务 '{runner.task.name}' 已提交",
+                "queued": self.executor.is_queued(task_id),
+            }
+        return {"success": False, "error": "bad_request", "message": f"未知命令: {command}"}
+
 
 if __name__ == "__main__":
     scheduler = TaskScheduler()
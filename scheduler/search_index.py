@@ -0,0 +1,305 @@
+"""
+报告全文检索模块
+为 data/result 下的 markdown 报告和 data/json 下的新闻 JSON 建立 sqlite FTS5 倒排索引：
+- 中文按相邻两字切分（bigram），英文和数字按词切分，查询时同样切分并按短语匹配，不依赖分词词典；
+  另有一列保存文档中出现过的单个汉字，用于匹配 "金"、"A股" 这类只含单个汉字的查询
+- 增量更新：按文件 mtime 和大小判断变化，只重新索引新增或修改的文件，已删除的文件从索引移除
+- 索引只由调度器更新（启动时和每个任务执行结束后），Web 服务只读查询
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_date ON documents (date);
+-- 无内容（contentless）FTS 表只保存倒排索引，原文保存在 documents 表中
+-- tokens: 中文两字词和英文单词（按原文顺序）；chars: 文档中出现过的汉字（去重）
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(tokens, chars, content='');
+"""
+
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_PATTERN = re.compile(f"[{_CJK}]+|[A-Za-z0-9]+")
+_CJK_PATTERN = re.compile(f"[{_CJK}]")
+_DATE_PATTERN = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})")
+
+# 摘要前后保留的字符数
+SNIPPET_CONTEXT = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """中文连续片段切分为相邻两字，单个汉字保留原样；英文和数字转为小写整词"""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        word = match.group()
+        if _CJK_PATTERN.match(word):
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+
+def cjk_chars(text: str) -> List[str]:
+    """文本中出现过的汉字，按首次出现顺序去重"""
+    return list(dict.fromkeys(_CJK_PATTERN.findall(text)))
+
+
+def _build_match_query(query: str) -> Optional[str]:
+    """
+    每个空格分隔的查询词转为 FTS5 表达式，多个查询词之间为 AND 关系
+
+    查询词按 tokens 列的短语匹配；其中单独的一个汉字（如 "金"、"A股" 中的 "股"）不会以两字词的形式出现在
+    tokens 列中，改为匹配 chars 列，查询词的其余部分仍按短语匹配
+    """
+    clauses = []
+    for term in query.split():
+        segment: List[str] = []
+        for match in _TOKEN_PATTERN.finditer(term):
+            word = match.group()
+            if len(word) == 1 and _CJK_PATTERN.match(word):
+                if segment:
+                    clauses.append('tokens : "' + " ".join(segment) + '"')
+                    segment = []
+                clauses.append(f'chars : "{word}"')
+            else:
+                segment.extend(tokenize(word))
+        if segment:
+            clauses.append('tokens : "' + " ".join(segment) + '"')
+    return " AND ".join(clauses) if clauses else None
+
+
+def _json_text(value) -> Iterator[str]:
+    """递归提取 JSON 中的文本，跳过链接"""
+    if isinstance(value, str):
+        if not value.startswith(("http://", "https://")):
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _json_text(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _json_text(item)
+
+
+class SearchIndex:
+    """
+    报告全文索引
+
+    每个线程使用独立的连接；刷新索引在 BEGIN IMMEDIATE 事务中进行，不影响其他进程同时查询
+    """
+
+    def __init__(self, db_path: str = "data/search_index.db", data_dir: str = "data"):
+        self.db_path = db_path
+        self.data_dir = data_dir
+        self.logger = logging.getLogger("SearchIndex")
+        self._local = threading.local()
+        self._refresh_lock = threading.Lock()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _iter_sources(self) -> Iterator[Tuple[str, str, str, os.stat_result]]:
+        """遍历需要索引的文件: (相对路径, 类型, 所在文件夹, stat)"""
+        sources = [("result", ".md", "report"), ("json", ".json", "json")]
+        for sub_dir, suffix, kind in sources:
+            root = os.path.join(self.data_dir, sub_dir)
+            for dir_path, _, file_names in os.walk(root):
+                for name in file_names:
+                    if not name.endswith(suffix):
+                        continue
+                    full_path = os.path.join(dir_path, name)
+                    try:
+                        st = os.stat(full_path)
+                    except OSError:
+                        continue
+                    rel_path = os.path.relpath(full_path, self.data_dir).replace(os.sep, "/")
+                    folder = os.path.relpath(dir_path, root).replace(os.sep, "/")
+                    yield rel_path, kind, "" if folder == "." else folder, st
+
+    def _extract(self, rel_path: str, kind: str) -> Tuple[str, str]:
+        """读取文件，返回 (标题, 正文)"""
+        with open(os.path.join(self.data_dir, rel_path), "r", encoding="utf-8", errors="ignore") as f:
+            raw = f.read()
+        if kind == "json":
+            try:
+                content = "\n".join(_json_text(json.loads(raw)))
+            except ValueError:
+                content = raw
+            return os.path.basename(rel_path), content
+
+        title = os.path.basename(rel_path)
+        for line in raw.splitlines():
+            if line.startswith("#"):
+                title = line.lstrip("#").strip() or title
+                break
+        return title, raw
+
+    @staticmethod
+    def _document_date(rel_path: str, st: os.stat_result) -> str:
+        match = _DATE_PATTERN.search(os.path.basename(rel_path))
+        if match:
+            try:
+                return datetime(*map(int, match.groups())).strftime("%Y-%m-%d")
+            except ValueError:
+                pass
+        return datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _tokens(title: str, content: str) -> Tuple[str, str]:
+        """返回 (tokens 列, chars 列) 的内容"""
+        text = title + "\n" + content
+        return " ".join(tokenize(text)), " ".join(cjk_chars(text))
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        增量更新索引
+
+        Returns:
+            dict: indexed（新增或重新索引的文件数）、removed（移除的文件数）
+        """
+        with self._refresh_lock:
+            conn = self._connect()
+            known = {
+                row["path"]: (row["id"], row["mtime_ns"], row["size"])
+                for row in conn.execute("SELECT id, path, mtime_ns, size FROM documents")
+            }
+            changed = []
+            seen = set()
+            for rel_path, kind, folder, st in self._iter_sources():
+                seen.add(rel_path)
+                entry = known.get(rel_path)
+                if entry is None or entry[1:] != (st.st_mtime_ns, st.st_size):
+                    changed.append((rel_path, kind, folder, st))
+            removed = [path for path in known if path not in seen]
+
+            indexed = 0
+            if changed or removed:
+                # 先在事务外读取文件内容，缩短持有写锁的时间
+                documents = []
+                for rel_path, kind, folder, st in changed:
+                    try:
+                        title, content = self._extract(rel_path, kind)
+                    except OSError as e:
+                        self.logger.warning(f"读取 {rel_path} 失败: {e}")
+                        continue
+                    documents.append((rel_path, kind, folder, st, title, content))
+
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for rel_path in removed + [doc[0] for doc in documents]:
+                        row = conn.execute(
+                            "SELECT id, title, content FROM documents WHERE path = ?", (rel_path,)
+                        ).fetchone()
+                        if row:
+                            # 无内容 FTS 表删除时需要提供与写入时相同的词条
+                            conn.execute(
+                                "INSERT INTO documents_fts (documents_fts, rowid, tokens, chars) "
+                                "VALUES ('delete', ?, ?, ?)",
+                                (row["id"], *self._tokens(row["title"], row["content"])),
+                            )
+                            conn.execute("DELETE FROM documents WHERE id = ?", (row["id"],))
+                    for rel_path, kind, folder, st, title, content in documents:
+                        cursor = conn.execute(
+                            "INSERT INTO documents (path, kind, folder, title, date, mtime_ns, size, content) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (rel_path, kind, folder, title, self._document_date(rel_path, st),
+                             st.st_mtime_ns, st.st_size, content),
+                        )
+                        conn.execute(
+                            "INSERT INTO documents_fts (rowid, tokens, chars) VALUES (?, ?, ?)",
+                            (cursor.lastrowid, *self._tokens(title, content)),
+                        )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                indexed = len(documents)
+                self.logger.info(f"搜索索引已更新: 索引 {indexed} 个文件，移除 {len(removed)} 个文件")
+
+            return {"indexed": indexed, "removed": len(removed)}
+
+    @staticmethod
+    def _snippet(content: str, terms: List[str]) -> str:
+        lowered = content.lower()
+        positions = [p for p in (lowered.find(term.lower()) for term in terms) if p >= 0]
+        if not positions:
+            return content[:SNIPPET_CONTEXT * 2].strip()
+        position = min(positions)
+        start = max(0, position - SNIPPET_CONTEXT)
+        end = min(len(content), position + SNIPPET_CONTEXT)
+        snippet = " ".join(content[start:end].split())
+        return ("…" if start > 0 else "") + snippet + ("…" if end < len(content) else "")
+
+    def search(self, query: str, kind: Optional[str] = None, folder: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None,
+               limit: int = 20, offset: int = 0) -> Dict:
+        """
+        全文检索，按相关度（bm25）排序，相关度相同时较新的在前
+
+        Args:
+            query: 查询词，多个词用空格分隔（同时包含才匹配）
+            kind: 'report' 或 'json'
+            folder: 报告所在文件夹，如 final / news
+            since / until: 日期范围（YYYY-MM-DD，含两端）
+
+        Returns:
+            dict: total（匹配总数）和 results（path、kind、folder、title、date、snippet、score）
+        """
+        match_query = _build_match_query(query)
+        if not match_query:
+            return {"total": 0, "results": []}
+
+        where, params = ["documents_fts MATCH ?"], [match_query]
+        for column, value, op in (("kind", kind, "="), ("folder", folder, "="),
+                                  ("date", since, ">="), ("date", until, "<=")):
+            if value:
+                where.append(f"d.{column} {op} ?")
+                params.append(value)
+        sql_from = f" FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid WHERE {' AND '.join(where)}"
+
+        conn = self._connect()
+        total = conn.execute("SELECT COUNT(*)" + sql_from, params).fetchone()[0]
+        rows = conn.execute(
+            "SELECT d.path, d.kind, d.folder, d.title, d.date, d.content, bm25(documents_fts) AS score"
+            + sql_from + " ORDER BY score, d.date DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+
+        terms = query.split()
+        results = [{
+            "path": row["path"],
+            "kind": row["kind"],
+            "folder": row["folder"],
+            "file": os.path.basename(row["path"]),
+            "title": row["title"],
+            "date": row["date"],
+            "snippet": self._snippet(row["content"], terms),
+            "score": round(-row["score"], 4),
+        } for row in rows]
+        return {"total": total, "results": results}
@@ -0,0 +1,117 @@
+"""
+调度器状态持久化模块
+记录每个任务最近一次的计划触发时间、执行结果和下次触发时间，调度器重启后据此恢复状态并补跑错过的触发；
+Web 服务也直接读取该文件作为任务状态索引
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class SchedulerStateStore:
+    """
+    调度器状态文件（JSON）
+
+    每个任务一条记录:
+        last_fire     最近一次已分发的计划触发时间（手动执行和重试不计入）
+        next_run      下次计划触发时间
+        last_run      最近一次执行结束时间
+        last_status   最近一次执行结果
+        last_duration 最近一次执行耗时（秒）
+        last_output   最近一次输出（截断）
+    写入时先写临时文件再原子替换，进程崩溃不会留下损坏的状态文件
+    """
+
+    def __init__(self, state_file: str = "scheduler/scheduler_state.json"):
+        self.state_file = Path(state_file)
+        self.logger = logging.getLogger("SchedulerState")
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self):
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                self._tasks = data.get('tasks', {})
+            self.logger.info(f"已加载 {len(self._tasks)} 个任务的调度状态")
+        except Exception as e:
+            self.logger.error(f"加载调度状态失败: {e}")
+
+    def _save(self):
+        """调用方需持有 _lock"""
+        data = {
+            'last_updated': datetime.now().isoformat(),
+            'tasks': self._tasks,
+        }
+        tmp_file = self.state_file.with_name(self.state_file.name + '.tmp')
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            self.logger.error(f"保存调度状态失败: {e}")
+
+    def reload(self):
+        """重新读取状态文件（多节点共享状态文件时，接管前读取其他节点写入的最新状态）"""
+        self._load()
+
+    def get(self, task_id: str) -> dict:
+        with self._lock:
+            return dict(self._tasks.get(task_id, {}))
+
+    def get_last_fire(self, task_id: str) -> Optional[datetime]:
+        value = self.get(task_id).get('last_fire')
+        return datetime.fromisoformat(value) if value else None
+
+    def record_fire(self, task_id: str, fire_time: datetime, next_run: Optional[datetime] = None):
+        """记录已分发的计划触发时间及随之计算出的下次触发时间"""
+        with self._lock:
+            entry = self._tasks.setdefault(task_id, {})
+            entry['last_fire'] = fire_time.isoformat()
+            if next_run is not None:
+                entry['next_run'] = next_run.isoformat()
+            self._save()
+
+    def record_next_runs(self, next_runs: Dict[str, Optional[datetime]]):
+        """批量更新下次触发时间（None 表示未调度），有变化时才写文件"""
+        with self._lock:
+            changed = False
+            for task_id, next_run in next_runs.items():
+                value = next_run.isoformat() if next_run else None
+                entry = self._tasks.setdefault(task_id, {})
+                if entry.get('next_run') != value:
+                    entry['next_run'] = value
+                    changed = True
+            if changed:
+                self._save()
+
+    def record_result(self, task_id: str, last_run: Optional[datetime], status: Optional[str], output: Optional[str],
+                      duration: Optional[float] = None):
+        """记录任务执行结果"""
+        with self._lock:
+            entry = self._tasks.setdefault(task_id, {})
+            entry['last_run'] = last_run.isoformat() if last_run else None
+            entry['last_status'] = status
+            entry['last_duration'] = duration
+            entry['last_output'] = output[:500] if output else None
+            self._save()
+
+    def prune(self, task_ids):
+        """删除配置中已不存在的任务记录"""
+        with self._lock:
+            removed = [t for t in self._tasks if t not in task_ids]
+            for task_id in removed:
+                del self._tasks[task_id]
+            if removed:
+                self._save()
@@ -2,14 +2,90 @@
 任务日志管理模块
 管理每个任务的独立日志文件，支持实时写入和读取
 """
+import collections
+import gzip
 import os
+import shutil
 import threading
+import queue
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import json
 
+try:
+    from .log_tail import tail_lines
+except ImportError:
+    from log_tail import tail_lines
+
+
+class _TaskLogWriter:
+    """
+    单个任务的缓冲日志写入器
+
+    每个任务独立加锁，不同任务的写入互不阻塞；日志行先写入内存缓冲区，
+    缓冲区超过 flush_bytes 时立即写盘，否则由后台刷新线程定时写盘
+    """
+
+    def __init__(self, log_path: str, flush_bytes: int):
+        self.log_path = log_path
+        self.start_time = datetime.now()
+        self.flush_bytes = flush_bytes
+        self.lock = threading.Lock()
+        self._handle = open(log_path, 'a', encoding='utf-8')
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._stamp_second = -1
+        self._stamp = ""
+
+    def _timestamp(self) -> str:
+        """同一秒内复用格式化好的时间戳"""
+        now = time.time()
+        second = int(now)
+        if second != self._stamp_second:
+            self._stamp_second = second
+            self._stamp = time.strftime("%H:%M:%S", time.localtime(now))
+        return self._stamp
+
+    def write(self, content: str, is_error: bool):
+        prefix = "[ERR]" if is_error else "[OUT]"
+        with self.lock:
+            line = f"{self._timestamp()} {prefix} {content}"
+            if not content.endswith('\n'):
+                line += '\n'
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if self._buffered >= self.flush_bytes:
+                self._flush_locked()
+
+    def write_raw(self, text: str):
+        with self.lock:
+            self._buffer.append(text)
+            self._buffered += len(text)
+
+    def _flush_locked(self):
+        if not self._buffer or self._handle.closed:
+            return
+        self._handle.write(''.join(self._buffer))
+        self._buffer.clear()
+        self._buffered = 0
+        self._handle.flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+    def close(self, durable: bool):
+        """写出剩余缓冲并关闭文件，durable 为 True 时 fsync 确保落盘"""
+        with self.lock:
+            try:
+                self._flush_locked()
+                if durable:
+                    os.fsync(self._handle.fileno())
+            finally:
+                self._handle.close()
+
 
 class TaskLogManager:
     """
@@ -27,20 +103,51 @@ class TaskLogManager:
                     cls._instance._initialized = False
         return cls._instance
     
-    def __init__(self, logs_dir: str = "logs/tasks"):
+    def __init__(self, logs_dir: str = "logs/tasks", flush_interval: float = 0.5,
+                 flush_bytes: int = 64 * 1024, fsync_on_end: bool = True,
+                 keep_uncompressed: int = 3, max_logs_per_task: int = 200, max_age_days: int = 180,
+                 max_task_bytes: int = 200 * 1024 * 1024, max_total_bytes: int = 2 * 1024 * 1024 * 1024):
+        """
+        Args:
+            logs_dir: 日志根目录
+            flush_interval: 后台刷新线程写盘间隔（秒）
+            flush_bytes: 单个任务缓冲超过该字节数时立即写盘
+            fsync_on_end: 任务结束时是否 fsync，保证日志在任务结束后已落盘
+            keep_uncompressed: 每个任务保留不压缩的最近日志数，更早的已结束日志压缩为 .log.gz
+            max_logs_per_task: 每个任务最多保留的日志数
+            max_age_days: 日志最长保留天数
+            max_task_bytes: 每个任务日志占用的磁盘上限（字节）
+            max_total_bytes: 所有任务日志占用的磁盘上限（字节）
+        """
         if self._initialized:
             return
         
         self._initialized = True
         self.logs_dir = Path(logs_dir)
         self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.fsync_on_end = fsync_on_end
         
-        # 当前正在写入的日志文件句柄 {task_id: file_handle}
-        self._active_logs: Dict[str, tuple] = {}  # (file_path, file_handle, start_time)
+        # 当前正在写入的日志 {task_id: _TaskLogWriter}
+        # 全局锁只保护字典的增删，写入时使用各任务自己的锁
+        self._active_logs: Dict[str, _TaskLogWriter] = {}
         self._active_logs_lock = threading.Lock()
         
-        # 保留日志文件数量
-        self._max_logs_per_task = 10
+        # 启动后台刷新线程
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+        
+        # 日志保留策略
+        self.keep_uncompressed = max(1, keep_uncompressed)
+        self._max_logs_per_task = max_logs_per_task
+        self.max_age_days = max_age_days
+        self.max_task_bytes = max_task_bytes
+        self.max_total_bytes = max_total_bytes
+        # 各任务日志目录占用的字节数，供总量预算判断
+        self._task_dir_sizes: Dict[str, int] = {}
+        # 任务结束后等待整理的任务，由清理线程处理
+        self._maintenance_queue: "queue.Queue[Optional[str]]" = queue.Queue()
         
         # 启动清理线程
         self._cleanup_thread = threading.Thread(target=self._cleanup_old_logs_loop, daemon=True)
@@ -65,10 +172,18 @@ class TaskLogManager:
         """
         task_dir = self._get_task_log_dir(task_id)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = task_dir / f"{timestamp}.log"
+        # 同一秒内多次执行（如立即开始的重试）时依次加序号，不覆盖已有日志
+        sequence = 0
+        while True:
+            log_file = task_dir / (f"{timestamp}.log" if sequence == 0 else f"{timestamp}_{sequence}.log")
+            try:
+                f = open(log_file, 'x', encoding='utf-8')
+                break
+            except FileExistsError:
+                sequence += 1
         
         # 创建日志文件并写入头部信息
-        with open(log_file, 'w', encoding='utf-8') as f:
+        with f:
             f.write(f"{'='*60}\n")
             f.write(f"任务: {task_name}\n")
             f.write(f"任务ID: {task_id}\n")
@@ -77,18 +192,17 @@ class TaskLogManager:
             f.flush()
         
         # 记录到活跃日志
+        writer = _TaskLogWriter(str(log_file), self.flush_bytes)
         with self._active_logs_lock:
-            # 如果该任务已有活跃日志，先关闭
-            if task_id in self._active_logs:
-                old_path, old_handle, _ = self._active_logs[task_id]
-                try:
-                    old_handle.close()
-                except:
-                    pass
-            
-            # 以追加模式打开新日志文件
-            file_handle = open(log_file, 'a', encoding='utf-8')
-            self._active_logs[task_id] = (str(log_file), file_handle, datetime.now())
+            old_writer = self._active_logs.get(task_id)
+            self._active_logs[task_id] = writer
+        
+        # 如果该任务已有活跃日志，先关闭
+        if old_writer:
+            try:
+                old_writer.close(durable=False)
+            except Exception:
+                pass
         
         # 更新 latest.log 软链接/快捷方式
         self._update_latest_link(task_id, log_file)
@@ -120,21 +234,15 @@ class TaskLogManager:
             content: 日志内容
             is_error: 是否是错误输出
         """
-        with self._active_logs_lock:
-            if task_id not in self._active_logs:
-                return
-            
-            _, file_handle, _ = self._active_logs[task_id]
-            
-            try:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                prefix = "[ERR]" if is_error else "[OUT]"
-                file_handle.write(f"{timestamp} {prefix} {content}")
-                if not content.endswith('\n'):
-                    file_handle.write('\n')
-                file_handle.flush()
-            except Exception as e:
-                print(f"写入日志失败: {e}")
+        # dict.get 是原子操作，写入路径不需要全局锁
+        writer = self._active_logs.get(task_id)
+        if writer is None:
+            return
+        
+        try:
+            writer.write(content, is_error)
+        except Exception as e:
+            print(f"写入日志失败: {e}")
     
     def end_task_log(self, task_id: str, status: str = "completed"):
         """
@@ -145,25 +253,26 @@ class TaskLogManager:
             status: 任务结束状态
         """
         with self._active_logs_lock:
-            if task_id not in self._active_logs:
-                return
-            
-            log_path, file_handle, start_time = self._active_logs[task_id]
-            
-            try:
-                # 写入结束标记
-                duration = datetime.now() - start_time
-                file_handle.write(f"\n{'='*60}\n")
-                file_handle.write(f"任务结束状态: {status}\n")
-                file_handle.write(f"结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                file_handle.write(f"执行时长: {duration}\n")
-                file_handle.write(f"{'='*60}\n")
-                file_handle.flush()
-                file_handle.close()
-            except Exception as e:
-                print(f"结束日志失败: {e}")
-            finally:
-                del self._active_logs[task_id]
+            writer = self._active_logs.pop(task_id, None)
+        if writer is None:
+            return
+        
+        try:
+            # 写入结束标记
+            duration = datetime.now() - writer.start_time
+            writer.write_raw(
+                f"\n{'='*60}\n"
+                f"任务结束状态: {status}\n"
+                f"结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"执行时长: {duration}\n"
+                f"{'='*60}\n"
+            )
+            writer.close(durable=self.fsync_on_end)
+        except Exception as e:
+            print(f"结束日志失败: {e}")
+        
+        # 压缩和清理该任务的旧日志
+        self._maintenance_queue.put(task_id)
     
     def get_task_logs(self, task_id: str) -> List[Dict]:
         """
@@ -179,20 +288,49 @@ class TaskLogManager:
         logs = []
         
         try:
-            for log_file in sorted(task_dir.glob("*.log"), key=lambda x: x.stat().st_mtime, reverse=True):
-                stat = log_file.stat()
+            for log_file, stat in self._list_log_files(task_dir):
                 logs.append({
                     'filename': log_file.name,
                     'path': str(log_file),
                     'size': self._format_size(stat.st_size),
                     'created': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
-                    'is_latest': self._is_latest_log(task_id, log_file.name)
+                    'is_latest': self._is_latest_log(task_id, log_file.name),
+                    'compressed': log_file.name.endswith('.gz')
                 })
         except Exception as e:
             print(f"获取任务日志列表失败: {e}")
         
         return logs
     
+    @staticmethod
+    def _list_log_files(task_dir: Path) -> List[Tuple[Path, os.stat_result]]:
+        """列出目录下的日志文件（含已压缩的），按修改时间从新到旧排序"""
+        files = []
+        with os.scandir(task_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and (entry.name.endswith('.log') or entry.name.endswith('.log.gz')):
+                    files.append((Path(entry.path), entry.stat()))
+        files.sort(key=lambda item: item[1].st_mtime, reverse=True)
+        return files
+    
+    def _resolve_log_file(self, task_id: str, log_filename: str) -> Path:
+        """
+        定位日志文件，原始日志已被压缩时返回对应的 .gz 文件
+        """
+        task_dir = self._get_task_log_dir(task_id)
+        log_file = task_dir / Path(log_filename).name
+        if not log_file.exists() and not log_file.name.endswith('.gz'):
+            compressed = log_file.with_name(log_file.name + '.gz')
+            if compressed.exists():
+                return compressed
+        return log_file
+    
+    @staticmethod
+    def _tail_compressed(log_file: Path, lines: int) -> str:
+        """读取压缩日志的最后 N 行（需要顺序解压，只保留最后 N 行在内存中）"""
+        with gzip.open(log_file, 'rt', encoding='utf-8', errors='ignore') as f:
+            return ''.join(collections.deque(f, maxlen=lines)) if lines > 0 else ''
+    
     def _is_latest_log(self, task_id: str, filename: str) -> bool:
         """检查是否是最近的日志文件"""
         task_dir = self._get_task_log_dir(task_id)
@@ -220,30 +358,28 @@ class TaskLogManager:
         Returns:
             str: 日志内容
         """
-        task_dir = self._get_task_log_dir(task_id)
-        log_file = task_dir / log_filename
+        log_file = self._resolve_log_file(task_id, log_filename)
         
         if not log_file.exists():
             return "日志文件不存在"
         
         try:
+            if log_file.name.endswith('.gz'):
+                return self._tail_compressed(log_file, lines)
+            
             # 检查是否是当前活跃日志
-            with self._active_logs_lock:
-                if task_id in self._active_logs:
-                    active_path, active_handle, _ = self._active_logs[task_id]
-                    if active_path == str(log_file):
-                        # 是当前活跃日志，需要先刷新缓冲区
-                        active_handle.flush()
+            writer = self._active_logs.get(task_id)
+            if writer and writer.log_path == str(log_file):
+                # 是当前活跃日志，需要先刷新缓冲区
+                writer.flush()
             
-            # 读取文件内容
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                all_lines = f.readlines()
-                return ''.join(all_lines[-lines:])
+            # 从文件末尾读取最后 N 行
+            return tail_lines(str(log_file), lines)
         except Exception as e:
             return f"读取日志失败: {e}"
     
-    def get_latest_log_content(self, task_id: str, lines: int = 100) -> str:
-        """获取最新日志内容"""
+    def get_latest_log_name(self, task_id: str) -> Optional[str]:
+        """获取最新日志的文件名，没有日志时返回 None"""
         task_dir = self._get_task_log_dir(task_id)
         meta_file = task_dir / "latest.json"
         
@@ -253,52 +389,264 @@ class TaskLogManager:
                     meta = json.load(f)
                     latest_log = meta.get('latest_log')
                     if latest_log:
-                        return self.get_log_content(task_id, latest_log, lines)
+                        return latest_log
         except:
             pass
         
         # 如果没有元数据文件，找最新的日志文件
         logs = self.get_task_logs(task_id)
         if logs:
-            return self.get_log_content(task_id, logs[0]['filename'], lines)
+            return logs[0]['filename']
+        return None
+    
+    def get_latest_log_content(self, task_id: str, lines: int = 100) -> str:
+        """获取最新日志内容"""
+        latest_log = self.get_latest_log_name(task_id)
+        if latest_log:
+            return self.get_log_content(task_id, latest_log, lines)
         
         return "暂无日志"
     
+    def _flush_if_active(self, task_id: str, log_file: Path):
+        writer = self._active_logs.get(task_id)
+        if writer and writer.log_path == str(log_file):
+            writer.flush()
+    
+    def get_log_snapshot(self, task_id: str, log_filename: str, lines: int = 200) -> Tuple[str, int]:
+        """
+        获取日志最后 N 行及其结束位置，作为增量读取的起点
+        
+        Returns:
+            (内容, 字节偏移)：偏移位于最后一个完整行之后，尚未写完的行留给后续增量读取
+        """
+        log_file = self._resolve_log_file(task_id, log_filename)
+        if log_file.name.endswith('.gz'):
+            # 已压缩的日志不会再增长，偏移取解压后的长度
+            content = self._tail_compressed(log_file, lines)
+            with gzip.open(log_file, 'rb') as f:
+                return content, f.seek(0, os.SEEK_END)
+        self._flush_if_active(task_id, log_file)
+        
+        with open(log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            start = max(0, end - 4096)
+            f.seek(start)
+            tail = f.read(end - start)
+        # 不完整的末行不计入快照
+        last_newline = tail.rfind(b'\n')
+        if last_newline >= 0:
+            end = start + last_newline + 1
+        return tail_lines(str(log_file), lines, end_offset=end), end
+    
+    def read_log_since(self, task_id: str, log_filename: str, offset: int,
+                       max_bytes: int = 256 * 1024) -> Tuple[str, int]:
+        """
+        读取 offset 之后新写入的完整行
+        
+        Args:
+            offset: 上次读取返回的字节偏移
+            max_bytes: 单次最多读取的字节数
+            
+        Returns:
+            (新内容, 新的字节偏移)；文件变小（被替换或截断）时从头读取
+        """
+        log_file = self._resolve_log_file(task_id, log_filename)
+        if log_file.name.endswith('.gz'):
+            return "", offset
+        self._flush_if_active(task_id, log_file)
+        
+        with open(log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if offset > size:
+                offset = 0
+            if offset == size:
+                return "", offset
+            f.seek(offset)
+            data = f.read(max_bytes)
+        
+        # 只返回完整的行，末尾未写完的部分下次再读
+        last_newline = data.rfind(b'\n')
+        if last_newline < 0:
+            if len(data) < max_bytes:
+                return "", offset
+            last_newline = len(data) - 1
+        data = data[:last_newline + 1]
+        return data.decode('utf-8', errors='ignore'), offset + len(data)
+    
+    def is_log_finished(self, task_id: str, log_filename: str) -> bool:
+        """日志末尾是否已写入结束标记（适用于其他进程写入的日志）"""
+        log_file = self._resolve_log_file(task_id, log_filename)
+        if log_file.name.endswith('.gz'):
+            return True
+        try:
+            return "任务结束状态:" in tail_lines(str(log_file), 6)
+        except OSError:
+            return False
+    
     def is_task_running(self, task_id: str) -> bool:
         """检查任务是否正在运行（有活跃日志）"""
         with self._active_logs_lock:
             return task_id in self._active_logs
     
+    def flush_all(self):
+        """将所有活跃日志的缓冲写盘"""
+        with self._active_logs_lock:
+            writers = list(self._active_logs.values())
+        for writer in writers:
+            try:
+                writer.flush()
+            except Exception as e:
+                print(f"刷新日志失败: {writer.log_path}, {e}")
+    
+    def _flush_loop(self):
+        """后台定时刷新缓冲区"""
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush_all()
+    
     def _cleanup_old_logs_loop(self):
-        """定期清理旧日志的循环"""
+        """
+        日志整理循环：任务结束后立即整理该任务的日志，每小时对所有任务做一次完整整理
+        （按年龄清理长时间未运行任务的日志，并检查总量预算）
+        """
+        # 启动一分钟后做第一次完整整理，避开进程启动时的 IO 高峰
+        next_full_pass = time.time() + 60
         while True:
-            time.sleep(3600)  # 每小时检查一次
-            self._cleanup_old_logs()
+            timeout = max(0.0, next_full_pass - time.time())
+            try:
+                task_id = self._maintenance_queue.get(timeout=timeout)
+            except queue.Empty:
+                task_id = None
+            
+            if task_id is None:
+                self._cleanup_old_logs()
+                next_full_pass = time.time() + 3600
+                continue
+            
+            try:
+                self._maintain_task_dir(self.logs_dir / task_id)
+                if sum(self._task_dir_sizes.values()) > self.max_total_bytes:
+                    self._enforce_total_budget()
+            except Exception as e:
+                print(f"整理任务日志失败: {task_id}, {e}")
     
     def _cleanup_old_logs(self):
-        """清理每个任务的旧日志文件，只保留最近的N个"""
+        """整理所有任务的日志"""
         try:
             for task_dir in self.logs_dir.iterdir():
-                if not task_dir.is_dir():
-                    continue
-                
-                # 获取所有日志文件（按修改时间排序）
-                log_files = sorted(
-                    task_dir.glob("*.log"),
-                    key=lambda x: x.stat().st_mtime,
-                    reverse=True
-                )
-                
-                # 删除旧的日志文件
-                for old_file in log_files[self._max_logs_per_task:]:
-                    try:
-                        old_file.unlink()
-                        print(f"清理旧日志: {old_file}")
-                    except Exception as e:
-                        print(f"删除旧日志失败: {old_file}, {e}")
+                if task_dir.is_dir():
+                    self._maintain_task_dir(task_dir)
+            self._enforce_total_budget()
         except Exception as e:
             print(f"清理旧日志失败: {e}")
     
+    def _is_active_path(self, log_file: Path) -> bool:
+        return any(w.log_path == str(log_file) for w in list(self._active_logs.values()))
+    
+    def _delete_log(self, log_file: Path):
+        try:
+            log_file.unlink()
+            print(f"清理旧日志: {log_file}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"删除旧日志失败: {log_file}, {e}")
+    
+    def _compress_log(self, log_file: Path) -> Optional[Path]:
+        """将日志压缩为 .log.gz 并删除原文件，保留原修改时间以维持排序"""
+        target = log_file.with_name(log_file.name + '.gz')
+        # 调度器和 Web 进程可能同时整理同一目录，临时文件按进程区分
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            stat = log_file.stat()
+            with open(log_file, 'rb') as src, gzip.open(tmp, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.utime(tmp, (stat.st_atime, stat.st_mtime))
+            os.replace(tmp, target)
+            log_file.unlink()
+            return target
+        except Exception as e:
+            print(f"压缩日志失败: {log_file}, {e}")
+            try:
+                tmp.unlink()
+            except FileNotFoundError:
+                pass
+            return None
+    
+    @staticmethod
+    def _is_finished_file(log_file: Path, stat: os.stat_result, now: float) -> bool:
+        """未压缩且已结束的日志；其他进程正在写入的日志没有结束标记，超过一天未修改的视为异常中断"""
+        if not log_file.name.endswith('.log'):
+            return False
+        return now - stat.st_mtime > 86400 or "任务结束状态:" in tail_lines(str(log_file), 6)
+    
+    def _maintain_task_dir(self, task_dir: Path):
+        """
+        按分层策略整理单个任务的日志:
+        1. 最近 keep_uncompressed 个日志保持原样，更早的已结束日志压缩
+        2. 超过 max_logs_per_task 个、超过 max_age_days 天或超过 max_task_bytes 的最旧日志被删除
+        最新的日志和正在写入的日志不会被压缩或删除
+        """
+        if not task_dir.is_dir():
+            return
+        
+        now = time.time()
+        max_age = self.max_age_days * 86400
+        files = self._list_log_files(task_dir)
+        kept: List[Tuple[Path, int]] = []
+        
+        for index, (log_file, stat) in enumerate(files):
+            protected = index == 0 or self._is_active_path(log_file)
+            if not protected:
+                too_many = index >= self._max_logs_per_task
+                too_old = max_age > 0 and now - stat.st_mtime > max_age
+                if too_many or too_old:
+                    self._delete_log(log_file)
+                    continue
+                
+                if index >= self.keep_uncompressed and self._is_finished_file(log_file, stat, now):
+                    compressed = self._compress_log(log_file)
+                    if compressed:
+                        log_file, stat = compressed, compressed.stat()
+            kept.append((log_file, stat.st_size))
+        
+        # 单任务容量预算：从最旧的开始删除，最新的日志保留
+        total = sum(size for _, size in kept)
+        while total > self.max_task_bytes and len(kept) > 1:
+            log_file, size = kept.pop()
+            if self._is_active_path(log_file):
+                continue
+            self._delete_log(log_file)
+            total -= size
+        
+        self._task_dir_sizes[task_dir.name] = total
+    
+    def _enforce_total_budget(self):
+        """所有任务的日志总量超出预算时，按修改时间删除全局最旧的日志（每个任务的最新日志保留）"""
+        candidates = []
+        total = 0
+        for task_dir in self.logs_dir.iterdir():
+            if not task_dir.is_dir():
+                continue
+            files = self._list_log_files(task_dir)
+            total += sum(stat.st_size for _, stat in files)
+            candidates.extend((stat.st_mtime, stat.st_size, log_file, task_dir.name) for log_file, stat in files[1:])
+        
+        if total <= self.max_total_bytes:
+            return
+        
+        candidates.sort()
+        for _, size, log_file, task_name in candidates:
+            if total <= self.max_total_bytes:
+                break
+            if self._is_active_path(log_file):
+                continue
+            self._delete_log(log_file)
+            total -= size
+            self._task_dir_sizes[task_name] = self._task_dir_sizes.get(task_name, size) - size
+    
     def _format_size(self, size: int) -> str:
         """格式化文件大小"""
         for unit in ['B', 'KB', 'MB', 'GB']:
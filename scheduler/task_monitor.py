@@ -1,16 +1,22 @@
 """
 任务监控模块 - 用于追踪和管理所有正在运行的任务
-支持历史记录持久化到文件
+执行历史和运行中任务登记持久化到 sqlite，调度器和 Web 进程共享
 """
 import json
 import os
+import socket
 import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+try:
+    from .execution_store import ExecutionStore, RESOURCE_COLUMNS
+except ImportError:
+    from execution_store import ExecutionStore, RESOURCE_COLUMNS
+
 
 @dataclass
 class TaskExecution:
@@ -24,6 +30,15 @@ class TaskExecution:
     output: str = ""
     error: str = ""
     end_time: Optional[datetime] = None
+    resources: Optional[Dict] = None  # cpu_time（秒）、peak_rss、read_bytes、write_bytes（字节）
+
+
+# 历史文件和数据库默认放在本模块所在目录，与当前工作目录无关
+_MODULE_DIR = Path(__file__).resolve().parent
+
+# 运行中任务的心跳间隔和过期时间（秒）
+HEARTBEAT_INTERVAL = 5
+HEARTBEAT_TIMEOUT = 30
 
 
 class TaskMonitor:
@@ -43,86 +58,63 @@ class TaskMonitor:
                     cls._instance._initialized = False
         return cls._instance
     
-    def __init__(self, history_file: str = "scheduler/task_history.json"):
+    def __init__(self, history_file: str = str(_MODULE_DIR / "task_history.json"),
+                 db_path: str = str(_MODULE_DIR / "task_history.db"), history_days: int = 365):
+        """
+        Args:
+            history_file: 旧版 JSON 历史文件，数据库为空时自动导入
+            db_path: 执行历史数据库路径
+            history_days: 历史记录保留天数
+
+        Raises:
+            sqlite3.Error / OSError: 数据库无法打开，调用方应在不启用任务监控的情况下继续运行
+        """
         if self._initialized:
             return
         
-        self._initialized = True
         self._running_tasks: Dict[str, TaskExecution] = {}
-        self._task_history: List[TaskExecution] = []
-        self._max_history = 100  # 最多保留100条历史记录
         self._lock = threading.Lock()
-        self._history_lock = threading.Lock()
+        self._heartbeat_thread: Optional[threading.Thread] = None
         
-        # 历史记录文件路径
         self._history_file = Path(history_file)
-        self._ensure_history_dir()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._store = ExecutionStore(db_path)
+        # 数据库打开成功后才标记为已初始化，失败时下次创建实例会重试
+        self._initialized = True
+        self._migrate_json_history()
         
-        # 加载历史记录
-        self._load_history()
+        # 清理过期的历史记录
+        if history_days > 0:
+            self._store.prune((datetime.now() - timedelta(days=history_days)).timestamp())
     
-    def _ensure_history_dir(self):
-        """确保历史记录目录存在"""
+    def _migrate_json_history(self):
+        """数据库为空时导入旧版 task_history.json"""
         try:
-            self._history_file.parent.mkdir(parents=True, exist_ok=True)
+            if not self._history_file.exists() or not self._store.is_empty():
+                return
+            with open(self._history_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            records = []
+            for item in data.get('history', []):
+                if not item.get('start_time'):
+                    continue
+                end_time = item.get('end_time')
+                records.append({
+                    'task_id': item.get('task_id', ''),
+                    'task_name': item.get('task_name', ''),
+                    'task_type': item.get('task_type', 'scheduled'),
+                    'status': item.get('status', 'completed'),
+                    'pid': item.get('pid'),
+                    'start_time': datetime.fromisoformat(item['start_time']).timestamp(),
+                    'end_time': datetime.fromisoformat(end_time).timestamp() if end_time else None,
+                    'output': item.get('output', ''),
+                    'error': item.get('error', ''),
+                })
+            self._store.add_many(records)
+            print(f"已从 {self._history_file} 导入 {len(records)} 条任务历史记录")
         except Exception as e:
-            print(f"创建历史记录目录失败: {e}")
-    
-    def _load_history(self):
-        """从文件加载历史记录"""
-        try:
-            if self._history_file.exists():
-                with open(self._history_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                for item in data.get('history', []):
-                    execution = TaskExecution(
-                        task_id=item.get('task_id', ''),
-                        task_name=item.get('task_name', ''),
-                        task_type=item.get('task_type', 'scheduled'),
-                        start_time=datetime.fromisoformat(item['start_time']) if item.get('start_time') else datetime.now(),
-                        pid=item.get('pid'),
-                        status=item.get('status', 'completed'),
-                        output=item.get('output', ''),
-                        error=item.get('error', ''),
-                        end_time=datetime.fromisoformat(item['end_time']) if item.get('end_time') else None
-                    )
-                    self._task_history.append(execution)
-                
-                # 限制历史记录数量
-                if len(self._task_history) > self._max_history:
-                    self._task_history = self._task_history[:self._max_history]
-                
-                print(f"已加载 {len(self._task_history)} 条任务历史记录")
-        except Exception as e:
-            print(f"加载任务历史记录失败: {e}")
-    
-    def _save_history(self):
-        """保存历史记录到文件"""
-        try:
-            with self._history_lock:
-                data = {
-                    'last_updated': datetime.now().isoformat(),
-                    'history': []
-                }
-                
-                for task in self._task_history:
-                    data['history'].append({
-                        'task_id': task.task_id,
-                        'task_name': task.task_name,
-                        'task_type': task.task_type,
-                        'status': task.status,
-                        'pid': task.pid,
-                        'start_time': task.start_time.isoformat() if task.start_time else None,
-                        'end_time': task.end_time.isoformat() if task.end_time else None,
-                        'output': task.output[:1000] if task.output else '',  # 限制保存长度
-                        'error': task.error[:1000] if task.error else ''
-                    })
-                
-                with open(self._history_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存任务历史记录失败: {e}")
+            print(f"导入任务历史记录失败: {e}")
     
     def start_task(self, task_id: str, task_name: str, task_type: str = "scheduled", pid: Optional[int] = None) -> TaskExecution:
         """
@@ -149,9 +141,42 @@ class TaskMonitor:
         with self._lock:
             self._running_tasks[task_id] = execution
         
+        try:
+            self._store.register_running(self._owner(), task_id, task_name, task_type,
+                                         execution.start_time.timestamp(), pid)
+        except Exception as e:
+            print(f"登记运行中任务失败: {e}")
+        self._ensure_heartbeat()
+        
         return execution
     
-    def end_task(self, task_id: str, status: str = "completed", output: str = "", error: str = ""):
+    @staticmethod
+    def _owner() -> str:
+        """当前进程标识（每次调用时取 pid，fork 出的子进程也能得到正确的值）"""
+        return f"{socket.gethostname()}:{os.getpid()}"
+    
+    def _ensure_heartbeat(self):
+        with self._lock:
+            if self._heartbeat_thread and self._heartbeat_thread.is_alive():
+                return
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+            self._heartbeat_thread.start()
+    
+    def _heartbeat_loop(self):
+        """本进程有任务运行时定期刷新心跳，其他进程据此判断任务是否仍在运行"""
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            with self._lock:
+                has_running = bool(self._running_tasks)
+            if not has_running:
+                continue
+            try:
+                self._store.heartbeat(self._owner())
+            except Exception as e:
+                print(f"刷新任务心跳失败: {e}")
+    
+    def end_task(self, task_id: str, status: str = "completed", output: str = "", error: str = "",
+                 resources: Optional[Dict] = None):
         """
         记录任务结束
         
@@ -160,6 +185,7 @@ class TaskMonitor:
             status: 结束状态 (completed, failed, timeout)
             output: 任务输出
             error: 错误信息
+            resources: 资源统计（见 resource_sampler.ResourceSampler.usage）
         """
         with self._lock:
             if task_id in self._running_tasks:
@@ -167,17 +193,27 @@ class TaskMonitor:
                 execution.status = status
                 execution.output = output
                 execution.error = error
+                execution.resources = resources
                 execution.end_time = datetime.now()
-                
-                # 添加到历史记录
-                with self._history_lock:
-                    self._task_history.insert(0, execution)
-                    # 限制历史记录数量
-                    if len(self._task_history) > self._max_history:
-                        self._task_history = self._task_history[:self._max_history]
-                
-                # 保存到文件
-                self._save_history()
+            else:
+                return
+        
+        # 注销运行中任务并追加到历史记录
+        try:
+            self._store.finish_running(self._owner(), task_id, dict(
+                task_id=execution.task_id,
+                task_name=execution.task_name,
+                task_type=execution.task_type,
+                status=execution.status,
+                pid=execution.pid,
+                start_time=execution.start_time.timestamp(),
+                end_time=execution.end_time.timestamp(),
+                output=execution.output,
+                error=execution.error,
+                resources=execution.resources
+            ))
+        except Exception as e:
+            print(f"保存任务历史记录失败: {e}")
     
     def update_task_output(self, task_id: str, output: str):
         """更新任务输出"""
@@ -188,28 +224,92 @@ class TaskMonitor:
     def update_task_pid(self, task_id: str, pid: int):
         """更新任务进程ID"""
         with self._lock:
-            if task_id in self._running_tasks:
-                self._running_tasks[task_id].pid = pid
+            if task_id not in self._running_tasks:
+                return
+            self._running_tasks[task_id].pid = pid
+        try:
+            self._store.update_running_pid(self._owner(), task_id, pid)
+        except Exception as e:
+            print(f"更新运行中任务失败: {e}")
+    
+    def _list_running(self, task_id: Optional[str] = None) -> List[Dict]:
+        """所有进程登记的运行中任务，顺带清理心跳过期（运行方已崩溃）的任务"""
+        self._store.expire_running(time.time() - HEARTBEAT_TIMEOUT,
+                                   error="运行进程心跳超时，任务已中断")
+        return self._store.list_running(task_id)
     
     def get_running_tasks(self) -> List[Dict]:
-        """获取所有正在运行的任务"""
-        with self._lock:
-            return [self._task_to_dict(task) for task in self._running_tasks.values()]
+        """获取所有进程（调度器、Web 服务）正在运行的任务"""
+        tasks = []
+        for row in self._list_running():
+            data = self._task_to_dict(TaskExecution(
+                task_id=row['task_id'],
+                task_name=row['task_name'],
+                task_type=row['task_type'],
+                start_time=datetime.fromtimestamp(row['start_time']),
+                pid=row['pid']
+            ))
+            data["owner"] = row['owner']
+            # 开始时间戳（秒），客户端据此自行计算运行时长
+            data["start_timestamp"] = row['start_time']
+            tasks.append(data)
+        return tasks
+    
+    def get_task_history(self, limit: int = 20, task_id: Optional[str] = None, status=None,
+                         since: Optional[datetime] = None, until: Optional[datetime] = None,
+                         offset: int = 0) -> List[Dict]:
+        """
+        获取任务历史记录，按开始时间从新到旧
+        
+        Args:
+            limit: 返回条数
+            task_id: 只返回该任务的记录
+            status: 状态或状态列表
+            since / until: 开始时间范围
+            offset: 跳过的条数（分页）
+        """
+        rows = self._store.query(
+            task_id=task_id,
+            status=status,
+            since=since.timestamp() if since else None,
+            until=until.timestamp() if until else None,
+            limit=limit,
+            offset=offset
+        )
+        return [self._task_to_dict(self._row_to_execution(row)) for row in rows]
     
-    def get_task_history(self, limit: int = 20) -> List[Dict]:
-        """获取任务历史记录"""
-        with self._history_lock:
-            return [self._task_to_dict(task) for task in self._task_history[:limit]]
+    def get_task_stats(self, task_id: str, days: int = 30) -> Dict:
+        """获取任务最近 days 天的执行次数、成功率和时长分位数（秒）"""
+        since = (datetime.now() - timedelta(days=days)).timestamp()
+        stats = self._store.stats(task_id, since)
+        stats["days"] = days
+        return stats
+    
+    @staticmethod
+    def _row_to_execution(row: Dict) -> TaskExecution:
+        return TaskExecution(
+            task_id=row['task_id'],
+            task_name=row['task_name'],
+            task_type=row['task_type'],
+            start_time=datetime.fromtimestamp(row['start_time']),
+            pid=row['pid'],
+            status=row['status'],
+            output=row['output'],
+            error=row['error'],
+            end_time=datetime.fromtimestamp(row['end_time']) if row['end_time'] is not None else None,
+            resources={name: row[name] for name in RESOURCE_COLUMNS} if row['cpu_time'] is not None else None
+        )
     
     def is_task_running(self, task_id: str) -> bool:
-        """检查任务是否正在运行"""
+        """检查任务是否正在运行（任一进程）"""
         with self._lock:
-            return task_id in self._running_tasks
+            if task_id in self._running_tasks:
+                return True
+        return bool(self._list_running(task_id))
     
     def get_running_count(self) -> int:
-        """获取正在运行的任务数量"""
-        with self._lock:
-            return len(self._running_tasks)
+        """获取正在运行的任务数量（所有进程）"""
+        return len(self._list_running())
     
     def _task_to_dict(self, task: TaskExecution) -> Dict:
         """将任务执行记录转换为字典"""
@@ -223,7 +323,9 @@ class TaskMonitor:
             "end_time": task.end_time.strftime("%Y-%m-%d %H:%M:%S") if task.end_time else None,
             "duration": self._calculate_duration(task),
             "output": task.output[:500] if task.output else "",  # 限制输出长度
-            "error": task.error[:500] if task.error else ""
+            "error": task.error[:500] if task.error else "",
+            "wall_time": round((task.end_time - task.start_time).total_seconds(), 3) if task.end_time else None,
+            "resources": task.resources
         }
         return data
     
@@ -249,26 +351,22 @@ class TaskMonitor:
     
     def clear_history(self):
         """清空历史记录"""
-        with self._history_lock:
-            self._task_history.clear()
-        self._save_history()
+        self._store.clear()
     
     def get_summary(self) -> Dict:
         """获取任务监控摘要"""
-        with self._lock:
-            running_count = len(self._running_tasks)
+        running_count = self.get_running_count()
         
-        with self._history_lock:
-            history_count = len(self._task_history)
-            # 统计最近完成的任务状态
-            recent_completed = [t for t in self._task_history if t.status == "completed"][:10]
-            recent_failed = [t for t in self._task_history if t.status in ["failed", "timeout"]][:10]
+        history_count = self._store.count()
+        # 统计最近完成的任务状态
+        recent_completed = min(self._store.count(status="completed"), 10)
+        recent_failed = min(self._store.count(status=["failed", "timeout"]), 10)
         
         return {
             "running_count": running_count,
             "history_count": history_count,
-            "recent_completed": len(recent_completed),
-            "recent_failed": len(recent_failed),
+            "recent_completed": recent_completed,
+            "recent_failed": recent_failed,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
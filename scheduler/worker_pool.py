@@ -0,0 +1,191 @@
+"""
+预热工作进程模块
+为 Python 入口的任务提供基于 forkserver 的执行方式：
+forkserver 进程启动时预先导入重量级模块，每次执行任务时从它 fork 出一个新进程，
+省去解释器启动和模块导入的开销；任务进程执行完即退出，崩溃不会影响后续任务
+"""
+import io
+import logging
+import multiprocessing
+import os
+import re
+import runpy
+import shlex
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+
+# 默认预加载的模块，导入失败的模块会被 forkserver 忽略
+DEFAULT_PRELOAD_MODULES = [
+    "AI.core",
+    "agent.fund_news_analysiser.A",
+    "zhipuai",
+    "requests",
+]
+
+_PYTHON_EXECUTABLE_PATTERN = re.compile(r"^python[\d.]*(\.exe)?$", re.IGNORECASE)
+
+
+def parse_python_command(command: str) -> Optional[Tuple[str, str, List[str]]]:
+    """
+    解析 Python 入口命令
+
+    支持 "python script.py args..." 和 "python -m module args..." 两种形式
+
+    Returns:
+        (类型 'script' 或 'module', 脚本路径或模块名, 参数列表)，无法识别时返回 None
+    """
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return None
+
+    if len(tokens) < 2 or not _PYTHON_EXECUTABLE_PATTERN.match(os.path.basename(tokens[0])):
+        return None
+
+    if tokens[1] == "-m" and len(tokens) >= 3:
+        return "module", tokens[2], tokens[3:]
+    if tokens[1].endswith(".py"):
+        return "script", tokens[1], tokens[2:]
+    return None
+
+
+def _worker_main(kind: str, target: str, args: List[str], cwd: str, env: Dict[str, str],
+                 stdout_conn, stderr_conn):
+    """forkserver 子进程入口：重定向输出、切换工作目录后执行任务脚本"""
+    os.dup2(stdout_conn.fileno(), 1)
+    os.dup2(stderr_conn.fileno(), 2)
+    stdout_conn.close()
+    stderr_conn.close()
+
+    # 管道不是终端，默认是块缓冲，改为行缓冲以便实时写入日志
+    sys.stdout = io.TextIOWrapper(os.fdopen(1, "wb", closefd=False), encoding="utf-8",
+                                  errors="replace", line_buffering=True)
+    sys.stderr = io.TextIOWrapper(os.fdopen(2, "wb", closefd=False), encoding="utf-8",
+                                  errors="replace", line_buffering=True)
+
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(env)
+
+    if kind == "module":
+        sys.argv = [target] + list(args)
+        sys.path.insert(0, cwd)
+        runpy.run_module(target, run_name="__main__", alter_sys=True)
+    else:
+        script_path = os.path.abspath(target)
+        sys.argv = [script_path] + list(args)
+        sys.path.insert(0, os.path.dirname(script_path))
+        runpy.run_path(script_path, run_name="__main__")
+
+
+class WorkerProcess:
+    """
+    forkserver 任务进程句柄
+
+    提供与 subprocess.Popen 一致的 stdout / stderr / pid / wait / terminate / kill 接口，
+    以便 TaskRunner 复用同一套输出读取和超时处理逻辑
+    """
+
+    def __init__(self, process: multiprocessing.Process, stdout: io.TextIOBase, stderr: io.TextIOBase, args: str):
+        self._process = process
+        self.stdout = stdout
+        self.stderr = stderr
+        self.args = args
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._process.exitcode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        self._process.join(timeout)
+        if self._process.exitcode is None:
+            raise subprocess.TimeoutExpired(self.args, timeout)
+        return self._process.exitcode
+
+    def terminate(self):
+        self._process.terminate()
+
+    def kill(self):
+        self._process.kill()
+
+
+class WorkerPool:
+    """
+    预热工作进程池
+
+    forkserver 进程即预热好的模板进程，每个任务 fork 一个新的工作进程执行，
+    执行结束后工作进程退出（相当于每个任务回收一次工作进程）
+    """
+
+    def __init__(self, preload_modules: Optional[List[str]] = None):
+        self.preload_modules = list(preload_modules) if preload_modules is not None else list(DEFAULT_PRELOAD_MODULES)
+        self.logger = logging.getLogger("WorkerPool")
+        self._context = None
+
+    @staticmethod
+    def is_available() -> bool:
+        """forkserver 仅在 Unix 平台可用"""
+        return "forkserver" in multiprocessing.get_all_start_methods()
+
+    def _get_context(self):
+        if self._context is None:
+            self._context = multiprocessing.get_context("forkserver")
+            self._context.set_forkserver_preload(self.preload_modules)
+        return self._context
+
+    def warm_up(self):
+        """提前启动 forkserver 并完成模块预加载，避免首个任务承担导入耗时"""
+        if not self.is_available():
+            self.logger.warning("当前平台不支持 forkserver，Python 任务将使用子进程方式执行")
+            return
+        self._get_context()
+        from multiprocessing import forkserver
+        forkserver.ensure_running()
+        self.logger.info(f"预热工作进程已就绪，预加载模块: {', '.join(self.preload_modules)}")
+
+    def spawn(self, command: str, cwd: str, env: Dict[str, str]) -> Optional[WorkerProcess]:
+        """
+        在预热进程中启动任务
+
+        Returns:
+            WorkerProcess: 任务进程句柄；命令不是 Python 入口或平台不支持时返回 None
+        """
+        if not self.is_available():
+            return None
+
+        parsed = parse_python_command(command)
+        if parsed is None:
+            return None
+        kind, target, args = parsed
+
+        ctx = self._get_context()
+        stdout_r, stdout_w = ctx.Pipe(duplex=False)
+        stderr_r, stderr_w = ctx.Pipe(duplex=False)
+
+        process = ctx.Process(
+            target=_worker_main,
+            args=(kind, target, args, str(cwd), dict(env), stdout_w, stderr_w),
+            name=f"task-worker:{target}",
+        )
+        try:
+            process.start()
+        finally:
+            # 父进程不再持有写端，子进程退出后读端才能收到 EOF
+            stdout_w.close()
+            stderr_w.close()
+
+        stdout = self._open_reader(stdout_r)
+        stderr = self._open_reader(stderr_r)
+        return WorkerProcess(process, stdout, stderr, command)
+
+    @staticmethod
+    def _open_reader(conn) -> io.TextIOBase:
+        fd = os.dup(conn.fileno())
+        conn.close()
+        return open(fd, "r", encoding="utf-8", errors="replace")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+任务进程启动导入耗时基准
+
+调度器每次执行任务都会启动一个全新的 Python 进程，本脚本用 ``-X importtime``
+测量各任务入口模块的冷启动导入耗时，并检查重量级依赖是否在导入阶段被加载。
+超出预算或出现禁止的模块时以非零状态码退出，可作为回归检查使用。
+
+使用方法:
+    python scripts/bench_import_time.py                   # 使用默认预算检查所有入口
+    python scripts/bench_import_time.py --budget-ms 300   # 自定义预算
+    python scripts/bench_import_time.py --top 15          # 显示最耗时的 15 个模块
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# 任务进程会导入的入口模块
+ENTRY_MODULES = [
+    "AI.core",
+    "AI.news_collector",
+    "AI.sector_fund_flow_analyzer",
+    "agent.fund_news_analysiser.A",
+]
+
+# 这些依赖只允许在工具函数首次调用时导入
+FORBIDDEN_MODULES = ["akshare", "pandas", "matplotlib", "PyPDF2", "zhipuai"]
+
+DEFAULT_BUDGET_MS = 500
+
+
+def measure_import(module_name: str) -> list:
+    """
+    在独立子进程中导入模块并解析 -X importtime 输出
+
+    Returns:
+        list: [(模块名, 自身耗时us, 累计耗时us, 嵌套深度), ...]
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(PROJECT_DIR)},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module_name} 失败:\n{result.stderr.strip().splitlines()[-1]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="任务进程导入耗时基准")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="单个入口的导入耗时预算（毫秒）")
+    parser.add_argument("--top", type=int, default=10, help="显示自身耗时最高的模块数量")
+    parser.add_argument("modules", nargs="*", default=ENTRY_MODULES, help="要测量的入口模块")
+    args = parser.parse_args()
+
+    failed = False
+    print("=" * 80)
+    print(f"导入耗时基准（预算 {args.budget_ms:.0f} ms）")
+    print("=" * 80)
+
+    for module_name in args.modules:
+        try:
+            records = measure_import(module_name)
+        except RuntimeError as e:
+            print(f"\n[ERROR] {e}")
+            failed = True
+            continue
+
+        # 顶层记录（深度 0）的累计耗时之和即为本次导入总耗时
+        total_ms = sum(cumulative for _, _, cumulative, depth in records if depth == 0) / 1000
+        loaded = {name.split(".")[0] for name, _, _, _ in records}
+        forbidden = [m for m in FORBIDDEN_MODULES if m in loaded]
+        over_budget = total_ms > args.budget_ms
+
+        status = "FAIL" if over_budget or forbidden else "OK"
+        print(f"\n[{status}] {module_name}: {total_ms:.1f} ms")
+        if forbidden:
+            print(f"  导入阶段加载了重量级依赖: {', '.join(forbidden)}")
+        for name, self_us, _, _ in sorted(records, key=lambda r: r[1], reverse=True)[:args.top]:
+            print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+        failed = failed or over_budget or bool(forbidden)
+
+    print("=" * 80)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Web 服务压测脚本
+
+模拟多个浏览器标签页同时轮询仪表盘接口，统计吞吐量和延迟分位数，
+用于对比 Flask 开发服务器与 gunicorn 生产模式。只依赖标准库。
+
+使用方法:
+    python web/app.py                                        # 开发服务器
+    gunicorn -c web/gunicorn.conf.py web.wsgi:app            # 生产模式
+    python scripts/bench_web.py --url http://127.0.0.1:5000  # 压测
+    python scripts/bench_web.py --concurrency 32 --duration 20 --path /api/task-monitor/summary
+"""
+
+import argparse
+import http.client
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+# 仪表盘页面周期轮询的接口
+DEFAULT_PATHS = [
+    "/api/dashboard/snapshot",
+    "/api/task-monitor/running",
+    "/api/task-monitor/summary",
+    "/api/task-monitor/history?limit=20",
+    "/api/scheduler/tasks",
+    "/api/system/status",
+    "/api/folders",
+]
+
+
+def worker(host, port, paths, deadline, latencies, errors, lock):
+    """单个并发连接：保持长连接循环请求各接口直到截止时间"""
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    index = 0
+    local_latencies = []
+    local_errors = 0
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                local_errors += 1
+            else:
+                local_latencies.append(time.perf_counter() - started)
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+    conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Web 服务压测")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="服务地址")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发连接数（模拟同时打开的标签页）")
+    parser.add_argument("--duration", type=float, default=10, help="压测时长（秒）")
+    parser.add_argument("--path", action="append", help="压测的接口路径，可重复指定；默认轮询仪表盘接口")
+    args = parser.parse_args()
+
+    parts = urlsplit(args.url)
+    host, port = parts.hostname, parts.port or 80
+    paths = args.path or DEFAULT_PATHS
+
+    print(f"压测 {args.url}，并发 {args.concurrency}，时长 {args.duration} 秒")
+    for path in paths:
+        print(f"  {path}")
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(target=worker, args=(host, port, paths, deadline, latencies, errors, lock), daemon=True)
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+    error_count = sum(errors)
+    print("")
+    print(f"成功请求: {total}，失败: {error_count}")
+    print(f"吞吐量: {total / elapsed:.1f} req/s")
+    if total:
+        print(f"延迟 p50: {percentile(latencies, 50) * 1000:.1f} ms, "
+              f"p95: {percentile(latencies, 95) * 1000:.1f} ms, "
+              f"p99: {percentile(latencies, 99) * 1000:.1f} ms, "
+              f"max: {latencies[-1] * 1000:.1f} ms")
+    return 1 if total == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
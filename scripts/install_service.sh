@@ -70,6 +70,8 @@ create_service() {
     local service_name=$1
     local exec_path=$2
     local description=$3
+    # 可选: systemctl reload 时执行的命令
+    local exec_reload=${4:+ExecReload=$4}
     
     cat > "/etc/systemd/system/$service_name.service" << EOF
 [Unit]
@@ -81,6 +83,7 @@ Type=simple
 User=$CURRENT_USER
 WorkingDirectory=$PROJECT_DIR
 ExecStart=$exec_path
+$exec_reload
 Restart=always
 RestartSec=5
 StandardOutput=journal
@@ -94,7 +97,8 @@ EOF
 }
 
 # 创建 Web 服务
-create_service "auto-fund-web" "$SCRIPT_DIR/start_web.sh" "Auto Fund Web Application"
+# gunicorn 收到 HUP 后平滑重载 worker
+create_service "auto-fund-web" "$SCRIPT_DIR/start_web.sh" "Auto Fund Web Application" "/bin/kill -HUP \$MAINPID"
 
 # 创建 QQ 机器人服务
 create_service "auto-fund-qq" "$SCRIPT_DIR/start_qq_bot.sh" "Auto Fund QQ Bot"
@@ -22,5 +22,12 @@ if [ ! -f "$PYTHON" ]; then
     exit 1
 fi
 
-# 启动应用
+# 启动应用：安装了 gunicorn 时以生产模式（多进程 + 线程）运行，WEB_DEV=1 时强制使用 Flask 开发服务器
+GUNICORN="$PROJECT_DIR/.venv/bin/gunicorn"
+if [ -x "$GUNICORN" ] && [ "$WEB_DEV" != "1" ]; then
+    echo "[INFO] 使用 gunicorn 生产模式启动"
+    exec "$GUNICORN" -c "$PROJECT_DIR/web/gunicorn.conf.py" web.wsgi:app
+fi
+
+echo "[WARN] 未安装 gunicorn，使用 Flask 开发服务器"
 exec "$PYTHON" "$APP"
@@ -5,12 +5,35 @@
 
 import os
 import json
+import logging
 import subprocess
 import platform
+import sqlite3
 import sys
 import threading
-from datetime import datetime
-from flask import Flask, render_template, jsonify, send_from_directory, request
+import time
+import tempfile
+import gzip
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from email.utils import formatdate
+from flask import Flask, render_template, jsonify, send_from_directory, request, Response, stream_with_context, g
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，只做进程内互斥
+    fcntl = None
+
+try:
+    import mistune
+    # 与前端 marked 的配置（gfm、breaks）一致：表格、删除线、自动链接，单个换行渲染为 <br>；
+    # 原始 HTML 保留，由前端 DOMPurify 统一清理
+    render_markdown = mistune.create_markdown(escape=False, hard_wrap=True,
+                                              plugins=["table", "strikethrough", "url"])
+except ImportError:  # 未安装 mistune 时只返回 Markdown 原文，由前端渲染
+    render_markdown = None
 
 # 添加项目根目录到 Python 路径
 PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -22,14 +45,41 @@ try:
     from scheduler.task_log_manager import task_log_manager
     TASK_MONITOR_AVAILABLE = True
     TASK_LOG_AVAILABLE = True
-except ImportError:
+except (ImportError, sqlite3.Error, OSError) as e:
+    # 执行历史数据库无法打开时，Web 服务在不启用任务监控的情况下继续运行
+    print(f"任务监控不可用: {e}")
     TASK_MONITOR_AVAILABLE = False
     TASK_LOG_AVAILABLE = False
     task_monitor = None
     task_log_manager = None
 
+from scheduler.log_tail import tail_lines
+from scheduler.control import ControlUnavailable, DEFAULT_SOCKET_PATH as DEFAULT_CONTROL_SOCKET, send_command
+from scheduler.config_file import ConfigConflictError, read_config, update_config
+
 app = Flask(__name__)
 
+request_logger = logging.getLogger("web.request")
+# 超过该耗时（毫秒）的请求记录警告日志
+SLOW_REQUEST_MS = 500
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _log_request_timing(response):
+    """在响应头 Server-Timing 中返回处理耗时，慢请求记录日志（流式响应只统计到开始发送）"""
+    started = g.get("request_started")
+    if started is not None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        response.headers["Server-Timing"] = f"app;dur={elapsed_ms:.1f}"
+        if elapsed_ms >= SLOW_REQUEST_MS:
+            request_logger.warning(f"慢请求: {request.method} {request.full_path} {response.status_code} {elapsed_ms:.0f}ms")
+    return response
+
 # 加载重启密码
 ENV_FILE = os.path.join(PROJECT_DIR, ".env")
 RESTART_PASSWORD = None
@@ -48,20 +98,84 @@ if not RESTART_PASSWORD:
 RESULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "result")
 STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
 TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+DATA_DIR = os.path.join(PROJECT_DIR, "data")
 
+# 报告全文索引（与调度器共享同一个索引文件）
+try:
+    from scheduler.search_index import SearchIndex
+    SEARCH_AVAILABLE = True
+except ImportError as e:
+    print(f"搜索索引不可用: {e}")
+    SearchIndex = None
+    SEARCH_AVAILABLE = False
 
-def get_folders():
-    """获取结果文件夹列表"""
-    if not os.path.exists(RESULT_DIR):
+# 已打开的索引: ((索引文件, 数据目录), SearchIndex)
+_search_index_cache = (None, None)
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    按调度器配置的 settings.search_index_db / search_data_dir 打开全文索引，与调度器使用同一个索引文件；
+    相对路径相对于项目根目录，配置的路径变化后重新打开
+    
+    Returns:
+        SearchIndex: 索引已关闭（search_index_db 为 null）时返回 None
+    """
+    global _search_index_cache
+    settings = (load_scheduler_config() or {}).get("settings", {})
+    db_path = settings.get("search_index_db", "data/search_index.db")
+    if not db_path:
+        return None
+    key = (os.path.join(PROJECT_DIR, db_path), os.path.join(PROJECT_DIR, settings.get("search_data_dir", "data")))
+    
+    with _search_index_lock:
+        cached_key, index = _search_index_cache
+        if cached_key != key:
+            index = SearchIndex(*key)
+            _search_index_cache = (key, index)
+        return index
+
+
+# 目录列表缓存: 目录路径 -> (目录 mtime_ns, 扫描时间, 列表)
+# 新增、删除、重命名文件会改变目录 mtime 使缓存失效；原地改写文件不会，因此另设过期时间以刷新大小和修改时间
+_listing_cache = {}
+_listing_cache_lock = threading.Lock()
+LISTING_CACHE_TTL = 60
+
+
+def _cached_listing(dir_path, scan):
+    """返回 scan(dir_path) 的结果，目录未变化且未过期时直接使用缓存"""
+    try:
+        mtime_ns = os.stat(dir_path).st_mtime_ns
+    except OSError:
         return []
+    
+    now = time.time()
+    cached = _listing_cache.get(dir_path)
+    if cached and cached[0] == mtime_ns and now - cached[1] < LISTING_CACHE_TTL:
+        return cached[2]
+    
+    with _listing_cache_lock:
+        cached = _listing_cache.get(dir_path)
+        if cached and cached[0] == mtime_ns and now - cached[1] < LISTING_CACHE_TTL:
+            return cached[2]
+        listing = scan(dir_path)
+        _listing_cache[dir_path] = (mtime_ns, now, listing)
+        return listing
+
+
+def _scan_folders(dir_path):
+    with os.scandir(dir_path) as it:
+        names = sorted(entry.name for entry in it if entry.is_dir())
+    return [{"name": name, "display_name": get_folder_display_name(name)} for name in names]
+
+
+def get_folders():
+    """获取结果文件夹列表（含文件数）"""
     folders = []
-    for item in os.listdir(RESULT_DIR):
-        item_path = os.path.join(RESULT_DIR, item)
-        if os.path.isdir(item_path):
-            folders.append({
-                "name": item,
-                "display_name": get_folder_display_name(item)
-            })
+    for folder in _cached_listing(RESULT_DIR, _scan_folders):
+        folders.append(dict(folder, count=len(get_files_by_folder(folder["name"]))))
     return folders
 
 
@@ -75,36 +189,77 @@ def get_folder_display_name(folder_name):
     return names.get(folder_name, folder_name)
 
 
-def get_files_by_folder(folder_name):
-    """获取指定文件夹下的所有 md 文件"""
-    folder_path = os.path.join(RESULT_DIR, folder_name)
-    if not os.path.exists(folder_path):
-        return []
-    
+def _scan_markdown_files(folder_path):
     files = []
-    for item in os.listdir(folder_path):
-        if item.endswith(".md"):
-            file_path = os.path.join(folder_path, item)
-            stat = os.stat(file_path)
-            date_str = item.replace(".md", "")
-            try:
-                date = datetime.strptime(date_str, "%Y-%m-%d")
-                formatted_date = date.strftime("%Y年%m月%d日")
-            except:
-                formatted_date = date_str
-            
-            files.append({
-                "name": item,
-                "date": date_str,
-                "display_date": formatted_date,
-                "size": format_size(stat.st_size),
-                "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-            })
+    with os.scandir(folder_path) as it:
+        entries = [entry for entry in it if entry.name.endswith(".md")]
+    for entry in entries:
+        item = entry.name
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        date_str = item.replace(".md", "")
+        try:
+            date = datetime.strptime(date_str, "%Y-%m-%d")
+            formatted_date = date.strftime("%Y年%m月%d日")
+        except:
+            formatted_date = date_str
+        
+        files.append({
+            "name": item,
+            "date": date_str,
+            "display_date": formatted_date,
+            "size": format_size(stat.st_size),
+            "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+        })
     
     files.sort(key=lambda x: x["date"], reverse=True)
     return files
 
 
+def get_files_by_folder(folder_name):
+    """获取指定文件夹下的所有 md 文件，按日期从新到旧（结果带缓存，调用方不要修改）"""
+    return _cached_listing(os.path.join(RESULT_DIR, folder_name), _scan_markdown_files)
+
+
+def _bisect_desc(files, date, inclusive):
+    """在按日期降序排列的列表中二分查找第一个日期 < date（inclusive 时为 <= date）的位置"""
+    lo, hi = 0, len(files)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        value = files[mid]["date"]
+        if value <= date if inclusive else value < date:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def filter_files(files, since=None, until=None):
+    """按日期范围（YYYY-MM-DD，含两端）过滤按日期降序的文件列表"""
+    start = _bisect_desc(files, until, True) if until else 0
+    end = _bisect_desc(files, since, False) if since else len(files)
+    return files[start:end]
+
+
+# 分页参数 limit 的上限
+MAX_PAGE_LIMIT = 500
+
+
+def clamp_page_args(offset, limit):
+    """
+    规范分页参数：offset 不小于 0，limit 限制在 0 到 MAX_PAGE_LIMIT 之间（None 表示不限制）
+    
+    Returns:
+        tuple: (offset, limit)
+    """
+    offset = max(offset or 0, 0)
+    if limit is not None:
+        limit = min(max(limit, 0), MAX_PAGE_LIMIT)
+    return offset, limit
+
+
 def format_size(size):
     """格式化文件大小"""
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -124,6 +279,63 @@ def read_markdown_content(folder_name, file_name):
         return f.read()
 
 
+# 报告内容缓存（LRU）: 文件路径 -> (mtime_ns, 文件大小, ETag, Last-Modified, JSON 响应体, gzip 压缩后的响应体)
+# 响应体中包含服务端渲染好的 HTML，每个文件版本只渲染、压缩一次
+_content_cache = OrderedDict()
+_content_cache_lock = threading.Lock()
+_content_cache_bytes = 0
+CONTENT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# 小于该大小的响应不压缩
+GZIP_MIN_SIZE = 1024
+
+
+def get_cached_content(folder_name, file_name):
+    """
+    读取报告内容，渲染为 HTML（需要 mistune）并缓存序列化、压缩后的响应体，文件 mtime 或大小变化时重新读取
+    
+    Returns:
+        tuple: (ETag, Last-Modified, JSON 响应体, gzip 响应体或 None)；文件不存在时返回 None
+    """
+    global _content_cache_bytes
+    file_path = os.path.join(RESULT_DIR, folder_name, file_name)
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    
+    with _content_cache_lock:
+        cached = _content_cache.get(file_path)
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+            _content_cache.move_to_end(file_path)
+            return cached[2:]
+    
+    content = read_markdown_content(folder_name, file_name)
+    if content is None:
+        return None
+    body = json.dumps({
+        "content": content,
+        "html": render_markdown(content) if render_markdown else None,
+        "folder": folder_name,
+        "file": file_name
+    }, ensure_ascii=False).encode("utf-8")
+    gzip_body = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+    # 是否包含渲染结果也计入 ETag，安装或移除 mistune 后客户端不会沿用另一种响应
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}{"-html" if render_markdown else ""}"'
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    entry = (st.st_mtime_ns, st.st_size, etag, last_modified, body, gzip_body)
+    
+    with _content_cache_lock:
+        old = _content_cache.pop(file_path, None)
+        if old:
+            _content_cache_bytes -= len(old[4]) + len(old[5] or b"")
+        _content_cache[file_path] = entry
+        _content_cache_bytes += len(body) + len(gzip_body or b"")
+        while _content_cache_bytes > CONTENT_CACHE_MAX_BYTES and len(_content_cache) > 1:
+            _, evicted = _content_cache.popitem(last=False)
+            _content_cache_bytes -= len(evicted[4]) + len(evicted[5] or b"")
+    return entry[2:]
+
+
 @app.route("/")
 def index():
     """首页"""
@@ -140,21 +352,100 @@ def api_folders():
 
 @app.route("/api/files/<path:folder_name>")
 def api_files(folder_name):
-    """获取指定文件夹下的文件列表"""
-    return jsonify(get_files_by_folder(folder_name))
+    """
+    获取指定文件夹下的文件列表
+    
+    可选参数 since / until（YYYY-MM-DD）按日期过滤，offset / limit 分页（limit 最大 MAX_PAGE_LIMIT）；
+    带任一参数时返回 {"files", "total", "offset", "limit"}，否则返回完整列表
+    """
+    files = get_files_by_folder(folder_name)
+    args = request.args
+    if not any(key in args for key in ("since", "until", "offset", "limit")):
+        return jsonify(files)
+    
+    files = filter_files(files, args.get("since"), args.get("until"))
+    offset, limit = clamp_page_args(args.get("offset", 0, type=int), args.get("limit", type=int))
+    page = files[offset:offset + limit] if limit is not None else files[offset:]
+    return jsonify({
+        "files": page,
+        "total": len(files),
+        "offset": offset,
+        "limit": limit
+    })
 
 
 @app.route("/api/content/<path:folder_name>/<file_name>")
 def api_content(folder_name, file_name):
-    """获取文件内容"""
-    content = read_markdown_content(folder_name, file_name)
-    if content is None:
+    """
+    获取文件内容：Markdown 原文 content 和服务端渲染的 html（未安装 mistune 时为 null）
+    
+    响应带 ETag / Last-Modified，文件未变化时条件请求返回 304；
+    客户端支持 gzip 时直接发送缓存的压缩响应体
+    """
+    cached = get_cached_content(folder_name, file_name)
+    if cached is None:
         return jsonify({"error": "文件不存在"})
-    return jsonify({
-        "content": content,
-        "folder": folder_name,
-        "file": file_name
-    })
+    etag, last_modified, body, gzip_body = cached
+    
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        # 每次使用前向服务器验证，文件未变化时只需一个 304
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        not_modified = if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    else:
+        not_modified = request.headers.get("If-Modified-Since") == last_modified
+    if not_modified:
+        return Response(status=304, headers=headers)
+    
+    if gzip_body is not None and "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        body = gzip_body
+    return Response(body, mimetype="application/json", headers=headers)
+
+
+@app.route("/api/search")
+def api_search():
+    """
+    全文检索报告和新闻 JSON
+    
+    参数: q（多个词用空格分隔）、kind（report / json）、folder、since / until（YYYY-MM-DD）、limit、offset
+    """
+    if not SEARCH_AVAILABLE:
+        return jsonify({"error": "搜索索引不可用", "results": []}), 503
+    
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "请输入搜索关键词", "results": []}), 400
+    
+    try:
+        search_index = get_search_index()
+    except Exception as e:
+        return jsonify({"error": f"搜索索引不可用: {str(e)}", "results": []}), 503
+    if search_index is None:
+        return jsonify({"error": "搜索索引未启用（settings.search_index_db 为 null）", "results": []}), 503
+    
+    try:
+        started = time.perf_counter()
+        # 只读查询；索引由调度器在启动时和每个任务执行结束后增量更新
+        result = search_index.search(
+            query,
+            kind=request.args.get("kind") or None,
+            folder=request.args.get("folder") or None,
+            since=request.args.get("since") or None,
+            until=request.args.get("until") or None,
+            limit=min(max(request.args.get("limit", 20, type=int), 0), 100),
+            offset=max(request.args.get("offset", 0, type=int), 0)
+        )
+        result["query"] = query
+        result["took_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": f"搜索失败: {str(e)}", "results": []}), 500
 
 
 @app.route("/static/<path:path>")
@@ -169,60 +460,186 @@ def themes_preview():
     return render_template("themes.html")
 
 
-def get_service_status(service_name):
-    """获取 systemd 服务状态"""
+# systemd 服务状态缓存。gunicorn 的多个 worker 是独立进程，进程内的缓存各自过期、各自探测，
+# 因此探测结果写入共享的缓存文件，所有 worker 共用；缓存文件不可写时退回只在本进程内缓存
+SERVICE_STATUS_CACHE_FILE = os.path.join(PROJECT_DIR, "scheduler", "service_status.json")
+# 缓存文件不可写时使用的本进程缓存: (探测时间, 服务名 -> 状态)
+_service_status_cache = (0.0, {})
+_service_status_lock = threading.Lock()
+# 状态缓存有效期（秒），有效期内所有 worker 的请求共用一次探测结果
+SERVICE_STATUS_TTL = 5
+
+
+def _probe_service_status(service_names):
+    """
+    用一次 systemctl show 查询所有服务的运行状态和开机自启状态
+    
+    Returns:
+        dict: 服务名 -> {"running": bool, "enabled": bool}
+    """
+    status = {name: {"running": False, "enabled": False} for name in service_names}
     try:
-        # 检查服务是否正在运行
         result = subprocess.run(
-            ["systemctl", "is-active", service_name],
+            ["systemctl", "show", "--property=Id,ActiveState,UnitFileState", *service_names],
             capture_output=True,
             text=True,
             timeout=5
         )
-        is_active = result.returncode == 0 and result.stdout.strip() == "active"
+    except FileNotFoundError:
+        # 没有 systemctl（非 Linux 系统）
+        return status
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"查询服务状态失败: {e}")
+        return status
+    
+    # 输出为每个服务一段 key=value，段之间以空行分隔
+    for block in result.stdout.strip().split("\n\n"):
+        props = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+        unit = props.get("Id")
+        if unit in status:
+            status[unit] = {
+                "running": props.get("ActiveState") == "active",
+                "enabled": props.get("UnitFileState") == "enabled"
+            }
+    return status
+
+
+def _read_shared_service_status():
+    """
+    读取共享缓存文件
+    
+    Returns:
+        tuple: (探测时间, 服务名 -> 状态)；文件不存在或内容无效时为 (0.0, {})
+    """
+    try:
+        with open(SERVICE_STATUS_CACHE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        probed_at, status = data["probed_at"], data["status"]
+        if isinstance(probed_at, (int, float)) and isinstance(status, dict):
+            return float(probed_at), status
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return 0.0, {}
 
-        # 检查服务是否已启用（开机自启）
-        result = subprocess.run(
-            ["systemctl", "is-enabled", service_name],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        is_enabled = result.returncode == 0 and result.stdout.strip() == "enabled"
 
-        return {
-            "running": is_active,
-            "enabled": is_enabled
-        }
-    except (subprocess.TimeoutExpired, FileNotFoundError, Exception):
-        # 如果 systemctl 不可用（非 Linux 系统）
-        return {
-            "running": False,
-            "enabled": False
-        }
+def _write_shared_service_status(probed_at, status):
+    """
+    写入共享缓存文件：先写同目录下的临时文件再原子替换，其他 worker 任何时候读到的都是完整的文件
+    
+    Returns:
+        bool: 是否写入成功
+    """
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix=".service_status.", suffix=".tmp",
+                                        dir=os.path.dirname(SERVICE_STATUS_CACHE_FILE))
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"probed_at": probed_at, "status": status}, f, ensure_ascii=False)
+        os.replace(tmp_path, SERVICE_STATUS_CACHE_FILE)
+        return True
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return False
 
 
-@app.route("/api/system/status")
-def api_system_status():
-    """获取系统服务状态 API"""
-    services = {
-        "auto-fund-web": {
-            "name": "Web 应用",
-            "description": "数据分析结果展示 Web 服务"
-        },
-        "auto-fund-qq": {
-            "name": "QQ 机器人",
-            "description": "QQ 消息推送机器人服务"
-        },
-        "auto-fund-scheduler": {
-            "name": "任务调度器",
-            "description": "定时任务调度服务"
-        }
+@contextmanager
+def _service_status_probe_lock():
+    """跨 worker 的探测锁（<缓存文件>.lock，fcntl.flock），同一时刻只有一个 worker 执行 systemctl"""
+    with _service_status_lock:
+        if fcntl is None:
+            yield
+            return
+        try:
+            f = open(SERVICE_STATUS_CACHE_FILE + ".lock", "a")
+        except OSError:
+            # 锁文件无法创建时只做进程内互斥
+            yield
+            return
+        with f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _fresh_service_status(service_names):
+    """返回仍在有效期内且包含所有服务的缓存（共享文件，文件不可写时为本进程缓存），没有则返回 None"""
+    now = time.time()
+    for probed_at, cached in (_read_shared_service_status(), _service_status_cache):
+        if 0 <= now - probed_at < SERVICE_STATUS_TTL and all(name in cached for name in service_names):
+            return cached
+    return None
+
+
+def get_services_status(service_names):
+    """
+    获取多个 systemd 服务的状态
+    
+    结果缓存 SERVICE_STATUS_TTL 秒，所有 gunicorn worker 通过 SERVICE_STATUS_CACHE_FILE 共享；
+    并发请求（包括不同 worker 的请求）在探测锁内复查缓存，每个有效期只触发一次探测
+    """
+    global _service_status_cache
+    cached = _fresh_service_status(service_names)
+    if cached is not None:
+        return cached
+    
+    with _service_status_probe_lock():
+        cached = _fresh_service_status(service_names)
+        if cached is not None:
+            return cached
+        status = _probe_service_status(service_names)
+        probed_at = time.time()
+        # 写入共享文件成功时不保留本进程缓存，其他 worker 删除缓存文件后本进程也会重新探测
+        if _write_shared_service_status(probed_at, status):
+            _service_status_cache = (0.0, {})
+        else:
+            _service_status_cache = (probed_at, status)
+        return status
+
+
+def invalidate_service_status():
+    """服务状态变化后（如重启）清除缓存，所有 worker 的下一次查询重新探测"""
+    global _service_status_cache
+    _service_status_cache = (0.0, {})
+    try:
+        os.unlink(SERVICE_STATUS_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def get_service_status(service_name):
+    """获取 systemd 服务状态"""
+    return get_services_status([service_name])[service_name]
+
+
+SYSTEM_SERVICES = {
+    "auto-fund-web": {
+        "name": "Web 应用",
+        "description": "数据分析结果展示 Web 服务"
+    },
+    "auto-fund-qq": {
+        "name": "QQ 机器人",
+        "description": "QQ 消息推送机器人服务"
+    },
+    "auto-fund-scheduler": {
+        "name": "任务调度器",
+        "description": "定时任务调度服务"
     }
+}
 
+
+def build_services_status():
+    """各系统服务的运行和开机自启状态列表"""
+    statuses = get_services_status([f"{service_id}.service" for service_id in SYSTEM_SERVICES])
     result = []
-    for service_id, info in services.items():
-        status = get_service_status(f"{service_id}.service")
+    for service_id, info in SYSTEM_SERVICES.items():
+        status = statuses[f"{service_id}.service"]
         result.append({
             "id": service_id,
             "name": info["name"],
@@ -230,9 +647,14 @@ def api_system_status():
             "running": status["running"],
             "enabled": status["enabled"]
         })
+    return result
+
 
+@app.route("/api/system/status")
+def api_system_status():
+    """获取系统服务状态 API"""
     return jsonify({
-        "services": result,
+        "services": build_services_status(),
         "platform": platform.system(),
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     })
@@ -259,9 +681,7 @@ def get_service_logs(service_id, lines=100):
             # 从文件读取日志
             log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), log_file)
             if os.path.exists(log_path):
-                with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-                    all_lines = f.readlines()
-                    return "".join(all_lines[-lines:])
+                return tail_lines(log_path, lines)
             else:
                 return f"日志文件不存在: {log_file}"
         else:
@@ -379,6 +799,7 @@ def api_restart_service(service_id):
         }), 403
 
     success, message = restart_systemd_service(service_id)
+    invalidate_service_status()
 
     return jsonify({
         "success": success,
@@ -390,77 +811,117 @@ def api_restart_service(service_id):
 
 SCHEDULER_CONFIG_PATH = os.path.join(PROJECT_DIR, "scheduler", "config.json")
 SCHEDULER_LOG_PATH = os.path.join(PROJECT_DIR, "scheduler", "scheduler.log")
+DEFAULT_SCHEDULER_STATE_FILE = "scheduler/scheduler_state.json"
 
+# 调度器状态文件解析缓存: (路径, mtime_ns, 文件大小, 各任务状态)
+_task_status_index_cache = None
 
-def load_scheduler_config():
-    """加载调度器配置"""
+
+def load_scheduler_config_with_version():
+    """加载调度器配置及其版本号，失败时返回 (None, None)"""
     if not os.path.exists(SCHEDULER_CONFIG_PATH):
-        return None
+        return None, None
     try:
-        with open(SCHEDULER_CONFIG_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_config(SCHEDULER_CONFIG_PATH)
     except Exception as e:
         print(f"加载调度器配置失败: {e}")
-        return None
+        return None, None
+
+
+def load_scheduler_config():
+    """加载调度器配置"""
+    return load_scheduler_config_with_version()[0]
 
 
-def save_scheduler_config(config):
-    """保存调度器配置"""
+def get_expected_config_version(data):
+    """客户端读取配置时的版本号：请求体中的 version 或 If-Match 请求头"""
+    version = data.get("version") or request.headers.get("If-Match", "")
+    return version.strip().strip('"') or None
+
+
+def modify_scheduler_config(data, mutate, success_message):
+    """
+    按乐观并发修改调度器配置并生成响应
+
+    mutate 找不到任务时抛出 LookupError；版本号不一致返回 409，修改后的配置校验失败返回 400
+    """
     try:
-        with open(SCHEDULER_CONFIG_PATH, "w", encoding="utf-8") as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
-        return True
+        result, version = update_config(SCHEDULER_CONFIG_PATH, mutate, get_expected_config_version(data))
+    except ConfigConflictError as e:
+        return jsonify({"success": False, "message": str(e), "version": e.current_version}), 409
+    except LookupError as e:
+        return jsonify({"success": False, "message": e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({"success": False, "message": f"配置无效: {e}"}), 400
     except Exception as e:
         print(f"保存调度器配置失败: {e}")
-        return False
+        return jsonify({"success": False, "message": "保存配置失败"}), 500
+    
+    invalidate_dashboard_snapshot()
+    response = {"success": True, "message": success_message(result), "version": version}
+    if isinstance(result, dict):
+        response.update(result)
+    return jsonify(response)
 
 
-def get_task_status_from_log(task_id):
-    """从日志文件获取任务状态"""
-    if not os.path.exists(SCHEDULER_LOG_PATH):
+def _format_iso_time(value):
+    """把状态文件中的 ISO 时间转换为页面统一的显示格式"""
+    if not value:
         return None
+    try:
+        return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return value
+
+
+def load_task_status_index(config):
+    """
+    读取调度器维护的状态文件（last_run / last_status / last_duration / next_run）
+    
+    文件由调度器原子替换写入，按 mtime 和大小缓存解析结果，未变化时不重新读取
     
+    Returns:
+        dict: 任务ID -> 状态；状态文件不存在时返回 None
+    """
+    global _task_status_index_cache
+    state_file = config.get("settings", {}).get("state_file", DEFAULT_SCHEDULER_STATE_FILE)
+    state_path = os.path.join(PROJECT_DIR, state_file)
     try:
-        with open(SCHEDULER_LOG_PATH, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-        
-        last_run = None
-        last_status = None
-        task_pattern = f"任务: {task_id}"
-        
-        for line in reversed(lines):
-            if task_pattern in line or f"'{task_id}'" in line:
-                if "最后运行" in line:
-                    import re
-                    match = re.search(r"最后运行: ([\d\- :]+)", line)
-                    if match:
-                        last_run = match.group(1)
-                if "状态:" in line:
-                    import re
-                    match = re.search(r"状态: (\w+)", line)
-                    if match:
-                        last_status = match.group(1)
-                if last_run or last_status:
-                    break
-        
-        return {
-            "last_run": last_run,
-            "last_status": last_status
-        }
-    except Exception as e:
+        st = os.stat(state_path)
+    except OSError:
         return None
+    
+    cache = _task_status_index_cache
+    if cache and cache[:3] == (state_path, st.st_mtime_ns, st.st_size):
+        return cache[3]
+    
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            tasks = json.load(f).get("tasks", {})
+    except (OSError, ValueError) as e:
+        print(f"读取调度器状态文件失败: {e}")
+        return cache[3] if cache else None
+    
+    index = {}
+    for task_id, state in tasks.items():
+        index[task_id] = {
+            "last_run": _format_iso_time(state.get("last_run")),
+            "last_status": state.get("last_status"),
+            "last_duration": state.get("last_duration"),
+            "next_run": _format_iso_time(state.get("next_run"))
+        }
+    _task_status_index_cache = (state_path, st.st_mtime_ns, st.st_size, index)
+    return index
 
 
-@app.route("/api/scheduler/tasks")
-def api_scheduler_tasks():
-    """获取所有调度任务"""
-    config = load_scheduler_config()
-    if not config:
-        return jsonify({"error": "无法加载调度器配置"}), 500
+def build_scheduler_tasks(config):
+    """合并任务配置和调度器状态，生成任务列表"""
+    # 任务状态以调度器的状态文件为准；调度器从未运行过（没有状态文件）时各项状态为空
+    status_index = load_task_status_index(config) or {}
     
     tasks = []
     for task_dict in config.get("tasks", []):
-        task_status = get_task_status_from_log(task_dict.get("id", ""))
+        task_status = status_index.get(task_dict.get("id", ""))
         tasks.append({
             "id": task_dict.get("id"),
             "name": task_dict.get("name", ""),
@@ -471,14 +932,55 @@ def api_scheduler_tasks():
             "timeout": task_dict.get("timeout", 300),
             "working_directory": task_dict.get("working_directory", "."),
             "last_run": task_status.get("last_run") if task_status else None,
-            "last_status": task_status.get("last_status") if task_status else None
+            "last_status": task_status.get("last_status") if task_status else None,
+            "last_duration": task_status.get("last_duration") if task_status else None,
+            "next_run": task_status.get("next_run") if task_status else None
         })
+    return tasks
+
+
+@app.route("/api/scheduler/tasks")
+def api_scheduler_tasks():
+    """获取所有调度任务"""
+    config, version = load_scheduler_config_with_version()
+    if not config:
+        return jsonify({"error": "无法加载调度器配置"}), 500
     
-    return jsonify({
-        "tasks": tasks,
+    response = jsonify({
+        "tasks": build_scheduler_tasks(config),
         "settings": config.get("settings", {}),
+        "config_version": version,
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     })
+    response.headers["ETag"] = f'"{version}"'
+    return response
+
+
+# 调度器控制通道返回的错误类型对应的 HTTP 状态码
+CONTROL_ERROR_STATUS = {"not_found": 404, "disabled": 400, "busy": 409, "not_leader": 409, "bad_request": 400}
+
+
+def get_scheduler_control_socket(config):
+    """调度器控制通道 socket 路径（相对路径以项目根目录为基准），关闭时返回 None"""
+    socket_path = config.get("settings", {}).get("control_socket", DEFAULT_CONTROL_SOCKET)
+    return os.path.join(PROJECT_DIR, socket_path) if socket_path else None
+
+
+def get_scheduler_executor_stats():
+    """
+    通过控制通道获取调度器执行器的统计：队列深度（总数和各并发组）、各并发组占用、等待时间
+    
+    Returns:
+        dict: 调度器未运行或控制通道已关闭时返回 None
+    """
+    socket_path = get_scheduler_control_socket(load_scheduler_config() or {})
+    if not socket_path:
+        return None
+    try:
+        result = send_command(socket_path, "stats", timeout=1)
+    except (ControlUnavailable, ValueError):
+        return None
+    return result.get("stats") if result.get("success") else None
 
 
 @app.route("/api/scheduler/run/<task_id>", methods=["POST"])
@@ -510,146 +1012,25 @@ def api_scheduler_run(task_id):
         if not task.get("enabled", True):
             return jsonify({"success": False, "message": "任务已禁用，无法运行"}), 400
 
-        # 在后台线程中运行任务，以便立即返回响应
-        def run_task_in_background():
-            import subprocess
-
-            work_dir = task.get("working_directory", PROJECT_DIR)
-            timeout = task.get("timeout", 300)
-
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            env['LANG'] = 'en_US.UTF-8'
-
-            # 记录任务到监控器（手动运行）
-            if TASK_MONITOR_AVAILABLE:
-                task_monitor.start_task(
-                    task_id=task_id,
-                    task_name=task.get('name', ''),
-                    task_type="manual"
-                )
-
-            # 开始记录任务日志
-            if TASK_LOG_AVAILABLE:
-                log_file = task_log_manager.start_task_log(task_id, task.get('name', ''))
-                print(f"任务日志文件: {log_file}")
+        # 提交给调度器进程执行，与定时触发共用并发控制、重试、监控记录和日志
+        socket_path = get_scheduler_control_socket(config)
+        if not socket_path:
+            return jsonify({"success": False, "message": "调度器控制通道已关闭（settings.control_socket），无法手动运行"}), 503
+        try:
+            result = send_command(socket_path, "run", task_id=task_id)
+        except ControlUnavailable as e:
+            print(f"提交任务到调度器失败: {e}")
+            return jsonify({"success": False, "message": f"无法提交任务到调度器: {e}"}), 503
 
-            stdout_lines = []
-            stderr_lines = []
-
-            try:
-                # 使用 Popen 启动进程以便获取 PID
-                process = subprocess.Popen(
-                    task.get("command"),
-                    shell=True,
-                    cwd=work_dir,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
-                    env=env
-                )
-
-                # 更新 PID 到监控器
-                if TASK_MONITOR_AVAILABLE:
-                    task_monitor.update_task_pid(task_id, process.pid)
-
-                # 创建线程实时读取输出
-                def read_stdout():
-                    try:
-                        for line in iter(process.stdout.readline, ''):
-                            if line:
-                                line_str = line.rstrip('\n\r')
-                                stdout_lines.append(line_str)
-                                if TASK_LOG_AVAILABLE:
-                                    task_log_manager.write_log(task_id, line_str, is_error=False)
-                    except Exception as e:
-                        print(f"读取stdout失败: {e}")
-
-                def read_stderr():
-                    try:
-                        for line in iter(process.stderr.readline, ''):
-                            if line:
-                                line_str = line.rstrip('\n\r')
-                                stderr_lines.append(line_str)
-                                if TASK_LOG_AVAILABLE:
-                                    task_log_manager.write_log(task_id, line_str, is_error=True)
-                    except Exception as e:
-                        print(f"读取stderr失败: {e}")
-
-                # 启动读取线程
-                stdout_thread = threading.Thread(target=read_stdout, daemon=True)
-                stderr_thread = threading.Thread(target=read_stderr, daemon=True)
-                stdout_thread.start()
-                stderr_thread.start()
-
-                # 等待进程完成或超时
-                try:
-                    returncode = process.wait(timeout=timeout)
-
-                    # 等待读取线程完成
-                    stdout_thread.join(timeout=2)
-                    stderr_thread.join(timeout=2)
-
-                    # 关闭管道
-                    try:
-                        process.stdout.close()
-                        process.stderr.close()
-                    except:
-                        pass
-
-                    final_status = "completed" if returncode == 0 else "failed"
-                    final_output = '\n'.join(stdout_lines)
-                    final_error = '\n'.join(stderr_lines)
-
-                except subprocess.TimeoutExpired:
-                    process.terminate()
-                    try:
-                        process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        process.kill()
-                        process.wait()
-
-                    final_status = "timeout"
-                    final_output = '\n'.join(stdout_lines)
-                    final_error = f"任务执行超时（{timeout}秒）"
-
-                # 结束任务日志记录
-                if TASK_LOG_AVAILABLE:
-                    task_log_manager.end_task_log(task_id, final_status)
-
-                # 记录任务结束到监控器
-                if TASK_MONITOR_AVAILABLE:
-                    task_monitor.end_task(
-                        task_id=task_id,
-                        status=final_status,
-                        output=final_output,
-                        error=final_error
-                    )
-
-            except Exception as e:
-                # 结束任务日志记录
-                if TASK_LOG_AVAILABLE:
-                    task_log_manager.end_task_log(task_id, "error")
-
-                # 记录任务异常
-                if TASK_MONITOR_AVAILABLE:
-                    task_monitor.end_task(
-                        task_id=task_id,
-                        status="error",
-                        output="",
-                        error=str(e)
-                    )
-
-        # 启动后台线程运行任务
-        task_thread = threading.Thread(target=run_task_in_background, daemon=True)
-        task_thread.start()
+        if not result.get("success"):
+            status_code = CONTROL_ERROR_STATUS.get(result.get("error"), 500)
+            return jsonify({"success": False, "message": result.get("message", "提交任务失败")}), status_code
 
         return jsonify({
             "success": True,
-            "message": f"任务 '{task.get('name')}' 已启动",
-            "task_id": task_id
+            "message": f"任务 '{task.get('name')}' 已{'进入排队' if result.get('queued') else '启动'}",
+            "task_id": task_id,
+            "queued": result.get("queued", False)
         })
 
     except Exception as e:
@@ -664,9 +1045,21 @@ def api_scheduler_run(task_id):
         }), 500
 
 
+def find_task_config(config, task_id):
+    for task_dict in config.get("tasks", []):
+        if task_dict.get("id") == task_id:
+            return task_dict
+    raise LookupError(f"任务 {task_id} 不存在")
+
+
 @app.route("/api/scheduler/toggle/<task_id>", methods=["POST"])
 def api_scheduler_toggle(task_id):
-    """启用/禁用任务"""
+    """
+    启用/禁用任务
+    
+    请求体可带 enabled 指定目标状态（不带时切换当前状态），
+    带 version（或 If-Match 请求头）时只在配置未被他人修改的情况下生效
+    """
     data = request.get_json(silent=True) or {}
     password = data.get("password", "")
     
@@ -676,36 +1069,22 @@ def api_scheduler_toggle(task_id):
             "message": "密码错误"
         }), 403
     
-    config = load_scheduler_config()
-    if not config:
-        return jsonify({"success": False, "message": "无法加载调度器配置"}), 500
-    
-    task_found = False
-    new_state = False
-    for task_dict in config.get("tasks", []):
-        if task_dict.get("id") == task_id:
-            task_found = True
-            current_state = task_dict.get("enabled", True)
-            task_dict["enabled"] = not current_state
-            new_state = not current_state
-            break
+    def toggle(config):
+        task_dict = find_task_config(config, task_id)
+        enabled = data.get("enabled")
+        if not isinstance(enabled, bool):
+            enabled = not task_dict.get("enabled", True)
+        task_dict["enabled"] = enabled
+        return {"enabled": enabled}
     
-    if not task_found:
-        return jsonify({"success": False, "message": f"任务 {task_id} 不存在"}), 404
-    
-    if save_scheduler_config(config):
-        return jsonify({
-            "success": True,
-            "message": f"任务已{'启用' if new_state else '禁用'}",
-            "enabled": new_state
-        })
-    else:
-        return jsonify({"success": False, "message": "保存配置失败"}), 500
+    return modify_scheduler_config(
+        data, toggle, lambda result: f"任务已{'启用' if result['enabled'] else '禁用'}"
+    )
 
 
 @app.route("/api/scheduler/update", methods=["POST"])
 def api_scheduler_update():
-    """更新任务配置"""
+    """更新任务配置，版本号检查同 /api/scheduler/toggle"""
     data = request.get_json(silent=True) or {}
     password = data.get("password", "")
     task_id = data.get("task_id")
@@ -720,29 +1099,13 @@ def api_scheduler_update():
     if not task_id:
         return jsonify({"success": False, "message": "缺少任务ID"}), 400
     
-    config = load_scheduler_config()
-    if not config:
-        return jsonify({"success": False, "message": "无法加载调度器配置"}), 500
-    
-    task_found = False
-    for task_dict in config.get("tasks", []):
-        if task_dict.get("id") == task_id:
-            task_found = True
-            for key, value in task_config.items():
-                if key not in ["id"]:
-                    task_dict[key] = value
-            break
-    
-    if not task_found:
-        return jsonify({"success": False, "message": f"任务 {task_id} 不存在"}), 404
+    def update(config):
+        task_dict = find_task_config(config, task_id)
+        for key, value in task_config.items():
+            if key not in ["id"]:
+                task_dict[key] = value
     
-    if save_scheduler_config(config):
-        return jsonify({
-            "success": True,
-            "message": "任务配置已更新"
-        })
-    else:
-        return jsonify({"success": False, "message": "保存配置失败"}), 500
+    return modify_scheduler_config(data, update, lambda result: "任务配置已更新")
 
 
 @app.route("/api/scheduler/logs")
@@ -757,9 +1120,7 @@ def api_scheduler_logs():
         })
     
     try:
-        with open(SCHEDULER_LOG_PATH, "r", encoding="utf-8", errors="ignore") as f:
-            all_lines = f.readlines()
-            log_content = "".join(all_lines[-lines:])
+        log_content = tail_lines(SCHEDULER_LOG_PATH, lines)
         
         return jsonify({
             "logs": log_content,
@@ -807,8 +1168,16 @@ def api_task_monitor_history():
         }), 503
     
     try:
-        limit = request.args.get("limit", 20, type=int)
-        history = task_monitor.get_task_history(limit=limit)
+        # sqlite 的 LIMIT 为负数时不限制条数，需先规范分页参数
+        offset, limit = clamp_page_args(request.args.get("offset", 0, type=int),
+                                        request.args.get("limit", 20, type=int))
+        task_id = request.args.get("task_id") or None
+        status = request.args.get("status")
+        status = status.split(",") if status else None
+        days = request.args.get("days", type=int)
+        since = datetime.now() - timedelta(days=days) if days else None
+        history = task_monitor.get_task_history(limit=limit, task_id=task_id, status=status,
+                                                since=since, offset=offset)
         return jsonify({
             "history": history,
             "count": len(history),
@@ -821,18 +1190,39 @@ def api_task_monitor_history():
         }), 500
 
 
+@app.route("/api/task-monitor/stats/<task_id>")
+def api_task_monitor_stats(task_id):
+    """获取任务最近一段时间的执行统计（次数、成功率、p50/p95 时长）"""
+    if not TASK_MONITOR_AVAILABLE:
+        return jsonify({
+            "error": "任务监控模块不可用",
+            "task_id": task_id
+        }), 503
+    
+    try:
+        days = request.args.get("days", 30, type=int)
+        return jsonify(task_monitor.get_task_stats(task_id, days=days))
+    except Exception as e:
+        return jsonify({
+            "error": f"获取任务统计失败: {str(e)}",
+            "task_id": task_id
+        }), 500
+
+
 @app.route("/api/task-monitor/summary")
 def api_task_monitor_summary():
-    """获取任务监控摘要"""
+    """获取任务监控摘要，executor 为调度器执行器的实时统计（调度器未运行时为 null）"""
     if not TASK_MONITOR_AVAILABLE:
         return jsonify({
             "error": "任务监控模块不可用",
             "running_count": 0,
-            "history_count": 0
+            "history_count": 0,
+            "executor": get_scheduler_executor_stats()
         }), 503
     
     try:
         summary = task_monitor.get_summary()
+        summary["executor"] = get_scheduler_executor_stats()
         return jsonify(summary)
     except Exception as e:
         return jsonify({
@@ -867,6 +1257,86 @@ def api_task_monitor_status(task_id):
         }), 500
 
 
+# ==================== 仪表盘快照 API ====================
+
+# 快照缓存: (生成时间, ETag, 快照)，有效期内的请求共用同一份快照
+_dashboard_snapshot_cache = (0.0, None, None)
+_dashboard_snapshot_lock = threading.Lock()
+DASHBOARD_SNAPSHOT_TTL = 1
+
+
+def invalidate_dashboard_snapshot():
+    """配置修改后丢弃快照缓存，下一次请求即可看到新配置"""
+    global _dashboard_snapshot_cache
+    _dashboard_snapshot_cache = (0.0, None, None)
+
+
+def build_dashboard_snapshot():
+    """
+    汇总任务列表、运行中任务、最近历史、监控摘要和服务状态
+    
+    Returns:
+        tuple: (ETag, 快照)；ETag 由快照内容计算，不含生成时间和运行中任务的时长，内容不变时保持不变
+    """
+    global _dashboard_snapshot_cache
+    built_at, etag, snapshot = _dashboard_snapshot_cache
+    if snapshot is not None and time.time() - built_at < DASHBOARD_SNAPSHOT_TTL:
+        return etag, snapshot
+    
+    with _dashboard_snapshot_lock:
+        built_at, etag, snapshot = _dashboard_snapshot_cache
+        if snapshot is not None and time.time() - built_at < DASHBOARD_SNAPSHOT_TTL:
+            return etag, snapshot
+        
+        config, version = load_scheduler_config_with_version()
+        config = config or {}
+        snapshot = {
+            "tasks": build_scheduler_tasks(config) if config else [],
+            "settings": config.get("settings", {}),
+            "config_version": version,
+            "running": [],
+            "history": [],
+            "summary": {},
+            "services": build_services_status(),
+            "platform": platform.system()
+        }
+        if TASK_MONITOR_AVAILABLE:
+            # 运行中任务的时长每秒都在变化，计入快照会让 ETag 每秒变化；时长由客户端根据 start_timestamp 计算
+            snapshot["running"] = [{k: v for k, v in task.items() if k != "duration"}
+                                   for task in task_monitor.get_running_tasks()]
+            snapshot["history"] = task_monitor.get_task_history(limit=20)
+            summary = task_monitor.get_summary()
+            summary.pop("timestamp", None)
+            snapshot["summary"] = summary
+        
+        body = json.dumps(snapshot, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        _dashboard_snapshot_cache = (time.time(), etag, snapshot)
+        return etag, snapshot
+
+
+@app.route("/api/dashboard/snapshot")
+def api_dashboard_snapshot():
+    """
+    仪表盘快照：一次请求返回各面板所需数据
+    
+    响应带 ETag，内容未变化时对 If-None-Match 返回 304
+    """
+    try:
+        etag, snapshot = build_dashboard_snapshot()
+    except Exception as e:
+        return jsonify({"error": f"获取仪表盘快照失败: {str(e)}"}), 500
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status=304, headers=headers)
+    
+    response = jsonify(dict(snapshot, timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    response.headers.update(headers)
+    return response
+
+
 # ==================== 任务日志 API ====================
 
 @app.route("/api/task/logs/<task_id>")
@@ -924,7 +1394,12 @@ def api_task_log_content(task_id, log_filename):
 
 @app.route("/api/task/log/latest/<task_id>")
 def api_task_log_latest(task_id):
-    """获取任务的最新日志内容"""
+    """
+    获取任务的最新日志内容
+
+    传入 since_offset（以及上次返回的 log_filename）时只返回该偏移之后新写入的内容；
+    最新日志已切换为新的文件时返回完整快照并标记 reset
+    """
     if not TASK_LOG_AVAILABLE:
         return jsonify({
             "error": "任务日志模块不可用",
@@ -933,14 +1408,36 @@ def api_task_log_latest(task_id):
     
     try:
         lines = request.args.get("lines", 200, type=int)
-        content = task_log_manager.get_latest_log_content(task_id, lines)
+        since_offset = request.args.get("since_offset", type=int)
+        known_log = request.args.get("log_filename")
         
-        # 检查任务是否正在运行
-        is_running = task_log_manager.is_task_running(task_id)
+        log_filename = task_log_manager.get_latest_log_name(task_id)
+        if not log_filename:
+            return jsonify({
+                "task_id": task_id,
+                "content": "暂无日志",
+                "is_running": task_log_manager.is_task_running(task_id),
+                "lines": lines,
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            })
+        
+        reset = False
+        if since_offset is not None and known_log in (None, log_filename):
+            content, offset = task_log_manager.read_log_since(task_id, log_filename, since_offset)
+        else:
+            content, offset = task_log_manager.get_log_snapshot(task_id, log_filename, lines)
+            reset = since_offset is not None
+        
+        # 检查任务是否正在运行（调度器进程写入的日志以结束标记判断）
+        is_running = (task_log_manager.is_task_running(task_id)
+                      or not task_log_manager.is_log_finished(task_id, log_filename))
         
         return jsonify({
             "task_id": task_id,
             "content": content,
+            "log_filename": log_filename,
+            "offset": offset,
+            "reset": reset,
             "is_running": is_running,
             "lines": lines,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -953,6 +1450,88 @@ def api_task_log_latest(task_id):
         }), 500
 
 
+# 日志流轮询文件变化的间隔和心跳间隔（秒）
+LOG_STREAM_POLL_INTERVAL = 0.5
+LOG_STREAM_KEEPALIVE = 15
+
+
+def _sse_event(event, data, event_id=None):
+    message = f"event: {event}\n"
+    if event_id:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route("/api/task/log/stream/<task_id>")
+def api_task_log_stream(task_id):
+    """
+    以 Server-Sent Events 推送任务最新日志
+
+    事件:
+        snapshot - 最后 lines 行（首次连接或切换到新的日志文件时）
+        log      - 新写入的完整行
+        end      - 日志已写入结束标记，客户端可关闭连接
+    事件 id 为 "日志文件名:字节偏移"，断线重连时浏览器通过 Last-Event-ID 带回，从断点继续推送
+    """
+    if not TASK_LOG_AVAILABLE:
+        return jsonify({"error": "任务日志模块不可用"}), 503
+    
+    lines = request.args.get("lines", 200, type=int)
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    
+    def generate():
+        log_filename = None
+        offset = 0
+        if ":" in last_event_id:
+            resume_log, _, resume_offset = last_event_id.rpartition(":")
+            if resume_offset.isdigit() and resume_log == task_log_manager.get_latest_log_name(task_id):
+                log_filename, offset = resume_log, int(resume_offset)
+        
+        last_sent = time.time()
+        last_finished_check = 0.0
+        while True:
+            latest = task_log_manager.get_latest_log_name(task_id)
+            if latest and latest != log_filename:
+                log_filename = latest
+                content, offset = task_log_manager.get_log_snapshot(task_id, log_filename, lines)
+                yield _sse_event("snapshot", {"log_filename": log_filename, "content": content},
+                                 f"{log_filename}:{offset}")
+                last_sent = time.time()
+            elif log_filename:
+                content, offset = task_log_manager.read_log_since(task_id, log_filename, offset)
+                if content:
+                    yield _sse_event("log", {"content": content}, f"{log_filename}:{offset}")
+                    last_sent = time.time()
+                    continue
+            
+            now = time.time()
+            if log_filename and now - last_finished_check >= 2:
+                last_finished_check = now
+                if (not task_log_manager.is_task_running(task_id)
+                        and task_log_manager.is_log_finished(task_id, log_filename)):
+                    # 结束标记之前的内容可能还未推送完
+                    content, offset = task_log_manager.read_log_since(task_id, log_filename, offset)
+                    if content:
+                        yield _sse_event("log", {"content": content}, f"{log_filename}:{offset}")
+                    yield _sse_event("end", {"log_filename": log_filename}, f"{log_filename}:{offset}")
+                    return
+            
+            if now - last_sent >= LOG_STREAM_KEEPALIVE:
+                yield ": keepalive\n\n"
+                last_sent = now
+            time.sleep(LOG_STREAM_POLL_INTERVAL)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 禁止 nginx 等反向代理缓冲事件流
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("  📊 数据分析结果展示系统")
@@ -0,0 +1,29 @@
+"""
+gunicorn 配置（生产模式）
+
+    gunicorn -c web/gunicorn.conf.py web.wsgi:app
+
+- 多进程 + 线程（gthread）：仪表盘的多个轮询请求和日志 SSE 长连接可以并发处理，互不排队
+- 平滑重载：向主进程发送 HUP（systemctl reload auto-fund-web），新 worker 启动后旧 worker 处理完当前请求再退出
+- 访问日志记录每个请求的耗时（微秒）
+- 不预加载应用（preload_app = False）：每个 worker 各自创建 task_monitor / task_log_manager 等单例和 sqlite 连接，
+  跨进程共享的状态（运行中任务、执行历史、调度状态）都保存在 sqlite / 状态文件中
+各项均可通过环境变量覆盖
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("WEB_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_WORKERS", min(multiprocessing.cpu_count(), 4)))
+worker_class = "gthread"
+# 每个日志 SSE 连接会占用一个线程，线程数需大于同时打开的日志窗口数
+threads = int(os.environ.get("WEB_THREADS", 16))
+timeout = int(os.environ.get("WEB_TIMEOUT", 120))
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+preload_app = False
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("WEB_LOG_LEVEL", "info")
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(D)sus "%(a)s"'
@@ -3,6 +3,10 @@ let currentFolder = null;
 let currentFile = null;
 let fileData = {};
 
+// 已渲染的报告 HTML（按 ETag 校验），切换回已看过的报告时无需重新解析 Markdown
+const renderedCache = new Map();
+const RENDERED_CACHE_SIZE = 20;
+
 // 主题管理
 const ThemeManager = {
     STORAGE_KEY: 'eros-theme-preference',
@@ -120,21 +124,19 @@ async function initApp() {
     }
 }
 
-// 加载所有文件夹的文件计数
+// 加载所有文件夹的文件计数（/api/folders 已包含各文件夹的文件数）
 async function loadAllFolderCounts() {
-    const folderItems = document.querySelectorAll('.folder-item');
-    for (const item of folderItems) {
-        const folderName = item.dataset.folder;
-        try {
-            const response = await fetch(`/api/files/${folderName}`);
-            const files = await response.json();
-            const countEl = document.getElementById(`count-${folderName}`);
+    try {
+        const response = await fetch('/api/folders');
+        const folders = await response.json();
+        folders.forEach(folder => {
+            const countEl = document.getElementById(`count-${folder.name}`);
             if (countEl) {
-                countEl.textContent = files.length;
+                countEl.textContent = folder.count;
             }
-        } catch (error) {
-            console.error(`加载文件夹 ${folderName} 计数失败:`, error);
-        }
+        });
+    } catch (error) {
+        console.error('加载文件夹计数失败:', error);
     }
 }
 
@@ -250,7 +252,19 @@ async function loadContent(folderName, fileName) {
     viewer.innerHTML = '<div class="loading"></div>';
     
     try {
+        const cacheKey = `${folderName}/${fileName}`;
         const response = await fetch(`/api/content/${folderName}/${fileName}`);
+        const etag = response.headers.get('ETag');
+        
+        // 文件未变化（浏览器缓存经 304 验证）时直接使用已渲染的 HTML
+        const cached = renderedCache.get(cacheKey);
+        if (etag && cached && cached.etag === etag) {
+            renderedCache.delete(cacheKey);
+            renderedCache.set(cacheKey, cached);
+            viewer.innerHTML = cached.html;
+            return;
+        }
+        
         const data = await response.json();
         
         if (data.error) {
@@ -262,13 +276,19 @@ async function loadContent(folderName, fileName) {
             return;
         }
         
-        // 渲染 Markdown 内容
-        const html = renderMarkdown(data.content);
+        // 优先使用服务端渲染好的 HTML，服务端未渲染时在浏览器中解析 Markdown
+        const html = data.html != null ? sanitizeHtml(data.html) : renderMarkdown(data.content);
         viewer.innerHTML = `
             <div class="markdown-body">
                 ${html}
             </div>
         `;
+        if (etag) {
+            renderedCache.set(cacheKey, { etag, html: viewer.innerHTML });
+            if (renderedCache.size > RENDERED_CACHE_SIZE) {
+                renderedCache.delete(renderedCache.keys().next().value);
+            }
+        }
         
     } catch (error) {
         console.error('加载文件内容失败:', error);
@@ -299,9 +319,11 @@ function renderMarkdown(content) {
     });
     
     // 解析 Markdown
-    const html = marked.parse(content);
-    
-    // 使用 DOMPurify 清理 HTML
+    return sanitizeHtml(marked.parse(content));
+}
+
+// 使用 DOMPurify 清理 HTML
+function sanitizeHtml(html) {
     return DOMPurify.sanitize(html, {
         ALLOWED_TAGS: [
             'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
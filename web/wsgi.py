@@ -0,0 +1,15 @@
+"""
+Web 应用的 WSGI 入口，供 gunicorn 等生产服务器加载
+
+    gunicorn -c web/gunicorn.conf.py web.wsgi:app
+"""
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+from web.app import app  # noqa: E402
+
+application = app
@@ -14,7 +14,7 @@ from agent.fund_news_analysiser.A import Agent
 
 def send_workflow_notification(success: bool, start_time: str, duration: float, error_msg: str = None, retry_count: int = 0):
     try:
-        from message_push.QQ.qq_bot_push import send_notification_sync, check_service_health
+        from message_push.QQ.qq_bot_push import send_notification_sync
         target_openid = os.getenv("QQ_TARGET_C2C_OPENID")
         if not target_openid:
             print("⚠️ 未配置 QQ_TARGET_C2C_OPENID，无法发送通知")
@@ -26,14 +26,7 @@ def send_workflow_notification(success: bool, start_time: str, duration: float,
         else:
             content = f"❌ 新闻采集工作流运行失败\n\n工作流运行开始时间：{start_time}\n工作流运行时间：{duration:.2f}秒\n错误信息：{error_msg}"
 
-        import asyncio
-        if not asyncio.run(check_service_health(max_retries=3, retry_delay=3.0)):
-            print("⚠️ QQ bot 服务不可用，等待后重试...")
-            time.sleep(10)
-            if not asyncio.run(check_service_health(max_retries=2, retry_delay=5.0)):
-                print("❌ QQ bot 服务仍然不可用，跳过通知发送")
-                return False
-
+        # 服务是否可用由推送客户端的重试和熔断器判断，不再单独请求 /health
         result = send_notification_sync(target_openid, content, msg_type="c2c")
         if result.get("success"):
             print("📱 通知发送成功")